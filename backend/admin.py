@@ -0,0 +1,43 @@
+"""Shared-secret gate for operator-only endpoints and request flags."""
+from __future__ import annotations
+
+import functools
+import hmac
+import os
+from typing import Any, Callable, TypeVar
+
+from flask import jsonify, request
+
+__all__ = [
+    "ADMIN_TOKEN",
+    "ADMIN_TOKEN_HEADER",
+    "admin_required",
+    "is_admin_request",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin_request() -> bool:
+    """True when the current request carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        return False
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER, "")
+    return bool(supplied) and hmac.compare_digest(supplied.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+def admin_required(view: F) -> F:
+    """Reject the request unless :func:`is_admin_request` holds."""
+
+    @functools.wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Yönetici erişimi yapılandırılmadı (ADMIN_TOKEN)."}), 404
+        if not is_admin_request():
+            return jsonify({"error": "Yetkisiz istek."}), 403
+        return view(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
@@ -7,28 +7,21 @@ logging.basicConfig(level=logging.INFO)
 import os
 import re
 import sys
-import time
-import traceback
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, Mapping, Sequence
+from typing import Any, Callable, Dict, Iterable, Mapping, Sequence
 
 import pytz
 import requests
 import swisseph as swe
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 try:
     from dotenv import load_dotenv
 except ImportError:  # pragma: no cover - optional dependency
     def load_dotenv(*_args, **_kwargs):
         return False
-try:
-    from pymongo import ReturnDocument
-except ImportError:  # pragma: no cover - optional dependency
-    class ReturnDocument:
-        AFTER = "after"
 
 # Ensure project root is on sys.path when running as a script.
 BASE_DIR = Path(__file__).resolve().parent
@@ -39,6 +32,8 @@ if str(ROOT_DIR) not in sys.path:
 load_dotenv(dotenv_path=BASE_DIR / ".env")
 
 from backend.archetype_engine import (
+    ChartAnalysis,
+    call_ai_model,
     clean_text,
     extract_archetype_data,
     generate_full_archetype_report,
@@ -47,19 +42,56 @@ from backend.archetype_engine import (
     map_confidence_label,
     pick_axis,
 )
-from backend.db import MongoUnavailable, ensure_mongo_connection, mongo_healthcheck
+from backend.breaker import CircuitOpen, circuit_breaker
+from backend.cache import CacheNamespace, TieredCache, build_cache
+from backend.chart_store import ChartStore
+from backend.config import env_float, env_int
+from backend.daily_insight import DailyInsightPipeline, init_app as init_daily_insight
+from backend.db import MONGO_BREAKER, MongoUnavailable, ensure_mongo_connection, mongo_ping
+from backend.deadline import Deadline, DeadlineExceeded, LatencyTracker, hedged_call
+from backend.eventlog import configure_logging, lazy, log_event
+from backend.health import HealthMonitor, http_probe
+from backend.history_store import (
+    HISTORY_PAGE_SIZE,
+    HistoryStore,
+    InvalidCursor,
+    chart_fingerprint,
+    interpretation_key,
+)
+from backend.jobs import JobQueue, init_app as init_jobs
+from backend.metrics import init_app as init_metrics, time_ephemeris, track_dependency
+from backend.profile_store import (
+    PROFILE_PROJECTIONS,
+    ensure_profile_indexes,
+    extract_profile_payload,
+    find_profile,
+    save_profile,
+    serialise_profile,
+    validate_profile_payload,
+)
+from backend.profile_transfer import init_app as init_profile_transfer
+from backend.profiling import init_app as init_profiling
+from backend.sky import SkyService, init_app as init_sky
+from backend.prompt_codec import CHART_LEGEND, encode_aspects, encode_chart
+from backend.textnorm import normalize as normalize_text, split_sentences
+from backend.token_budget import count_prompt_tokens, fit_history
+from backend.tracing import init_app as init_tracing, span, traced
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s in %(module)s: %(message)s")
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+init_tracing(app)
+init_metrics(app)
+init_profiling(app)
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173")
 
 CORS(
     app,
     origins=[origin.strip() for origin in ALLOWED_ORIGINS.split(",") if origin.strip()],
     supports_credentials=True,
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "Prefer"],
     methods=["GET", "POST", "PUT", "OPTIONS"],
 )
 
@@ -70,19 +102,38 @@ except Exception as exc:  # pragma: no cover - depends on runtime environment
     logger.error("Failed to set Swiss Ephemeris path: %s", exc)
 
 OPENCAGE_KEY = os.getenv("OPENCAGE_API_KEY")
+OPENCAGE_API_URL = os.getenv("OPENCAGE_API_URL", "https://api.opencagedata.com/geocode/v1/json")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     logger.warning("⚠️ GROQ_API_KEY not found in environment.")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_CALL_TIMEOUT_SECONDS = env_float("GROQ_CALL_TIMEOUT_SECONDS", 15.0)
+INTERPRETATION_BUDGET_SECONDS = env_float("INTERPRETATION_BUDGET_SECONDS", 20.0)
+GROQ_LATENCY = LatencyTracker()
+GROQ_BREAKER = circuit_breaker("groq")
+OPENCAGE_BREAKER = circuit_breaker("opencage")
+# Cities do not move; the TTL only bounds how long a bad geocode can stick.
+GEOCODE_CACHE_TTL_SECONDS = env_float("GEOCODE_CACHE_TTL_SECONDS", 30 * 86400.0)
+CHART_CACHE_TTL_SECONDS = env_float("CHART_CACHE_TTL_SECONDS", 86400.0)
+CHAT_HISTORY_TOKEN_BUDGET = env_int("CHAT_HISTORY_TOKEN_BUDGET", 3000)
+CHAT_SUMMARY_TOKEN_BUDGET = env_int("CHAT_SUMMARY_TOKEN_BUDGET", 200)
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "astrologi_ai")
 PROFILE_COLLECTION_NAME = os.getenv("MONGO_PROFILE_COLLECTION", "profiles")
+CHART_COLLECTION_NAME = os.getenv("MONGO_CHART_COLLECTION", "charts")
+HISTORY_COLLECTION_NAME = os.getenv("MONGO_HISTORY_COLLECTION", "interpretations")
+DAILY_INSIGHT_COLLECTION_NAME = os.getenv("MONGO_DAILY_INSIGHT_COLLECTION", "daily_insights")
+JOB_COLLECTION_NAME = os.getenv("MONGO_JOB_COLLECTION", "jobs")
+# Bump when compute_natal_chart's output changes so stored charts are recomputed.
+CHART_ENGINE_REVISION = 1
+CHART_ENGINE_VERSION = f"natal-{CHART_ENGINE_REVISION}+swe-{swe.version}"
 
 if MONGO_URI:
     try:
-        ensure_mongo_connection(retries=2, delay=0.8, revalidate=True)
+        mongo_client = ensure_mongo_connection(retries=2, delay=0.8, revalidate=True)
         logger.info("MongoDB bağlantısı başarıyla kuruldu.")
+        ensure_profile_indexes(mongo_client[MONGO_DB_NAME][PROFILE_COLLECTION_NAME])
     except MongoUnavailable as exc:
         logger.warning("MongoDB başlangıç bağlantısı kurulamadı: %s", exc)
 else:
@@ -133,22 +184,53 @@ def get_profile_collection():
     if not MONGO_URI:
         raise MongoUnavailable("MongoDB yapılandırılmadı.")
     client = ensure_mongo_connection(retries=3, delay=1.0, revalidate=False)
-    return client[MONGO_DB_NAME][PROFILE_COLLECTION_NAME]
-
-
-def serialise_profile(document: Mapping[str, Any]) -> Dict[str, Any]:
-    """Convert MongoDB document into JSON-serialisable dict."""
-    result = dict(document)
-    identifier = result.pop("_id", None)
-    if identifier is not None:
-        result["id"] = str(identifier)
-    created_at = result.get("created_at")
-    if isinstance(created_at, datetime):
-        result["created_at"] = created_at.isoformat()
-    updated_at = result.get("updated_at")
-    if isinstance(updated_at, datetime):
-        result["updated_at"] = updated_at.isoformat()
-    return result
+    collection = client[MONGO_DB_NAME][PROFILE_COLLECTION_NAME]
+    ensure_profile_indexes(collection)
+    return collection
+
+
+def get_chart_collection():
+    """Return the MongoDB collection for computed charts."""
+    if not MONGO_URI:
+        raise MongoUnavailable("MongoDB yapılandırılmadı.")
+    client = ensure_mongo_connection(retries=3, delay=1.0, revalidate=False)
+    return client[MONGO_DB_NAME][CHART_COLLECTION_NAME]
+
+
+def get_history_collection():
+    """Return the MongoDB collection for interpretation history."""
+    if not MONGO_URI:
+        raise MongoUnavailable("MongoDB yapılandırılmadı.")
+    client = ensure_mongo_connection(retries=3, delay=1.0, revalidate=False)
+    return client[MONGO_DB_NAME][HISTORY_COLLECTION_NAME]
+
+
+def get_daily_insight_collection():
+    """Return the MongoDB collection for pregenerated daily insights."""
+    if not MONGO_URI:
+        raise MongoUnavailable("MongoDB yapılandırılmadı.")
+    client = ensure_mongo_connection(retries=3, delay=1.0, revalidate=False)
+    return client[MONGO_DB_NAME][DAILY_INSIGHT_COLLECTION_NAME]
+
+
+def get_job_collection():
+    """Return the MongoDB collection for async job state and results."""
+    if not MONGO_URI:
+        raise MongoUnavailable("MongoDB yapılandırılmadı.")
+    client = ensure_mongo_connection(retries=3, delay=1.0, revalidate=False)
+    return client[MONGO_DB_NAME][JOB_COLLECTION_NAME]
+
+
+init_profile_transfer(app, get_profile_collection)
+cache_backend = build_cache()
+geocode_cache = CacheNamespace(cache_backend, "geocode", ttl=GEOCODE_CACHE_TTL_SECONDS)
+chart_store = ChartStore(
+    get_chart_collection,
+    CHART_ENGINE_VERSION,
+    cache=CacheNamespace(cache_backend, "chart", ttl=CHART_CACHE_TTL_SECONDS),
+)
+history_store = HistoryStore(get_history_collection)
+
 
 PLANETS = {
     "Sun": swe.SUN,
@@ -303,6 +385,7 @@ class AIError(Exception):
     """Raised when AI interpretation fails."""
 
 
+@traced("groq")
 def call_groq(messages: Sequence[Dict[str, str]], *, temperature: float = 0.6, max_tokens: int = 600) -> str:
     """Send a chat completion request to Groq and return the model response."""
 
@@ -322,7 +405,12 @@ def call_groq(messages: Sequence[Dict[str, str]], *, temperature: float = 0.6, m
     }
 
     try:
-        response = requests.post(GROQ_API_URL, json=payload, headers=headers, timeout=20)
+        with GROQ_BREAKER.guard() as guarded, track_dependency("groq") as call:
+            response = requests.post(GROQ_API_URL, json=payload, headers=headers, timeout=20)
+            call.observe_status(response.status_code)
+            guarded.observe_status(response.status_code)
+    except CircuitOpen as exc:
+        raise AIError(str(exc)) from exc
     except requests.RequestException as exc:  # pragma: no cover - network error
         raise AIError("Groq API isteği başarısız oldu.") from exc
 
@@ -357,7 +445,6 @@ def generate_ai_interpretation(chart_data: dict[str, Any] | str) -> str:
             chart_text = str(chart_data)
 
     prompt = f"You are an expert astrologer. Analyze this chart: {chart_text}"
-    url = "https://api.groq.com/openai/v1/chat/completions"
     headers = {
         "Authorization": f"Bearer {GROQ_API_KEY}",
         "Content-Type": "application/json",
@@ -374,10 +461,14 @@ def generate_ai_interpretation(chart_data: dict[str, Any] | str) -> str:
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
+        with GROQ_BREAKER.guard() as guarded, track_dependency("groq"):
+            response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=30)
+            guarded.observe_status(response.status_code)
+            response.raise_for_status()
         result = response.json()
         return result.get("choices", [{}])[0].get("message", {}).get("content", "AI interpretation unavailable.")
+    except CircuitOpen as exc:
+        logger.info("Groq skipped: %s", exc)
     except requests.RequestException as exc:
         logger.warning("Groq request failed: %s", exc)
     except Exception as exc:  # pragma: no cover - defensive
@@ -385,11 +476,45 @@ def generate_ai_interpretation(chart_data: dict[str, Any] | str) -> str:
     return "AI interpretation unavailable."
 
 
-def get_ai_interpretation(chart_data: Mapping[str, Any]) -> Dict[str, Any]:
-    """Generate a rich interpretation by blending archetype themes with Groq output."""
+def _post_groq_hedged(payload: Mapping[str, Any], headers: Mapping[str, str], *, deadline: Deadline) -> requests.Response:
+    """POST a chat completion within ``deadline``, hedging slow attempts.
+
+    Raises :class:`CircuitOpen` without calling Groq while its breaker is open.
+    """
+
+    def attempt(timeout: float) -> requests.Response:
+        with GROQ_BREAKER.guard() as guarded, track_dependency("groq"):
+            response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=timeout)
+            guarded.observe_status(response.status_code)
+            response.raise_for_status()
+        return response
+
+    GROQ_BREAKER.check()
+
+    return hedged_call(
+        attempt,
+        deadline=deadline,
+        tracker=GROQ_LATENCY,
+        per_call_timeout=GROQ_CALL_TIMEOUT_SECONDS,
+    )
+
+
+def get_ai_interpretation(
+    chart_data: Mapping[str, Any],
+    *,
+    deadline: Deadline | None = None,
+    analysis: ChartAnalysis | None = None,
+) -> Dict[str, Any]:
+    """Generate a rich interpretation by blending archetype themes with Groq output.
+
+    Raises :class:`CircuitOpen` when Groq's breaker is open, so the caller can
+    go straight to the deterministic narrative.
+    """
+
+    deadline = deadline or Deadline(INTERPRETATION_BUDGET_SECONDS)
 
     try:
-        archetype = extract_archetype_data(chart_data)
+        archetype = extract_archetype_data(chart_data, analysis=analysis)
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("Archetype extraction failed: %s", exc)
         fallback_ai = {
@@ -447,7 +572,6 @@ def get_ai_interpretation(chart_data: Mapping[str, Any]) -> Dict[str, Any]:
         "Her alanı Türkçe doldur; temaları doğal dile çevir.\n"
     )
 
-    url = "https://api.groq.com/openai/v1/chat/completions"
     headers = {
         "Authorization": f"Bearer {groq_api_key}",
         "Content-Type": "application/json",
@@ -462,20 +586,26 @@ def get_ai_interpretation(chart_data: Mapping[str, Any]) -> Dict[str, Any]:
         "temperature": 0.8,
     }
 
-    print("Sending to Groq with model:", groq_model)
-    print("Key prefix:", groq_api_key[:8])
-    payload_json = json.dumps(payload, ensure_ascii=False)
-    print("Payload preview:", payload_json[:300])
-    logger.debug("Groq prompt payload: %s", payload_json)
-
-    time.sleep(0.5)
+    log_event(
+        logger,
+        "groq_request",
+        level=logging.DEBUG,
+        kind="fallback",
+        model=groq_model,
+        payload=payload,
+    )
 
     content = ""
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        print("Groq response status:", response.status_code)
-        print("Groq response preview:", response.text[:500])
-        response.raise_for_status()
+        response = _post_groq_hedged(payload, headers, deadline=deadline)
+        log_event(
+            logger,
+            "groq_response",
+            level=logging.DEBUG,
+            kind="fallback",
+            status=response.status_code,
+            preview=lazy(lambda: response.text[:500]),
+        )
         data = response.json()
         choices = data.get("choices") if isinstance(data, dict) else None
         if choices and isinstance(choices, list) and choices:
@@ -484,22 +614,20 @@ def get_ai_interpretation(chart_data: Mapping[str, Any]) -> Dict[str, Any]:
         else:
             logger.warning("Groq response missing choices array.")
             content = ""
+    except (DeadlineExceeded, CircuitOpen):
+        raise
     except Exception as exc:  # pylint: disable=broad-except
-        print("Groq API call failed:", exc)
-        traceback.print_exc()
         logger.exception("Groq API call failed: %s", exc)
         return build_result(fallback_ai)
 
-    print("RAW GROQ OUTPUT:", content)
-    logger.debug("Groq content raw: %s", content)
+    log_event(logger, "groq_output", level=logging.DEBUG, kind="fallback", content=content)
 
     parsed = None
     if content:
         try:
             parsed = json.loads(content)
-            print("PARSE SUCCESS:", True)
         except json.JSONDecodeError:
-            print("PARSE SUCCESS:", False)
+            log_event(logger, "groq_parse_failed", level=logging.WARNING, kind="fallback", length=len(content))
             headline_match = re.search(r"(?i)(headline|title)[:\-]\s*(.*)", content)
             summary_match = re.search(r"(?i)(summary|interpretation)[:\-]\s*(.*)", content)
             advice_match = re.search(r"(?i)(advice|guidance)[:\-]\s*(.*)", content)
@@ -514,7 +642,7 @@ def get_ai_interpretation(chart_data: Mapping[str, Any]) -> Dict[str, Any]:
                 "advice": advice,
             }
     else:
-        print("PARSE SUCCESS:", False)
+        log_event(logger, "groq_parse_failed", level=logging.WARNING, kind="fallback", length=0)
 
     if not parsed:
         parsed = {
@@ -540,8 +668,20 @@ def get_ai_interpretation(chart_data: Mapping[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _request_refined_interpretation(archetype: Mapping[str, Any], chart_data: Mapping[str, Any]) -> Dict[str, str]:
-    """Call Groq to craft a poetic interpretation informed by extracted themes."""
+def _request_refined_interpretation(
+    archetype: Mapping[str, Any],
+    chart_data: Mapping[str, Any],
+    *,
+    deadline: Deadline | None = None,
+    chart_id: str | None = None,
+) -> Dict[str, str]:
+    """Call Groq to craft a poetic interpretation informed by extracted themes.
+
+    ``chart_id`` lets the compact chart encoding be reused across requests.
+    :class:`CircuitOpen` propagates like :class:`DeadlineExceeded`.
+    """
+
+    deadline = deadline or Deadline(INTERPRETATION_BUDGET_SECONDS)
 
     groq_api_key = os.getenv("GROQ_API_KEY")
     if not groq_api_key:
@@ -555,12 +695,13 @@ def _request_refined_interpretation(archetype: Mapping[str, Any], chart_data: Ma
         "dominant_axis": archetype.get("dominant_axis"),
         "notable_aspects": archetype.get("notable_aspects", []),
         "behavior_patterns": archetype.get("behavior_patterns", []),
-        "chart_data": chart_data,
     }
     user_prompt = (
         f"{AI_PROMPT}\n\n"
         "Verilen bağlamı kullanarak şemaya sadık kal:\n"
-        f"{json.dumps(context_payload, ensure_ascii=False)}"
+        f"{json.dumps(context_payload, ensure_ascii=False)}\n"
+        f"{CHART_LEGEND}\n"
+        f"{encode_chart(chart_data, cache_key=chart_id)}"
     )
 
     try:
@@ -568,13 +709,9 @@ def _request_refined_interpretation(archetype: Mapping[str, Any], chart_data: Ma
             "Authorization": f"Bearer {groq_api_key}",
             "Content-Type": "application/json",
         }
-        key_preview = (groq_api_key or "")[:10]
-        print("🔮 Sending request to Groq with model:", GROQ_MODEL)
-        print("🔑 Using key starts with:", key_preview)
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json={
+        log_event(logger, "groq_request", level=logging.DEBUG, kind="refined", model=GROQ_MODEL)
+        response = _post_groq_hedged(
+            {
                 "model": GROQ_MODEL,
                 "messages": [
                     {"role": "system", "content": system_prompt},
@@ -583,12 +720,14 @@ def _request_refined_interpretation(archetype: Mapping[str, Any], chart_data: Ma
                 "max_tokens": 400,
                 "temperature": 0.8,
             },
-            timeout=30,
+            headers,
+            deadline=deadline,
         )
-        response.raise_for_status()
-        logger.info("Groq model response: %s", response.status_code)
+        log_event(logger, "groq_response", kind="refined", sample=0.1, status=response.status_code)
         data = response.json()
         ai_message = data["choices"][0]["message"]["content"]
+    except (DeadlineExceeded, CircuitOpen):
+        raise
     except Exception as exc:  # pylint: disable=broad-except
         logger.warning("Groq request failed: %s", exc)
         if hasattr(exc, "response") and getattr(exc, "response") is not None:
@@ -610,34 +749,33 @@ def _request_refined_interpretation(archetype: Mapping[str, Any], chart_data: Ma
         "advice": advice,
     }
 
-def chart_to_summary(chart: Mapping[str, Any]) -> str:
-    """Convert chart data into a textual summary for the AI assistant."""
+def _deterministic_interpretation(archetype: Mapping[str, Any]) -> Dict[str, str]:
+    """Compose an interpretation locally via ``call_ai_model`` when no LLM budget is left."""
 
-    location = chart.get("location", {})
-    lines = [
-        f"Konum: {location.get('city', 'Bilinmeyen')} | Zaman Dilimi: {chart.get('timezone', 'N/A')} | Doğum: {chart.get('birth_datetime', 'N/A')}",
-        "Gezegenler:",
-    ]
+    prompt = "\n".join(
+        [
+            f"Themes: {', '.join(archetype.get('core_themes') or [])}",
+            f"Tone: {archetype.get('story_tone') or ''}",
+            f"Axis: {archetype.get('dominant_axis') or ''}",
+            f"Focus: {archetype.get('life_focus') or ''}",
+        ]
+    )
+    return {
+        "headline": "Kozmik Yorum",
+        "summary": call_ai_model(prompt),
+        "advice": DEFAULT_ACTION_FALLBACKS[0],
+    }
 
-    planets = chart.get("planets", {})
-    for planet, details in planets.items():
-        lines.append(
-            f"- {planet}: {details.get('sign', 'N/A')} burcunda, {details.get('house', '?')} evde (uzunluk {details.get('longitude')}°)"
-        )
 
-    houses = chart.get("houses")
-    if isinstance(houses, list) and houses:
-        lines.append("Ev Başlangıçları:" )
-        lines.append(", ".join(f"Ev {idx + 1}: {angle}°" for idx, angle in enumerate(houses)))
+def chart_to_summary(chart: Mapping[str, Any], *, chart_id: str | None = None) -> str:
+    """Convert chart data into a compact textual summary for the AI assistant.
 
-    angles = chart.get("angles", {})
-    if angles:
-        lines.append(
-            "Özel Açılar: "
-            + ", ".join(f"{name.title()}: {value}°" for name, value in angles.items())
-        )
+    The summary uses the dense notation described by ``CHART_LEGEND``; prompts
+    that embed it should include the legend once.  Pass the stored
+    ``chart_id`` when known so the encoding is memoised.
+    """
 
-    return '\n'.join(lines)
+    return encode_chart(chart, cache_key=chart_id)
 
 
 def generate_chart_interpretation(chart: Mapping[str, Any], *, name: str | None = None) -> str:
@@ -650,6 +788,7 @@ def generate_chart_interpretation(chart: Mapping[str, Any], *, name: str | None
             [
                 "Aşağıda kullanıcının doğum haritası verileri bulunuyor.",
                 f"Kullanıcı adı: {name}" if name else None,
+                CHART_LEGEND,
                 summary,
                 "Lütfen Türkçe olarak, burçların anlamlarını, gezegenlerin evlerdeki etkilerini ve dikkat edilmesi gereken noktaları içeren detaylı fakat anlaşılır bir yorum yaz.",
             ],
@@ -669,19 +808,15 @@ def generate_synastry_interpretation(chart1: Mapping[str, Any], chart2: Mapping[
 
     summary = '\n'.join(
         [
+            CHART_LEGEND,
             "Kişi 1 Haritası:",
             chart_to_summary(chart1),
             "",
             "Kişi 2 Haritası:",
             chart_to_summary(chart2),
             "",
-            "Önemli Açılar:",
-            '\n'.join(
-                f"- {item.get('planet1')} & {item.get('planet2')}: {item.get('aspect')} (orb {item.get('orb')}°)"
-                for item in aspects
-            )
-            if aspects
-            else "- Paylaşılan önemli açı bulunamadı.",
+            "Önemli Açılar (Kişi 1 gezegeni önce):",
+            encode_aspects(list(aspects)) if aspects else "- Paylaşılan önemli açı bulunamadı.",
         ]
     )
 
@@ -695,7 +830,18 @@ def generate_synastry_interpretation(chart1: Mapping[str, Any], chart2: Mapping[
 
     return call_groq(messages, temperature=0.65, max_tokens=600)
 
+@traced("geocode")
 def fetch_location(city: str) -> LocationData:
+    """Geocode ``city``, serving repeat lookups from ``geocode_cache``.
+
+    Cached cities keep resolving while OpenCage's breaker is open; anything
+    else fails fast with :class:`ApiError`.
+    """
+    cache_key = " ".join(city.split()).casefold()
+    return LocationData(**geocode_cache.get_or_set(cache_key, lambda: asdict(_request_location(city))))
+
+
+def _request_location(city: str) -> LocationData:
     if not OPENCAGE_KEY:
         raise ApiError("OPENCAGE_API_KEY not configured. Check your .env file.")
     params = {
@@ -706,7 +852,12 @@ def fetch_location(city: str) -> LocationData:
         "no_annotations": 0,
     }
     try:
-        response = requests.get("https://api.opencagedata.com/geocode/v1/json", params=params, timeout=10)
+        with OPENCAGE_BREAKER.guard() as guarded, track_dependency("opencage") as call:
+            response = requests.get(OPENCAGE_API_URL, params=params, timeout=10)
+            call.observe_status(response.status_code)
+            guarded.observe_status(response.status_code)
+    except CircuitOpen as exc:
+        raise ApiError(str(exc)) from exc
     except requests.RequestException as exc:
         raise ApiError("OpenCage request failed.") from exc
     if response.status_code >= 400:
@@ -817,6 +968,7 @@ def julian_day(utc_dt: datetime) -> float:
     return swe.julday(utc_dt.year, utc_dt.month, utc_dt.day, ut, swe.GREG_CAL)
 
 
+@traced("ephemeris_planets")
 def calc_planets(
     jd_ut: float,
     cusps: Sequence[float] | None = None,
@@ -902,12 +1054,14 @@ def calc_planets(
             }
 
             if planet_name == "Sun" and lon_float is not None:
-                logger.info(
-                    "☀️ Sun calculated successfully → lon=%.4f, lat=%s, dist=%s, speed=%s",
-                    lon_float,
-                    f"{lat_float:.4f}" if lat_float is not None else "None",
-                    f"{dist_float:.4f}" if dist_float is not None else "None",
-                    speed_float,
+                log_event(
+                    logger,
+                    "sun_calculated",
+                    level=logging.DEBUG,
+                    lon=round(lon_float, 4),
+                    lat=lat_float,
+                    dist=dist_float,
+                    speed=speed_float,
                 )
 
         except Exception as e:
@@ -950,6 +1104,7 @@ def calc_planets(
     return planets
 
 
+@traced("ephemeris_houses")
 def calc_houses(jd_ut: float, latitude: float, longitude: float) -> tuple[list[float], Dict[str, float]]:
     """Calculate Placidus houses and ensure ASC–House 1 alignment."""
     # Calculate Placidus houses
@@ -971,7 +1126,7 @@ def calc_houses(jd_ut: float, latitude: float, longitude: float) -> tuple[list[f
     if delta:
         logger.debug("Aligning house cusps with ASC. Shift=%.4f°", delta)
         houses = [(h + delta) % 360 for h in houses]
-    logger.info("ASC=%.4f°, House1=%.4f°", angles["ascendant"], houses[0])
+    log_event(logger, "houses_calculated", level=logging.DEBUG, asc=angles["ascendant"], house1=houses[0])
 
     return houses, angles
 
@@ -1005,6 +1160,9 @@ def normalize_degrees(value: float | None) -> float | None:
 
 LABEL_PREFIX_PATTERN = re.compile(r"^(?:[\s•·\-–—]*)\b(headline|summary|advice|challenge|struggle|gift|strength|lesson|shadow|insight|focus|theme|themes|story)\b[:\-–—]?\s*", re.IGNORECASE)
 SUMMARY_LABEL_PATTERN = re.compile(r"^(?P<label>[A-Za-zÇĞİÖŞÜçğıöşü\s]{2,24})[:\-–—]\s*(?P<body>.+)$")
+LEADING_BULLET_PATTERN = re.compile(r"^[•·\-\u2022]+\s*")
+SUMMARY_LINE_BREAK_PATTERN = re.compile(r"[\n•\u2022]+")
+REPEATED_SPACE_PATTERN = re.compile(r"\s{2,}")
 SUMMARY_LABEL_MAP = {
     "challenge": "Meydan okuman",
     "struggle": "Zorlandığın alan",
@@ -1024,7 +1182,7 @@ def strip_label_prefix(text: Any) -> str:
     if not isinstance(text, str):
         return ""
     cleaned = LABEL_PREFIX_PATTERN.sub("", text or "").strip()
-    cleaned = re.sub(r"^[•·\-\u2022]+\s*", "", cleaned)
+    cleaned = LEADING_BULLET_PATTERN.sub("", cleaned)
     return cleaned.strip()
 
 
@@ -1032,7 +1190,7 @@ def flatten_summary_text(text: Any, *, joiner: str = " ") -> str:
     if not isinstance(text, str):
         return ""
     segments: list[str] = []
-    for raw_line in re.split(r"[\n•\u2022]+", text):
+    for raw_line in SUMMARY_LINE_BREAK_PATTERN.split(text):
         line = raw_line.strip()
         if not line:
             continue
@@ -1057,14 +1215,14 @@ def flatten_summary_text(text: Any, *, joiner: str = " ") -> str:
         return clean_text(strip_label_prefix(text))
 
     combined = joiner.join(segments).strip()
-    combined = re.sub(r"\s{2,}", " ", combined)
+    combined = REPEATED_SPACE_PATTERN.sub(" ", combined)
     return clean_text(combined)
 
 
 def first_sentences(text: str, limit: int = 2) -> str:
     if not text:
         return ""
-    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    sentences = split_sentences(text.strip())
     if len(sentences) <= limit:
         return text.strip()
     return " ".join(sentences[:limit]).strip()
@@ -1189,11 +1347,7 @@ def build_card_payload(
     confidence: Any = None,
 ) -> Dict[str, Any]:
     narrative_text = limit_sentences(main, min_sentences=3, max_sentences=6) if main else ""
-    fragments = [
-        fragment.strip()
-        for fragment in re.split(r"(?<=[.!?])\s+", narrative_text)
-        if fragment.strip()
-    ]
+    fragments = list(split_sentences(narrative_text))
     filler_idx = 0
     while len(fragments) < 3 and filler_idx < len(DEFAULT_REASON_FALLBACKS):
         filler_sentence = clean_text(DEFAULT_REASON_FALLBACKS[filler_idx])
@@ -1241,10 +1395,7 @@ def build_life_card(
     ]
     sentences: list[str] = []
     for block in primary_texts:
-        cleaned_block = clean_text(strip_label_prefix(block))
-        if not cleaned_block:
-            continue
-        for piece in re.split(r"(?<=[.!?])\s+", cleaned_block):
+        for piece in normalize_text(strip_label_prefix(block)).sentences:
             piece_clean = clean_text(piece)
             if piece_clean and piece_clean not in sentences:
                 sentences.append(piece_clean)
@@ -1539,10 +1690,36 @@ def extract_birth_inputs(payload: Mapping[str, Any]) -> tuple[str, str, str] | t
 
 
 def build_natal_chart(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    return resolve_natal_chart(payload)[1]
+
+
+def _natal_chart_inputs(
+    payload: Mapping[str, Any],
+) -> tuple[str, str | None, str, Callable[[], Dict[str, Any]]]:
+    """Return the chart store key parts of ``payload`` and a function computing its chart."""
     city, date_value, time_value = extract_birth_inputs(payload)
 
-    location = fetch_location(city)
-    local_dt, utc_dt = parse_birth_datetime_components(date_value, time_value, location.timezone)
+    def compute() -> Dict[str, Any]:
+        location = fetch_location(city)
+        local_dt, utc_dt = parse_birth_datetime_components(date_value, time_value, location.timezone)
+        return compute_natal_chart(location, local_dt, utc_dt)
+
+    return date_value, time_value, city, compute
+
+
+def resolve_natal_chart(payload: Mapping[str, Any]) -> tuple[str | None, Dict[str, Any]]:
+    """Return ``(chart_id, chart)`` from the chart store, computing it on a miss."""
+    return chart_store.get_or_compute(*_natal_chart_inputs(payload))
+
+
+def warm_natal_chart(payload: Mapping[str, Any]) -> tuple[str | None, bool]:
+    """Return ``(chart_id, stored)``, computing a missing chart in the background."""
+    return chart_store.warm(*_natal_chart_inputs(payload))
+
+
+def compute_natal_chart(location: LocationData, local_dt: datetime, utc_dt: datetime) -> Dict[str, Any]:
+    """Run the ephemeris and aspect calculations for an already geocoded birth."""
+
     jd_ut = julian_day(utc_dt)
 
     try:
@@ -1550,10 +1727,11 @@ def build_natal_chart(payload: Mapping[str, Any]) -> Dict[str, Any]:
     except Exception as exc:  # pragma: no cover - defensive
         logger.debug("Failed to set topocentric coordinates: %s", exc)
 
-    house_list, angles = calc_houses(jd_ut, location.latitude, location.longitude)
-    cusp_sequence = [0.0, *house_list]
+    with time_ephemeris():
+        house_list, angles = calc_houses(jd_ut, location.latitude, location.longitude)
+        cusp_sequence = [0.0, *house_list]
 
-    planets: Dict[str, Dict[str, Any]] = calc_planets(jd_ut, cusp_sequence, angles=angles)
+        planets: Dict[str, Dict[str, Any]] = calc_planets(jd_ut, cusp_sequence, angles=angles)
 
     houses: Dict[str, Any] = {
         str(index + 1): round((value % 360), 4) for index, value in enumerate(house_list)
@@ -1569,7 +1747,29 @@ def build_natal_chart(payload: Mapping[str, Any]) -> Dict[str, Any]:
             "minute": int(round((degree_in_sign - int(degree_in_sign)) * 60)),
         }
 
-    # Aspects
+    aspects = calc_aspects(planets, angles)
+
+    return {
+        "location": {
+            "city": location.label,
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "timezone": location.timezone,
+        },
+        "birth_datetime": local_dt.isoformat(),
+        "timezone": location.timezone,
+        "planets": planets,
+        "houses": houses,
+        "house_positions": houses_detailed,
+        "angles": angles,
+        "aspects": aspects,
+    }
+
+
+@traced("aspects")
+def calc_aspects(planets: Mapping[str, Mapping[str, Any]], angles: Mapping[str, Any]) -> list[Dict[str, Any]]:
+    """Find natal aspects between all bodies and the four chart angles."""
+
     aspect_definitions = [
         ("Conjunction", 0, 8),
         ("Sextile", 60, 6),
@@ -1619,21 +1819,7 @@ def build_natal_chart(payload: Mapping[str, Any]) -> Dict[str, Any]:
                     )
                     break
 
-    return {
-        "location": {
-            "city": location.label,
-            "latitude": location.latitude,
-            "longitude": location.longitude,
-            "timezone": location.timezone,
-        },
-        "birth_datetime": local_dt.isoformat(),
-        "timezone": location.timezone,
-        "planets": planets,
-        "houses": houses,
-        "house_positions": houses_detailed,
-        "angles": angles,
-        "aspects": aspects,
-    }
+    return aspects
 
 
 def diff_angle(lon1: float, lon2: float) -> float:
@@ -1641,17 +1827,6 @@ def diff_angle(lon1: float, lon2: float) -> float:
     return diff if diff <= 180 else 360 - diff
 
 
-def calculate_chart_from_birth_details(date_value: str, time_value: str, city_value: str) -> Dict[str, Any]:
-    """Utility used by interpretation endpoint when only birth inputs are provided."""
-
-    payload = {
-        "date": (date_value or "").strip(),
-        "time": (time_value or "").strip(),
-        "city": (city_value or "").strip(),
-    }
-    return build_natal_chart(payload)
-
-
 def calculate_aspects(planets_a: Mapping[str, Dict[str, Any]], planets_b: Mapping[str, Dict[str, Any]]) -> list[Dict[str, Any]]:
     aspects: list[Dict[str, Any]] = []
     for name_a, data_a in planets_a.items():
@@ -1676,7 +1851,7 @@ def _handle_natal_chart_request():
         payload = request.get_json(force=True) or {}
         chart = build_natal_chart(payload)
         summary = chart_to_summary(chart)
-        chart["interpretation"] = generate_ai_interpretation(summary)
+        chart["interpretation"] = generate_ai_interpretation(f"{CHART_LEGEND}\n{summary}")
         chart["formatted_positions"] = _build_formatted_planet_positions(chart)
         chart["formatted_houses"] = _build_formatted_house_positions(chart)
         chart["formatted_aspects"] = _build_formatted_aspects(chart)
@@ -1749,13 +1924,28 @@ def _handle_chat_request():
             system_messages.append(
                 {
                     "role": "system",
-                    "content": "Kullanıcı doğum haritası verileri:\n" + chart_to_summary(chart_context),
+                    "content": "Kullanıcı doğum haritası verileri:\n"
+                    + f"{CHART_LEGEND}\n"
+                    + chart_to_summary(chart_context),
                 }
             )
 
+        history, dropped_turns = fit_history(
+            history,
+            budget=CHAT_HISTORY_TOKEN_BUDGET,
+            summary_budget=CHAT_SUMMARY_TOKEN_BUDGET,
+        )
         messages = [*system_messages, *history, {"role": "user", "content": message}]
         temperature = float(payload.get("temperature", 0.6))
         max_tokens = int(payload.get("maxTokens", 600))
+        log_event(
+            logger,
+            "chat_prompt",
+            tokens=lazy(count_prompt_tokens, messages),
+            history_messages=len(history),
+            dropped_turns=dropped_turns,
+            conversation=payload.get("conversationId") or "-",
+        )
         reply = call_groq(messages, temperature=temperature, max_tokens=max_tokens)
         return jsonify({"reply": reply})
     except AIError as exc:
@@ -1766,54 +1956,6 @@ def _handle_chat_request():
         return jsonify({"error": str(exc)}), 400
 
 
-def _normalise_chart_payload(chart_data: Any) -> Dict[str, Any] | None:
-    if isinstance(chart_data, dict):
-        return dict(chart_data)
-    if isinstance(chart_data, str):
-        try:
-            parsed = json.loads(chart_data)
-            if isinstance(parsed, dict):
-                return parsed
-        except json.JSONDecodeError:
-            return None
-    return None
-
-
-def _extract_profile_payload(payload: Mapping[str, Any]) -> Dict[str, Any]:
-    first_name = str(payload.get("firstName") or "").strip()
-    last_name = str(payload.get("lastName") or "").strip()
-    email = str(payload.get("email") or "").strip().lower()
-
-    profile_payload: Dict[str, Any] = {
-        "firstName": first_name,
-        "lastName": last_name,
-        "email": email,
-        "date": payload.get("date"),
-        "time": payload.get("time"),
-        "city": payload.get("city"),
-        "chart": _normalise_chart_payload(payload.get("chart")),
-        "updated_at": datetime.utcnow(),
-    }
-    return profile_payload
-
-
-def _validate_profile_payload(profile_payload: Mapping[str, Any]) -> list[str]:
-    errors = []
-    if not profile_payload.get("firstName"):
-        errors.append("firstName gereklidir.")
-    if not profile_payload.get("lastName"):
-        errors.append("lastName gereklidir.")
-    email = profile_payload.get("email")
-    if not email:
-        errors.append("email gereklidir.")
-    elif "@" not in str(email):
-        errors.append("Geçerli bir email giriniz.")
-    for key in ("date", "time", "city"):
-        if not profile_payload.get(key):
-            errors.append(f"{key} alanı gereklidir.")
-    return errors
-
-
 @app.route("/api/profile", methods=["GET", "OPTIONS"])
 def get_profile():
     if request.method == "OPTIONS":
@@ -1822,10 +1964,13 @@ def get_profile():
     email = request.args.get("email", "").strip().lower()
     if not email:
         return jsonify({"error": "email parametresi gereklidir."}), 400
+    view = request.args.get("fields", "full").strip().lower() or "full"
+    if view not in PROFILE_PROJECTIONS:
+        return jsonify({"error": f"fields parametresi şunlardan biri olmalı: {', '.join(PROFILE_PROJECTIONS)}."}), 400
 
     try:
         collection = get_profile_collection()
-        document = collection.find_one({"email": email})
+        document = find_profile(collection, email, view=view)
     except MongoUnavailable as exc:
         logger.warning("Mongo unavailable during profile fetch: %s", exc)
         return jsonify({"error": str(exc)}), 503
@@ -1836,9 +1981,19 @@ def get_profile():
     if not document:
         return jsonify({"error": "Profil bulunamadı."}), 404
 
+    if view == "full":
+        document = _attach_profile_chart(document)
     return jsonify(serialise_profile(document)), 200
 
 
+def _attach_profile_chart(document: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Inline the stored chart referenced by ``chart_id`` for API responses."""
+    chart_id = document.get("chart_id")
+    if not chart_id or document.get("chart"):
+        return document
+    return {**document, "chart": chart_store.get(chart_id)}
+
+
 @app.route("/api/profile", methods=["POST", "PUT", "OPTIONS"])
 def upsert_profile():
     if request.method == "OPTIONS":
@@ -1848,22 +2003,29 @@ def upsert_profile():
     if not isinstance(payload, Mapping):
         return jsonify({"error": "Geçersiz JSON yükü."}), 400
 
-    profile_payload = _extract_profile_payload(payload)
-    errors = _validate_profile_payload(profile_payload)
+    profile_payload = extract_profile_payload(payload)
+    errors = validate_profile_payload(profile_payload)
     if errors:
         return jsonify({"error": " ".join(errors)}), 400
 
+    # Reference the server-computed chart instead of embedding the client's copy.
+    # Saving never waits on geocoding or the ephemeris: a missing chart is
+    # computed in the background and the client copy is kept until it exists.
+    try:
+        chart_id, stored = warm_natal_chart(profile_payload)
+    except Exception as exc:  # pylint: disable=broad-except
+        log_event(logger, "profile_chart_unresolved", level=logging.WARNING, error=str(exc))
+        chart_id, stored = None, False
+    # Only a server-derived id is stored on a client save.
+    profile_payload.pop("chart_id", None)
+    if chart_id:
+        profile_payload["chart_id"] = chart_id
+        if stored:
+            profile_payload["chart"] = None
+
     try:
         collection = get_profile_collection()
-        updated_document = collection.find_one_and_update(
-            {"email": profile_payload["email"]},
-            {
-                "$set": profile_payload,
-                "$setOnInsert": {"created_at": datetime.utcnow()},
-            },
-            upsert=True,
-            return_document=ReturnDocument.AFTER,
-        )
+        updated_document = save_profile(collection, profile_payload)
     except MongoUnavailable as exc:
         logger.warning("Profile save skipped - Mongo unavailable: %s", exc)
         return jsonify({"error": str(exc)}), 503
@@ -1872,7 +2034,7 @@ def upsert_profile():
         return jsonify({"error": "Profil kaydedilemedi."}), 500
 
     status_code = 200 if request.method == "PUT" else 200
-    return jsonify(serialise_profile(updated_document)), status_code
+    return jsonify(serialise_profile(_attach_profile_chart(updated_document))), status_code
 
 
 @app.route("/interpretation", methods=["POST", "OPTIONS"])
@@ -1883,106 +2045,160 @@ def interpretation():
 
     payload = request.get_json(silent=True)
     if not isinstance(payload, Mapping):
-        logger.warning("Interpretation endpoint received invalid JSON payload: %s", payload)
+        log_event(
+            logger, "interpretation_invalid_payload", level=logging.WARNING, payload_type=type(payload).__name__
+        )
         return jsonify({"error": "Invalid JSON payload."}), 400
 
+    deadline = Deadline(INTERPRETATION_BUDGET_SECONDS)
     chart_data = payload.get("chart_data")
     alt_strategy = payload.get("alt_strategy")
+    chart_id = None
 
     if not isinstance(chart_data, Mapping):
         birth_date = payload.get("birth_date") or payload.get("date")
         birth_time = payload.get("birth_time") or payload.get("time")
         birth_place = payload.get("birth_place") or payload.get("city")
         if not all((birth_date, birth_time, birth_place)):
-            logger.warning("Interpretation endpoint missing chart_data and birth inputs: %s", payload)
+            log_event(
+                logger, "interpretation_missing_inputs", level=logging.WARNING, keys=sorted(map(str, payload))
+            )
             return jsonify({
                 "error": "chart_data must be provided as an object OR birth_date/time/place must be supplied.",
             }), 400
         try:
-            chart_data = calculate_chart_from_birth_details(birth_date, birth_time, birth_place)
+            chart_id, chart_data = resolve_natal_chart(
+                {"date": str(birth_date).strip(), "time": str(birth_time).strip(), "city": str(birth_place).strip()}
+            )
         except Exception as exc:  # pragma: no cover - network/location failures
             logger.exception("Failed to build chart from inputs")
             return jsonify({"error": f"Failed to calculate chart: {exc}"}), 500
 
     chart_dict = dict(chart_data)
+    axis_scores = payload.get("axis_scores") if isinstance(payload.get("axis_scores"), Mapping) else {}
+    history_key = interpretation_key(chart_id or chart_fingerprint(chart_dict), alt_strategy, axis_scores)
+    profile_id = _history_profile_id(payload.get("email"))
+    if not payload.get("refresh"):
+        with span("history_lookup"):
+            previous = history_store.find_recent(history_key)
+        if previous is not None:
+            if profile_id and previous.get("profile_id") != profile_id:
+                history_store.record(
+                    profile_id=profile_id,
+                    chart_key=history_key,
+                    strategy=alt_strategy,
+                    source=previous["source"],
+                    response=previous["response"],
+                )
+            body = {**previous["response"], "history_id": str(previous["_id"])}
+            return jsonify(body), 200, {"X-Interpretation-Source": "history"}
 
     try:
-        archetype = generate_full_archetype_report(chart_dict)
+        analysis = ChartAnalysis(chart_dict)
+        archetype = generate_full_archetype_report(chart_dict, analysis=analysis)
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("Failed to extract archetype data")
         return jsonify({"error": "Failed to extract archetype data."}), 500
 
     life_narrative = archetype.get("life_narrative")
     if not life_narrative:
-        life_layer = integrate_life_expression(chart_dict, archetype_data=archetype)
+        life_layer = integrate_life_expression(chart_dict, archetype_data=archetype, analysis=analysis)
         archetype.update(life_layer)
         life_narrative = life_layer.get("life_narrative")
 
     alternate_narrative = None
     if isinstance(alt_strategy, str):
-        alt_layer = integrate_life_expression(chart_dict, archetype_data=archetype, strategy=alt_strategy)
+        alt_layer = integrate_life_expression(
+            chart_dict, archetype_data=archetype, strategy=alt_strategy, analysis=analysis
+        )
         alternate_narrative = alt_layer.get("life_narrative")
         if alternate_narrative:
             archetype.update(alt_layer)
             life_narrative = alternate_narrative
 
+    interpretation_source = "refined"
+    groq_available = True
     try:
-        ai_result = _request_refined_interpretation(archetype, chart_dict)
+        with span("groq_refined"):
+            ai_result = _request_refined_interpretation(
+                archetype, chart_dict, deadline=deadline, chart_id=chart_id
+            )
+    except DeadlineExceeded:
+        ai_result = None
+    except CircuitOpen as exc:
+        logger.info("Skipping Groq: %s", exc)
+        ai_result = None
+        groq_available = False
     except AIError as exc:
         logger.error("Groq interpretation error: %s", exc)
-        ai_result = get_ai_interpretation(chart_dict)
+        ai_result = None
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("Unexpected interpretation failure")
-        ai_result = get_ai_interpretation(chart_dict)
-
-    ai_payload = normalize_ai_payload(ai_result)
-    categories = build_interpretation_categories(archetype, ai_payload)
-
-    cards: Dict[str, Any] = {}
-    life_card = build_life_card(ai_payload, life_narrative, archetype)
-    if life_card:
-        cards["life"] = life_card
+        ai_result = None
 
-    career_reasons = []
-    life_focus = archetype.get("life_focus")
-    story_tone = archetype.get("story_tone")
-    if isinstance(life_focus, str) and life_focus.strip():
-        career_reasons.append(f"Odak: {life_focus.strip()}")
-    if isinstance(story_tone, str) and story_tone.strip():
-        career_reasons.append(f"Ton: {story_tone.strip()}")
-    career_card = build_category_card(
-        categories.get("career") if isinstance(categories, Mapping) else None,
-        default_title="İş & Amaç",
-        extra_reasons=career_reasons,
-    )
-    if career_card:
-        cards["career"] = career_card
-
-    spiritual_reasons = []
-    dominant_axis = archetype.get("dominant_axis")
-    if isinstance(dominant_axis, str) and dominant_axis.strip():
-        spiritual_reasons.append(f"Öne çıkan eksen: {dominant_axis.strip()}")
-    spiritual_card = build_category_card(
-        categories.get("spiritual") if isinstance(categories, Mapping) else None,
-        default_title="Ruhsal Akış",
-        extra_reasons=spiritual_reasons,
-    )
-    if spiritual_card:
-        cards["spiritual"] = spiritual_card
+    if ai_result is None and groq_available and not deadline.expired:
+        interpretation_source = "fallback"
+        try:
+            with span("groq_fallback"):
+                ai_result = get_ai_interpretation(chart_dict, deadline=deadline, analysis=analysis)
+        except (DeadlineExceeded, CircuitOpen):
+            ai_result = None
+
+    if ai_result is None:
+        if groq_available:
+            logger.warning("Interpretation budget of %.1fs exhausted; serving deterministic narrative.", deadline.budget)
+        interpretation_source = "deterministic"
+        ai_result = _deterministic_interpretation(archetype)
+
+    with span("cards"):
+        ai_payload = normalize_ai_payload(ai_result)
+        categories = build_interpretation_categories(archetype, ai_payload)
+
+        cards: Dict[str, Any] = {}
+        life_card = build_life_card(ai_payload, life_narrative, archetype)
+        if life_card:
+            cards["life"] = life_card
+
+        career_reasons = []
+        life_focus = archetype.get("life_focus")
+        story_tone = archetype.get("story_tone")
+        if isinstance(life_focus, str) and life_focus.strip():
+            career_reasons.append(f"Odak: {life_focus.strip()}")
+        if isinstance(story_tone, str) and story_tone.strip():
+            career_reasons.append(f"Ton: {story_tone.strip()}")
+        career_card = build_category_card(
+            categories.get("career") if isinstance(categories, Mapping) else None,
+            default_title="İş & Amaç",
+            extra_reasons=career_reasons,
+        )
+        if career_card:
+            cards["career"] = career_card
+
+        spiritual_reasons = []
+        dominant_axis = archetype.get("dominant_axis")
+        if isinstance(dominant_axis, str) and dominant_axis.strip():
+            spiritual_reasons.append(f"Öne çıkan eksen: {dominant_axis.strip()}")
+        spiritual_card = build_category_card(
+            categories.get("spiritual") if isinstance(categories, Mapping) else None,
+            default_title="Ruhsal Akış",
+            extra_reasons=spiritual_reasons,
+        )
+        if spiritual_card:
+            cards["spiritual"] = spiritual_card
 
-    love_card = build_category_card(
-        categories.get("love") if isinstance(categories, Mapping) else None,
-        default_title="Aşk & İlişkiler",
-    )
-    if love_card:
-        cards["love"] = love_card
+        love_card = build_category_card(
+            categories.get("love") if isinstance(categories, Mapping) else None,
+            default_title="Aşk & İlişkiler",
+        )
+        if love_card:
+            cards["love"] = love_card
 
-    shadow_card = build_shadow_card(
-        categories.get("shadow") if isinstance(categories, Mapping) else None,
-        archetype.get("behavior_patterns") if isinstance(archetype, Mapping) else None,
-    )
-    if shadow_card:
-        cards["shadow"] = shadow_card
+        shadow_card = build_shadow_card(
+            categories.get("shadow") if isinstance(categories, Mapping) else None,
+            archetype.get("behavior_patterns") if isinstance(archetype, Mapping) else None,
+        )
+        if shadow_card:
+            cards["shadow"] = shadow_card
 
     response_body: Dict[str, Any] = {
         "themes": archetype.get("core_themes", []),
@@ -1991,6 +2207,7 @@ def interpretation():
         "categories": categories,
         "archetype": archetype,
         "life_narrative": life_narrative,
+        "interpretation_source": interpretation_source,
     }
 
     if life_card:
@@ -2000,7 +2217,6 @@ def interpretation():
         if life_text:
             life_block["text"] = life_text
         axis_candidate = clean_text(life_block.get("axis") or archetype.get("dominant_axis") or "")
-        axis_scores = payload.get("axis_scores") if isinstance(payload.get("axis_scores"), Mapping) else {}
         dominant_axis = pick_axis(axis_scores, axis_candidate or "Yay–İkizler")
         life_block["axis"] = dominant_axis
         life_block["confidence_label"] = life_card.get("confidence_label") or map_confidence_label(life_block.get("confidence"))
@@ -2017,7 +2233,77 @@ def interpretation():
             expanded_cards.setdefault("mind", cards["spiritual"])
         response_body["cards"] = expanded_cards
 
-    return jsonify(response_body), 200
+    history_id = history_store.record(
+        profile_id=profile_id,
+        chart_key=history_key,
+        strategy=alt_strategy,
+        source=interpretation_source,
+        response=response_body,
+    )
+    if history_id is not None:
+        response_body["history_id"] = str(history_id)
+
+    return jsonify(response_body), 200, {"X-Interpretation-Source": interpretation_source}
+
+
+def _history_profile_id(email: Any) -> str | None:
+    """Profile id owning the interpretation history for ``email``, if that profile exists."""
+    if not isinstance(email, str) or not email.strip():
+        return None
+    try:
+        profile = find_profile(get_profile_collection(), email.strip().lower(), view="summary")
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.debug("History profile lookup skipped: %s", exc)
+        return None
+    return str(profile["_id"]) if profile else None
+
+
+@app.route("/api/profile/history", methods=["GET", "OPTIONS"])
+def profile_history():
+    if request.method == "OPTIONS":
+        return "", 204
+
+    email = request.args.get("email", "").strip().lower()
+    if not email:
+        return jsonify({"error": "email parametresi gereklidir."}), 400
+    limit = request.args.get("limit", type=int) or HISTORY_PAGE_SIZE
+    full = request.args.get("full") in {"1", "true"}
+
+    try:
+        profile = find_profile(get_profile_collection(), email, view="summary")
+        if not profile:
+            return jsonify({"error": "Profil bulunamadı."}), 404
+        entries, next_cursor = history_store.page(
+            str(profile["_id"]), cursor=request.args.get("cursor") or None, limit=limit, full=full
+        )
+    except InvalidCursor as exc:
+        return jsonify({"error": str(exc)}), 400
+    except MongoUnavailable as exc:
+        logger.warning("Mongo unavailable during history fetch: %s", exc)
+        return jsonify({"error": str(exc)}), 503
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Unexpected Mongo error during history fetch: %s", exc)
+        return jsonify({"error": "Geçmiş yorumlar alınırken hata oluştu."}), 500
+
+    items = [_serialise_history_entry(entry, full=full) for entry in entries]
+    return jsonify({"items": items, "next_cursor": next_cursor}), 200
+
+
+def _serialise_history_entry(entry: Mapping[str, Any], *, full: bool) -> Dict[str, Any]:
+    response = entry.get("response") or {}
+    ai_payload = response.get("ai_interpretation") or {}
+    item = {
+        "id": str(entry["_id"]),
+        "created_at": entry["created_at"].isoformat() if isinstance(entry.get("created_at"), datetime) else entry.get("created_at"),
+        "source": entry.get("source"),
+        "strategy": entry.get("strategy"),
+        "headline": ai_payload.get("headline") if isinstance(ai_payload, Mapping) else None,
+        "themes": response.get("themes", []),
+        "tone": response.get("tone"),
+    }
+    if full:
+        item["response"] = response
+    return item
 
 
 @app.route("/api/calculate-natal-chart", methods=["POST", "OPTIONS"])
@@ -2062,23 +2348,117 @@ def public_chat_message():
     return _handle_chat_request()
 
 
+health_monitor = HealthMonitor()
+if MONGO_URI:
+    health_monitor.add_probe("mongo", mongo_ping, breaker=MONGO_BREAKER)
+else:
+    health_monitor.add_static("mongo", "disabled", "MongoDB bağlantısı yapılandırılmadı.")
+if GROQ_API_KEY:
+    # Any authenticated probe spends the production key once per worker per
+    # interval; the breaker already sees every real completion call.
+    health_monitor.add_passive("groq", GROQ_BREAKER)
+else:
+    health_monitor.add_static("groq", "disabled", "GROQ_API_KEY tanımlı değil.")
+if OPENCAGE_KEY:
+    # Unauthenticated on purpose: a keyless request is rejected without using quota.
+    health_monitor.add_probe("opencage", http_probe(OPENCAGE_API_URL), breaker=OPENCAGE_BREAKER)
+else:
+    health_monitor.add_static("opencage", "disabled", "OPENCAGE_API_KEY tanımlı değil.")
+if isinstance(cache_backend, TieredCache):
+    health_monitor.add_probe(
+        "cache",
+        lambda: (cache_backend.ping(), cache_backend.name),
+        breaker=getattr(cache_backend.shared, "breaker", None),
+    )
+else:
+    health_monitor.add_static("cache", "disabled", "CACHE_URL tanımlı değil; yalnızca süreç içi önbellek kullanılıyor.")
+
+
+sky_service = SkyService({**PLANETS, "North Node": swe.TRUE_NODE}, get_zodiac_sign)
+init_sky(app, sky_service)
+
+
+def _load_profile_chart(profile: Mapping[str, Any]) -> Dict[str, Any] | None:
+    """Stored chart of a profile document, without computing a missing one inline.
+
+    Profiles without a ``chart_id`` (older exports) are re-resolved from their
+    birth inputs; a chart missing from the store is queued for background
+    computation and the profile's own copy, if any, is used meanwhile.
+    """
+    chart_id = profile.get("chart_id")
+    if chart_id:
+        chart = chart_store.get(chart_id)
+        if chart is not None:
+            return chart
+    try:
+        resolved_id, stored = warm_natal_chart(profile)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.debug("Profile chart cannot be resolved: %s", exc)
+    else:
+        if stored and resolved_id:
+            return chart_store.get(resolved_id)
+    chart = profile.get("chart")
+    return chart if isinstance(chart, dict) else None
+
+
+def _generate_daily_insight(context: Mapping[str, Any]) -> tuple[Dict[str, str], str]:
+    """Write one daily insight for a transit context; ``call_ai_model`` covers Groq failures."""
+    transits = ", ".join(context.get("transits") or []) or "belirgin transit yok"
+    user_prompt = "\n".join(
+        [
+            "Bugünün gökyüzüne göre kısa bir günlük içgörü yaz.",
+            f"Ay burcu: {context.get('moon_sign')}",
+            f"Ay evresi: {context.get('moon_phase')}",
+            f"Retro gezegenler: {', '.join(context.get('retrogrades') or []) or 'yok'}",
+            f"Doğum haritasına transitler: {transits}",
+            'Yalnızca {"headline": ..., "summary": ..., "advice": ...} biçiminde Türkçe JSON döndür.',
+        ]
+    )
+    messages = (
+        {"role": "system", "content": "Sen sıcak ve sade bir dille yazan bir astrologsun."},
+        {"role": "user", "content": user_prompt},
+    )
+    try:
+        parsed = json.loads(call_groq(messages, temperature=0.7, max_tokens=300))
+        if isinstance(parsed, Mapping) and all(parsed.get(key) for key in ("headline", "summary", "advice")):
+            return normalize_ai_payload(parsed), "refined"
+        logger.warning("Daily insight response missing fields; using the deterministic narrative.")
+    except (AIError, json.JSONDecodeError) as exc:
+        logger.warning("Daily insight generation fell back: %s", exc)
+    prompt = "\n".join(
+        [
+            f"Themes: {transits}",
+            f"Tone: {context.get('moon_phase') or ''}",
+            f"Focus: Ay {context.get('moon_sign') or ''}",
+        ]
+    )
+    return {"headline": "Günün Gökyüzü", "summary": call_ai_model(prompt), "advice": DEFAULT_ACTION_FALLBACKS[0]}, "deterministic"
+
+
+daily_insights = DailyInsightPipeline(get_daily_insight_collection, sky_service, _load_profile_chart, _generate_daily_insight)
+init_daily_insight(app, daily_insights, lambda email: find_profile(get_profile_collection(), email))
+
+# Slow LLM-backed endpoints also accept ?async=1 / Prefer: respond-async (see backend/jobs.py).
+job_queue = JobQueue(app, get_job_collection)
+init_jobs(app, job_queue, ("interpretation", "api_calculate_synastry", "public_calculate_synastry"))
+
+
+@app.before_request
+def start_health_monitor():
+    health_monitor.ensure_running()
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
-    """Simple endpoint to confirm backend is alive."""
-    health = {"status": "ok"}
-
-    if MONGO_URI:
-        mongo_ok, detail = mongo_healthcheck()
-        health["mongo"] = {
-            "status": "ok" if mongo_ok else "error",
-            "detail": detail,
-        }
-        if not mongo_ok:
-            health["status"] = "degraded"
-    else:
-        health["mongo"] = {"status": "disabled", "detail": "MongoDB bağlantısı yapılandırılmadı."}
+    """Last background probe results; never touches a dependency itself."""
+    return Response(health_monitor.snapshot(), mimetype="application/json")
+
+
+REQUEST_CAPTURE_PATH = os.getenv("REQUEST_CAPTURE_PATH")
+if REQUEST_CAPTURE_PATH:
+    from backend.loadtest.capture import install_request_capture
 
-    return jsonify(health)
+    install_request_capture(app, REQUEST_CAPTURE_PATH)
 
 
 if __name__ == "__main__":
@@ -2,10 +2,23 @@
 
 from __future__ import annotations
 
-import re
-from typing import Any, Dict, Iterable, List, Sequence, Tuple
+import gc
+import operator
+from functools import cached_property
+from itertools import repeat
+from threading import Lock
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from backend.textnorm import normalize
+from backend.tracing import traced
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
 
 __all__ = [
+    "ChartAnalysis",
     "extract_archetype_data",
     "derive_behavior_patterns",
     "integrate_life_expression",
@@ -14,43 +27,20 @@ __all__ = [
     "limit_sentences",
     "map_confidence_label",
     "pick_axis",
+    "call_ai_model",
+    "score_archetypes_batch",
 ]
 
-TILDE = "–"
-
-
 def clean_text(value: str | None) -> str:
     """Strip markdown/code fences, JSON artefacts, and normalise whitespace."""
-    if not isinstance(value, str):
-        return ""
-    text = value
-    text = re.sub(r"```+json|```+|^json\\b", "", text, flags=re.IGNORECASE).strip()
-
-    def _strip_brackets(match: re.Match[str]) -> str:
-        items = [
-            piece.strip(" '\"")
-            for piece in match.group(0).strip("[]").split(",")
-            if piece.strip(" '\"")
-        ]
-        return ", ".join(items)
-
-    text = re.sub(r"\[[^\[\]]*\]", _strip_brackets, text)
-    text = re.sub(r"\s+", " ", text).strip()
-    text = text.replace(" - ", f" {TILDE} ")
-    text = re.sub(r"\s*•\s*", " • ", text)
-    return text.strip()
+    return normalize(value).text
 
 
 def limit_sentences(value: str | None, min_sentences: int = 3, max_sentences: int = 6) -> str:
     """Clamp text to a 3–6 sentence window in a gentle, human-readable way."""
-    cleaned = clean_text(value)
+    cleaned, sentences = normalize(value)
     if not cleaned:
         return ""
-    sentences = [
-        sentence.strip()
-        for sentence in re.split(r"(?<=[.!?])\s+", cleaned)
-        if sentence.strip()
-    ]
     if not sentences:
         return cleaned
     clipped = sentences[:max_sentences]
@@ -157,25 +147,9 @@ def analyze_aspects_weighted(chart_data: Dict[str, Any]) -> Tuple[Dict[str, floa
         else:
             weight = max(0.1, 1.0 - (orb / 12.0))
 
-        planets = {planet1, planet2}
-        name_upper = aspect_name.capitalize()
-
-        if {"Mars", "Jupiter"} <= planets and name_upper in {"Trine", "Sextile"}:
-            theme_scores["growth"] = theme_scores.get("growth", 0.0) + 0.6 * weight
-            theme_scores["action"] = theme_scores.get("action", 0.0) + 0.3 * weight
-        if {"Sun", "Saturn"} <= planets and name_upper in {"Square", "Opposition", "Conjunction"}:
-            theme_scores["challenge"] = theme_scores.get("challenge", 0.0) + 0.5 * weight
-            theme_scores["structure"] = theme_scores.get("structure", 0.0) + 0.3 * weight
-        if {"Moon", "Neptune"} <= planets and name_upper in {"Trine", "Sextile", "Conjunction"}:
-            theme_scores["intuition"] = theme_scores.get("intuition", 0.0) + 0.5 * weight
-            theme_scores["compassion"] = theme_scores.get("compassion", 0.0) + 0.25 * weight
-        if {"Venus", "Pluto"} <= planets:
-            theme_scores["love"] = theme_scores.get("love", 0.0) + 0.4 * weight
-            theme_scores["depth"] = theme_scores.get("depth", 0.0) + 0.4 * weight
-        if {"Mercury", "Uranus"} <= planets:
-            theme_scores["innovation"] = theme_scores.get("innovation", 0.0) + 0.35 * weight
-        if {"Sun", "Moon"} <= planets:
-            theme_scores["integration"] = theme_scores.get("integration", 0.0) + 0.35 * weight
+        for weights in _match_rules(_ASPECT_THEME_INDEX, _pair_key(planet1, planet2), str(aspect_name).lower()):
+            for theme, factor in weights:
+                theme_scores[theme] = theme_scores.get(theme, 0.0) + factor * weight
 
         derived_from.append(
             {
@@ -191,31 +165,20 @@ def analyze_aspects_weighted(chart_data: Dict[str, Any]) -> Tuple[Dict[str, floa
 def infer_axis_by_themes_and_pairs(theme_scores: Dict[str, float], derived_from: List[dict]) -> Tuple[str, List[Tuple[str, float]]]:
     """Choose the dominant axis considering theme scores and supporting aspect pairs."""
 
-    def score(key: str) -> float:
-        return float(theme_scores.get(key, 0.0))
-
-    axis_scores = {
-        "Yay–İkizler": score("growth") + 0.2 * score("intuition") + 0.15 * score("innovation"),
-        "Yengeç–Oğlak": score("security") + 0.2 * score("structure") + 0.1 * score("integration"),
-        "Terazi–Koç": score("balance") + 0.1 * score("action") + 0.1 * score("love"),
-        "Boğa–Akrep": score("value") + 0.2 * score("depth") + 0.1 * score("transformation"),
-        "Başak–Balık": score("service") + 0.2 * score("intuition") + 0.1 * score("compassion"),
-    }
+    axis_scores: Dict[str, float] = {}
+    for axis, terms in AXIS_THEME_WEIGHTS.items():
+        total = 0.0
+        for theme, coefficient in terms:
+            total = total + coefficient * float(theme_scores.get(theme, 0.0))
+        axis_scores[axis] = total
 
     for entry in derived_from:
         pair = entry.get("pair")
-        if not isinstance(pair, str):
+        if not isinstance(pair, str) or "–" not in pair:
             continue
-        if "Mars" in pair and "Jupiter" in pair:
-            axis_scores["Yay–İkizler"] += 0.12
-        if "Saturn" in pair and "Sun" in pair:
-            axis_scores["Yengeç–Oğlak"] += 0.08
-        if "Venus" in pair and "Mars" in pair:
-            axis_scores["Terazi–Koç"] += 0.08
-        if "Venus" in pair and "Pluto" in pair:
-            axis_scores["Boğa–Akrep"] += 0.1
-        if "Moon" in pair and "Neptune" in pair:
-            axis_scores["Başak–Balık"] += 0.12
+        planet1, planet2 = pair.split("–", 1)
+        for axis, bonus in _match_rules(_AXIS_PAIR_INDEX, _pair_key(planet1, planet2), None):
+            axis_scores[axis] += bonus
 
     ranked = sorted(axis_scores.items(), key=lambda item: item[1], reverse=True)
     best_axis = ranked[0][0] if ranked else "Yay–İkizler"
@@ -278,7 +241,455 @@ ARCHETYPE_BEHAVIOR_PATTERNS = {
 }
 
 
-def extract_archetype_data(chart_data: Dict[str, Any]) -> Dict[str, Any]:
+# Theme weights added per aspect, scaled by orb tightness: (planet pair, aspects or None for any, weights).
+ASPECT_THEME_RULES: List[Tuple[Tuple[str, str], Tuple[str, ...] | None, Dict[str, float]]] = [
+    (("Mars", "Jupiter"), ("Trine", "Sextile"), {"growth": 0.6, "action": 0.3}),
+    (("Sun", "Saturn"), ("Square", "Opposition", "Conjunction"), {"challenge": 0.5, "structure": 0.3}),
+    (("Moon", "Neptune"), ("Trine", "Sextile", "Conjunction"), {"intuition": 0.5, "compassion": 0.25}),
+    (("Venus", "Pluto"), None, {"love": 0.4, "depth": 0.4}),
+    (("Mercury", "Uranus"), None, {"innovation": 0.35}),
+    (("Sun", "Moon"), None, {"integration": 0.35}),
+]
+
+# Axis score as a weighted sum of theme scores, terms summed left to right.
+AXIS_THEME_WEIGHTS: Dict[str, Tuple[Tuple[str, float], ...]] = {
+    "Yay–İkizler": (("growth", 1.0), ("intuition", 0.2), ("innovation", 0.15)),
+    "Yengeç–Oğlak": (("security", 1.0), ("structure", 0.2), ("integration", 0.1)),
+    "Terazi–Koç": (("balance", 1.0), ("action", 0.1), ("love", 0.1)),
+    "Boğa–Akrep": (("value", 1.0), ("depth", 0.2), ("transformation", 0.1)),
+    "Başak–Balık": (("service", 1.0), ("intuition", 0.2), ("compassion", 0.1)),
+}
+
+# Axis bonus for every aspect between the pair, regardless of aspect type.
+AXIS_PAIR_BONUSES: List[Tuple[Tuple[str, str], str, float]] = [
+    (("Mars", "Jupiter"), "Yay–İkizler", 0.12),
+    (("Sun", "Saturn"), "Yengeç–Oğlak", 0.08),
+    (("Venus", "Mars"), "Terazi–Koç", 0.08),
+    (("Venus", "Pluto"), "Boğa–Akrep", 0.1),
+    (("Moon", "Neptune"), "Başak–Balık", 0.12),
+]
+
+_ASPECT_NAMES = ("conjunction", "sextile", "square", "trine", "opposition")
+
+RuleIndex = Dict[tuple, List[Tuple[int, Any]]]
+
+
+def _pair_key(planet1: str, planet2: str) -> Tuple[str, str]:
+    """Order-independent, case-insensitive key for a planet pair."""
+    first, second = planet1.strip().lower(), planet2.strip().lower()
+    return (first, second) if first <= second else (second, first)
+
+
+def _match_rules(index: RuleIndex, pair: Tuple[str, str], aspect: str | None) -> List[Any]:
+    """Return payloads of rules for ``pair`` with ``aspect`` or any aspect, in table order."""
+    specific = index.get((pair, aspect), ()) if aspect is not None else ()
+    generic = index.get((pair, None), ())
+    if not specific or not generic:
+        return [payload for _, payload in (specific or generic)]
+    return [payload for _, payload in sorted([*specific, *generic], key=lambda match: match[0])]
+
+
+def _compile_theme_rules() -> RuleIndex:
+    index: RuleIndex = {}
+    for ordinal, (planets, aspects, weights) in enumerate(ASPECT_THEME_RULES):
+        pair = _pair_key(*planets)
+        for aspect in aspects or (None,):
+            key = (pair, aspect.lower() if aspect else None)
+            index.setdefault(key, []).append((ordinal, tuple(weights.items())))
+    return index
+
+
+def _compile_axis_rules() -> RuleIndex:
+    index: RuleIndex = {}
+    for ordinal, (planets, axis, bonus) in enumerate(AXIS_PAIR_BONUSES):
+        index.setdefault((_pair_key(*planets), None), []).append((ordinal, (axis, bonus)))
+    return index
+
+
+def _compile_behavior_patterns() -> Tuple[RuleIndex, RuleIndex, RuleIndex]:
+    """Index ``ARCHETYPE_BEHAVIOR_PATTERNS`` keys by what they match on.
+
+    Keys take one of three shapes: ``"<planet> <aspect> <planet>"`` (either
+    planet order), ``"<planet> in <sign>[ retrograde]"`` and
+    ``"<planet> in <n>th house"``.
+    """
+    by_aspect: RuleIndex = {}
+    by_sign: RuleIndex = {}
+    by_house: RuleIndex = {}
+    for ordinal, (pattern_key, pattern_data) in enumerate(ARCHETYPE_BEHAVIOR_PATTERNS.items()):
+        key = pattern_key.strip().lower()
+        for aspect in _ASPECT_NAMES:
+            planet1, separator, planet2 = key.partition(f" {aspect} ")
+            if separator:
+                by_aspect.setdefault((_pair_key(planet1, planet2), aspect), []).append((ordinal, pattern_data))
+                break
+        else:
+            planet, separator, remainder = key.partition(" in ")
+            if not separator:
+                raise ValueError(f"Unrecognised behaviour pattern key: {pattern_key!r}")
+            planet = planet.strip()
+            if "house" in remainder:
+                house = "".join(ch for ch in remainder if ch.isdigit())
+                if not house:
+                    raise ValueError(f"Behaviour pattern without a house number: {pattern_key!r}")
+                by_house.setdefault((planet, house), []).append((ordinal, pattern_data))
+            else:
+                sign = remainder.replace("retrograde", "").strip()
+                if not sign:
+                    raise ValueError(f"Behaviour pattern without a sign: {pattern_key!r}")
+                retrograde = "retrograde" in remainder
+                by_sign.setdefault((planet, sign, retrograde), []).append((ordinal, pattern_data))
+    return by_aspect, by_sign, by_house
+
+
+_ASPECT_THEME_INDEX = _compile_theme_rules()
+_AXIS_PAIR_INDEX = _compile_axis_rules()
+_BEHAVIOR_ASPECT_INDEX, _BEHAVIOR_SIGN_INDEX, _BEHAVIOR_HOUSE_INDEX = _compile_behavior_patterns()
+
+
+_THEME_NAMES: Tuple[str, ...] = tuple(
+    dict.fromkeys(
+        [theme for _, _, weights in ASPECT_THEME_RULES for theme in weights]
+        + [theme for terms in AXIS_THEME_WEIGHTS.values() for theme, _ in terms]
+    )
+)
+_AXIS_NAMES: Tuple[str, ...] = tuple(AXIS_THEME_WEIGHTS)
+_THEME_COLUMNS = {theme: column for column, theme in enumerate(_THEME_NAMES)}
+_AXIS_COLUMNS = {axis: column for column, axis in enumerate(_AXIS_NAMES)}
+_NUMBER = (int, float)
+
+
+class _KeyIds(dict):
+    """``key -> id`` dict that registers unseen keys on ``[]``, so hits stay a C lookup."""
+
+    def __init__(self, table: "_BatchKeyTable") -> None:
+        super().__init__()
+        self._table = table
+
+    def __missing__(self, key: tuple) -> int:
+        return self._table.register(key)
+
+
+class _BatchKeyTable:
+    """Integer ids for raw ``(planet1, planet2, aspect)`` keys, with their rules in CSR form.
+
+    A key is matched against the rule indexes once, the first time any batch
+    sees it; keys matching nothing map to ``-1``.  At most ``max_misses`` of
+    those are remembered, so malformed input cannot grow the table without
+    bound; later ones are re-matched each time.  The per-id rows are kept as
+    numpy arrays (rule ordinals, axis bonuses, expected angle) so a batch can
+    expand its aspects into incidence rows without touching Python objects.
+    """
+
+    def __init__(self, max_misses: int = 50_000) -> None:
+        self.ids = _KeyIds(self)
+        self.max_misses = max_misses
+        self._misses = 0
+        self._rules: List[Tuple[int, ...]] = []
+        self._bonuses: List[Tuple[Tuple[int, float], ...]] = []
+        self._expected: List[Any] = []
+        self._arrays: Dict[str, Any] | None = None
+        self._lock = Lock()
+
+    def register(self, key: tuple) -> int:
+        with self._lock:
+            known = self.ids.get(key)
+            if known is not None:
+                return known
+            rules, bonuses = self._match(key)
+            if not rules and not bonuses:
+                if self._misses >= self.max_misses:
+                    return -1
+                self._misses += 1
+                key_id = -1
+            else:
+                self._rules.append(rules)
+                self._bonuses.append(bonuses)
+                self._expected.append(EXPECTED_ASPECT_ANGLES.get(key[2]))
+                self._arrays = None
+                key_id = len(self._rules) - 1
+            self.ids[key] = key_id
+            return key_id
+
+    @staticmethod
+    def _match(key: tuple) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, float], ...]]:
+        planet1, planet2, aspect_name = key
+        if not planet1 or not planet2 or not aspect_name:
+            return (), ()
+        pair = _pair_key(planet1, planet2)
+        theme_rules = tuple(
+            ordinal
+            for ordinal, _ in sorted(
+                [*_ASPECT_THEME_INDEX.get((pair, aspect_name.lower()), ()), *_ASPECT_THEME_INDEX.get((pair, None), ())],
+                key=lambda match: match[0],
+            )
+        )
+        axis_pair = _pair_key(*f"{planet1}–{planet2}".split("–", 1))
+        axis_bonuses = tuple((_AXIS_COLUMNS[axis], bonus) for axis, bonus in _match_rules(_AXIS_PAIR_INDEX, axis_pair, None))
+        return theme_rules, axis_bonuses
+
+    def arrays(self) -> Dict[str, Any]:
+        """CSR rows for every registered id; rebuilt only after new keys were seen."""
+        with self._lock:
+            if self._arrays is None:
+                rule_counts = [len(rules) for rules in self._rules]
+                bonus_counts = [len(bonuses) for bonuses in self._bonuses]
+                expected = [value if isinstance(value, _NUMBER) else None for value in self._expected]
+                self._arrays = {
+                    "rule_ptr": np.concatenate(([0], np.cumsum(rule_counts, dtype=np.intp))).astype(np.intp),
+                    "rule_ids": np.array([o for rules in self._rules for o in rules], dtype=np.intp),
+                    "bonus_ptr": np.concatenate(([0], np.cumsum(bonus_counts, dtype=np.intp))).astype(np.intp),
+                    "bonus_axis": np.array([a for bonuses in self._bonuses for a, _ in bonuses], dtype=np.intp),
+                    "bonus_value": np.array([b for bonuses in self._bonuses for _, b in bonuses], dtype=np.float64),
+                    "expected": np.array([0.0 if value is None else value for value in expected], dtype=np.float64),
+                    "has_expected": np.array([value is not None for value in expected], dtype=bool),
+                }
+            return self._arrays
+
+
+_BATCH_KEYS = _BatchKeyTable()
+_BATCH_KEY_OF = operator.itemgetter("planet1", "planet2", "aspect")
+_RULE_FACTORS: Any = None
+
+
+def _batch_key(aspect: Any) -> tuple:
+    """Key of one aspect when the fast ``itemgetter`` path fails; non-dicts match nothing."""
+    try:
+        return _BATCH_KEY_OF(aspect)
+    except (KeyError, TypeError):
+        if not isinstance(aspect, dict):
+            return (None, None, None)
+        return (aspect.get("planet1"), aspect.get("planet2"), aspect.get("aspect"))
+
+
+def _numeric_field(aspects: List[Any], name: str) -> Tuple[Any, Any]:
+    """(is ``aspect[name]`` an int/float, its value as float64 or 0.0) for every aspect."""
+    values = np.array(list(map(operator.methodcaller("get", name), aspects)) + [None], dtype=object)[:-1]
+    numeric = np.fromiter(map(isinstance, values, repeat(_NUMBER)), dtype=bool, count=len(values))
+    values[~numeric] = 0.0
+    return numeric, values.astype(np.float64)
+
+
+def _rule_factors() -> Any:
+    """(rule ordinal × theme column) weight matrix, built on first use."""
+    global _RULE_FACTORS  # noqa: PLW0603 - module level cache
+    if _RULE_FACTORS is None:
+        factors = np.zeros((len(ASPECT_THEME_RULES), len(_THEME_NAMES)), dtype=np.float64)
+        for ordinal, (_, _, rule_weights) in enumerate(ASPECT_THEME_RULES):
+            for theme, factor in rule_weights.items():
+                factors[ordinal, _THEME_COLUMNS[theme]] = factor
+        _RULE_FACTORS = factors
+    return _RULE_FACTORS
+
+
+def _expand(ptr: Any, ids: Any) -> Tuple[Any, Any]:
+    """For CSR rows ``ids``: (index into ``ids`` of every entry, flat position of the entry)."""
+    starts = ptr[ids]
+    counts = ptr[ids + 1] - starts
+    owner = np.repeat(np.arange(len(ids), dtype=np.intp), counts)
+    first = np.cumsum(counts) - counts
+    positions = np.arange(int(counts.sum()), dtype=np.intp) - first[owner] + starts[owner]
+    return owner, positions
+
+
+def score_archetypes_batch(
+    charts: Iterable[Dict[str, Any]],
+) -> List[Tuple[Dict[str, float], List[Tuple[str, float]]]]:
+    """Theme scores and ranked axes for many charts in one vectorised pass.
+
+    Returns, per chart, exactly what ``analyze_aspects_weighted`` followed by
+    ``infer_axis_by_themes_and_pairs`` would: the theme score dict (same
+    insertion order) and the ranked ``(axis, score)`` list.  The only Python
+    work per aspect is mapping its key to an integer id, plus reading the orb
+    fields of the few that match a rule; the (chart × rule) and (chart × axis bonus) incidence rows are
+    then expanded from the per-id CSR tables with numpy.  Accumulation uses
+    ``np.add.at``, which sums in the same order as the per-chart loop, so the
+    floats are bit-identical; a BLAS ``@`` would reorder and fuse the
+    additions.  Falls back to the per-chart functions when numpy is not
+    installed.
+
+    The cyclic GC is paused for the call: every result container survives,
+    so at 100k charts the collector would otherwise run full passes over the
+    caller's charts for a third of the runtime.
+    """
+    charts = list(charts)
+    if np is None:
+        results = []
+        for chart in charts:
+            theme_scores, derived_from = analyze_aspects_weighted(chart)
+            results.append((theme_scores, infer_axis_by_themes_and_pairs(theme_scores, derived_from)[1]))
+        return results
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _score_batch(charts)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _score_batch(charts: List[Any]) -> List[Tuple[Dict[str, float], List[Tuple[str, float]]]]:
+    """numpy body of :func:`score_archetypes_batch`."""
+    # Every aspect of the batch in one flat list; key ids are looked up in C.
+    flat: List[Any] = []
+    counts: List[int] = []
+    for chart in charts:
+        aspects = chart.get("aspects") if isinstance(chart, dict) else None
+        if type(aspects) is not list and not isinstance(aspects, Sequence):
+            counts.append(0)
+            continue
+        flat.extend(aspects)
+        counts.append(len(aspects))
+    # Keys are streamed rather than kept: a list of millions of tuples costs more to build than the lookups.
+    count = len(flat)
+    lookup = _BATCH_KEYS.ids.__getitem__
+    try:
+        key_ids = np.fromiter(map(lookup, map(_BATCH_KEY_OF, flat)), dtype=np.intp, count=count)
+    except (KeyError, TypeError):
+        # An aspect without one of the fields, or not a dict: take the slow path for the batch.
+        key_ids = np.fromiter(map(lookup, map(_batch_key, flat)), dtype=np.intp, count=count)
+
+    # Only matching aspects (a small share) are touched again, for their orb fields.
+    matched = np.flatnonzero(key_ids >= 0)
+    aspect_chart = np.repeat(np.arange(len(charts), dtype=np.intp), counts)[matched]
+    key_ids = key_ids[matched]
+    matched_aspects = list(map(flat.__getitem__, matched.tolist()))
+    del flat
+    exact_ok, exact_values = _numeric_field(matched_aspects, "exact_angle")
+    orb_ok, orb_values = _numeric_field(matched_aspects, "orb")
+
+    tables = _BATCH_KEYS.arrays()
+    # Orb weights, mirroring analyze_aspects_weighted (Python's max(0.1, nan) is 0.1).
+    use_exact = exact_ok & tables["has_expected"][key_ids]
+    use_orb = ~use_exact & orb_ok
+    orbs = np.where(use_exact, np.abs(exact_values - tables["expected"][key_ids]), np.abs(orb_values))
+    scaled = 1.0 - orbs / 12.0
+    weights = np.where(use_exact | use_orb, np.where(scaled > 0.1, scaled, 0.1), 0.4)
+
+    theme_owner, theme_positions = _expand(tables["rule_ptr"], key_ids)
+    theme_rules = tables["rule_ids"][theme_positions]
+    theme_chart = aspect_chart[theme_owner]
+    theme_matrix = np.zeros((len(charts), len(_THEME_NAMES)), dtype=np.float64)
+    if len(theme_rules):
+        np.add.at(theme_matrix, theme_chart, _rule_factors()[theme_rules] * weights[theme_owner][:, None])
+
+    axis_matrix = np.zeros((len(charts), len(_AXIS_NAMES)), dtype=np.float64)
+    for axis, terms in AXIS_THEME_WEIGHTS.items():
+        column = axis_matrix[:, _AXIS_COLUMNS[axis]]
+        for theme, coefficient in terms:
+            column[:] = column + coefficient * theme_matrix[:, _THEME_COLUMNS[theme]]
+    bonus_owner, bonus_positions = _expand(tables["bonus_ptr"], key_ids)
+    if len(bonus_positions):
+        np.add.at(
+            axis_matrix,
+            (aspect_chart[bonus_owner], tables["bonus_axis"][bonus_positions]),
+            tables["bonus_value"][bonus_positions],
+        )
+
+    axis_rows = axis_matrix.tolist()
+    rule_list = theme_rules.tolist()
+    bounds = np.searchsorted(theme_chart, np.arange(len(charts) + 1)).tolist()
+    # Theme keys appear in first-match order; charts sharing a rule sequence share the layout.
+    layout_ids: Dict[Tuple[int, ...], int] = {}
+    layouts: List[Tuple[str, ...]] = []
+    layout_columns: List[int] = []
+    layout_ptr = [0]
+    chart_layouts: List[int] = []
+    for start, end in zip(bounds, bounds[1:]):
+        signature = tuple(rule_list[start:end])
+        layout_id = layout_ids.get(signature)
+        if layout_id is None:
+            columns: Dict[str, int] = {}
+            for ordinal in signature:
+                for theme in ASPECT_THEME_RULES[ordinal][2]:
+                    columns.setdefault(theme, _THEME_COLUMNS[theme])
+            layout_id = layout_ids[signature] = len(layouts)
+            layouts.append(tuple(columns))
+            layout_columns.extend(columns.values())
+            layout_ptr.append(len(layout_columns))
+        chart_layouts.append(layout_id)
+
+    # Read back only the cells each chart reports, chart by chart in layout order.
+    owner, positions = _expand(np.array(layout_ptr, dtype=np.intp), np.array(chart_layouts, dtype=np.intp))
+    cells = iter(theme_matrix[owner, np.array(layout_columns, dtype=np.intp)[positions]].tolist())
+    by_score = operator.itemgetter(1)
+    # zip() stops at the end of the layout without drawing another cell.
+    return [
+        (dict(zip(layouts[layout_id], cells)), sorted(zip(_AXIS_NAMES, axis_row), key=by_score, reverse=True))
+        for layout_id, axis_row in zip(chart_layouts, axis_rows)
+    ]
+
+
+class _AspectView(NamedTuple):
+    aspect_type: str | None
+    planet1: str
+    planet2: str
+    planets: List[str]
+
+
+class ChartAnalysis:
+    """Per-chart intermediate results, computed lazily and shared by every consumer.
+
+    Create one per chart (e.g. per request) and pass it as ``analysis=`` to
+    :func:`generate_full_archetype_report`, :func:`extract_archetype_data`,
+    :func:`derive_behavior_patterns` and :func:`integrate_life_expression` so
+    aspect normalisation, theme scores, the axis ranking, behaviour patterns
+    and life layers are each computed once.  Every strategy picks its axis
+    from the same ranking.  Public functions hand out shallow copies.
+    """
+
+    def __init__(self, chart_data: Dict[str, Any]) -> None:
+        _validate_chart_input(chart_data)
+        self.chart_data = chart_data
+        self._life_layers: Dict[tuple, Dict[str, Any]] = {}
+
+    @cached_property
+    def aspects(self) -> List[_AspectView]:
+        return [
+            _AspectView(
+                _normalise_aspect_type(aspect),
+                str(aspect.get("planet1") or aspect.get("planet_1") or ""),
+                str(aspect.get("planet2") or aspect.get("planet_2") or ""),
+                _extract_planets(aspect),
+            )
+            for aspect in _iter_aspects(self.chart_data.get("aspects", []))
+        ]
+
+    @cached_property
+    def weighted_themes(self) -> Tuple[Dict[str, float], List[dict]]:
+        try:
+            return analyze_aspects_weighted(self.chart_data)
+        except Exception:  # pragma: no cover - defensive fallback
+            return {}, []
+
+    @cached_property
+    def axis_ranking(self) -> List[Tuple[str, float]]:
+        theme_scores, derived_from = self.weighted_themes
+        if not theme_scores:
+            return []
+        return infer_axis_by_themes_and_pairs(theme_scores, derived_from)[1]
+
+    @cached_property
+    def behavior_patterns(self) -> List[Dict[str, str]]:
+        return _compute_behavior_patterns(self)
+
+    @cached_property
+    def archetype(self) -> Dict[str, Any]:
+        return _compute_archetype(self)
+
+    def life_layer(self, archetype_data: Dict[str, Any], strategy: str | None) -> Dict[str, Any]:
+        core_themes = tuple(archetype_data.get("core_themes", []) or [])
+        key = (strategy, core_themes, archetype_data.get("story_tone", "") or "")
+        layer = self._life_layers.get(key)
+        if layer is None:
+            theme_scores, derived_from = self.weighted_themes
+            layer = _compute_life_layer(theme_scores, derived_from, self.axis_ranking, archetype_data, strategy)
+            self._life_layers[key] = layer
+        return dict(layer)
+
+
+def extract_archetype_data(chart_data: Dict[str, Any], *, analysis: ChartAnalysis | None = None) -> Dict[str, Any]:
     """Extract archetypal themes, tone, and notable aspects from natal chart data.
 
     Parameters
@@ -302,17 +713,23 @@ def extract_archetype_data(chart_data: Dict[str, Any]) -> Dict[str, Any]:
     Notes
     -----
     The function is intentionally defensive so it can cope with partial or loosely
-    structured data that may come from different astrological APIs.
+    structured data that may come from different astrological APIs.  Pass the
+    request's :class:`ChartAnalysis` as ``analysis`` to reuse its results.
     """
-    _validate_chart_input(chart_data)
+    analysis = analysis or ChartAnalysis(chart_data)
+    return dict(analysis.archetype)
+
 
+@traced("archetype_extract")
+def _compute_archetype(analysis: ChartAnalysis) -> Dict[str, Any]:
+    chart_data = analysis.chart_data
     core_themes: List[str] = []
     seen_themes = set()
     notable_aspects: List[str] = []
 
-    for aspect in _iter_aspects(chart_data.get("aspects", [])):
-        aspect_type = _normalise_aspect_type(aspect)
-        planets = _extract_planets(aspect)
+    for view in analysis.aspects:
+        aspect_type = view.aspect_type
+        planets = view.planets
 
         if aspect_type:
             theme = ASPECT_THEMES.get(aspect_type)
@@ -334,7 +751,7 @@ def extract_archetype_data(chart_data: Dict[str, Any]) -> Dict[str, Any]:
             _add_theme(broad_theme, core_themes, seen_themes)
 
     story_tone = _derive_story_tone(seen_themes)
-    behavior_patterns = derive_behavior_patterns(chart_data)
+    behavior_patterns = list(analysis.behavior_patterns)
 
     archetype_base = {
         "core_themes": core_themes,
@@ -343,7 +760,7 @@ def extract_archetype_data(chart_data: Dict[str, Any]) -> Dict[str, Any]:
         "behavior_patterns": behavior_patterns,
     }
 
-    life_layer = integrate_life_expression(chart_data, archetype_data=archetype_base)
+    life_layer = analysis.life_layer(archetype_base, None)
     archetype_base.update(life_layer)
 
     return archetype_base
@@ -445,24 +862,30 @@ def _format_aspect_label(aspect_type: str) -> str:
     return aspect_type.capitalize()
 
 
-def derive_behavior_patterns(chart_data: Dict[str, Any]) -> List[Dict[str, str]]:
+def derive_behavior_patterns(
+    chart_data: Dict[str, Any], *, analysis: ChartAnalysis | None = None
+) -> List[Dict[str, str]]:
     """Infer behavioural patterns based on notable aspects and placements."""
+    analysis = analysis or ChartAnalysis(chart_data)
+    return list(analysis.behavior_patterns)
+
+
+@traced("behavior_patterns")
+def _compute_behavior_patterns(analysis: ChartAnalysis) -> List[Dict[str, str]]:
+    chart_data = analysis.chart_data
     detected: List[Dict[str, str]] = []
-    seen = set()
+    seen: set[int] = set()
 
-    aspects = _iter_aspects(chart_data.get("aspects", []))
-    for aspect in aspects:
-        planet1 = str(aspect.get("planet1") or aspect.get("planet_1") or "").lower()
-        planet2 = str(aspect.get("planet2") or aspect.get("planet_2") or "").lower()
-        aspect_name = _normalise_aspect_type(aspect) or ""
-        aspect_key = f"{planet1} {aspect_name} {planet2}".strip()
-        if not aspect_key:
+    def _collect(matches: Iterable[Tuple[int, Dict[str, str]]]) -> None:
+        for ordinal, pattern_data in matches:
+            if ordinal not in seen:
+                seen.add(ordinal)
+                detected.append(pattern_data)
+
+    for view in analysis.aspects:
+        if not view.planet1 or not view.planet2 or not view.aspect_type:
             continue
-        for pattern_key, pattern_data in ARCHETYPE_BEHAVIOR_PATTERNS.items():
-            if any(keyword in pattern_key for keyword in ("square", "opposition", "conjunction", "trine", "sextile")):
-                if pattern_key in aspect_key and pattern_key not in seen:
-                    seen.add(pattern_key)
-                    detected.append(pattern_data)
+        _collect(_BEHAVIOR_ASPECT_INDEX.get((_pair_key(view.planet1, view.planet2), view.aspect_type), ()))
 
     planets_section = chart_data.get("planets") or {}
     if isinstance(planets_section, Sequence) and not isinstance(planets_section, str):
@@ -488,32 +911,15 @@ def derive_behavior_patterns(chart_data: Dict[str, Any]) -> List[Dict[str, str]]
             house_str = str(int(house))
         elif isinstance(house, str):
             house_str = "".join(ch for ch in house if ch.isdigit()) or house.lower()
-        retrograde = details.get("retrograde") or details.get("is_retrograde")
-
-        for pattern_key, pattern_data in ARCHETYPE_BEHAVIOR_PATTERNS.items():
-            if pattern_key in seen:
-                continue
-            if " in " not in pattern_key or any(
-                keyword in pattern_key for keyword in ("square", "opposition", "conjunction", "trine", "sextile")
-            ):
-                continue
-            key_planet, remainder = pattern_key.split(" in ", 1)
-            if key_planet != planet_name:
-                continue
-            remainder = remainder.strip()
-            if "house" in remainder:
-                expected_house = "".join(ch for ch in remainder if ch.isdigit())
-                if expected_house and expected_house == house_str:
-                    seen.add(pattern_key)
-                    detected.append(pattern_data)
-            else:
-                expected_sign = remainder.replace("retrograde", "").strip()
-                sign_matches = expected_sign and expected_sign in sign
-                retrograde_required = "retrograde" in remainder
-                retrograde_matches = bool(retrograde) if retrograde_required else True
-                if sign_matches and retrograde_matches:
-                    seen.add(pattern_key)
-                    detected.append(pattern_data)
+        retrograde = bool(details.get("retrograde") or details.get("is_retrograde"))
+
+        candidates = [
+            *_BEHAVIOR_SIGN_INDEX.get((planet_name, sign, False), ()),
+            *(_BEHAVIOR_SIGN_INDEX.get((planet_name, sign, True), ()) if retrograde else ()),
+            *_BEHAVIOR_HOUSE_INDEX.get((planet_name, house_str), ()),
+        ]
+        candidates.sort(key=lambda match: match[0])
+        _collect(candidates)
 
     return detected
 
@@ -580,21 +986,29 @@ def integrate_life_expression(
     *,
     archetype_data: Dict[str, Any] | None = None,
     strategy: str | None = None,
+    analysis: ChartAnalysis | None = None,
 ) -> Dict[str, Any]:
     """Compose enriched life narrative payload with fallbacks for legacy callers."""
 
     archetype_data = archetype_data or {}
+    if analysis is None and isinstance(chart_data, dict):
+        analysis = ChartAnalysis(chart_data)
+    if analysis is not None:
+        return analysis.life_layer(archetype_data, strategy)
+    return _compute_life_layer({}, [], [], archetype_data, strategy)
+
+
+@traced("life_expression")
+def _compute_life_layer(
+    theme_scores: Dict[str, float],
+    derived_from: List[dict],
+    axis_ranking: List[Tuple[str, float]],
+    archetype_data: Dict[str, Any],
+    strategy: str | None,
+) -> Dict[str, Any]:
     core_themes = archetype_data.get("core_themes", []) or []
     tone = archetype_data.get("story_tone", "") or ""
 
-    theme_scores: Dict[str, float] = {}
-    derived_from: List[dict] = []
-    if chart_data:
-        try:
-            theme_scores, derived_from = analyze_aspects_weighted(chart_data)
-        except Exception:  # pragma: no cover - defensive fallback
-            theme_scores, derived_from = {}, []
-
     if not theme_scores and core_themes:
         theme_scores = {theme: 1.0 for theme in core_themes}
 
@@ -602,7 +1016,10 @@ def integrate_life_expression(
 
     axis_rank = []
     axis = None
-    if theme_scores:
+    if theme_scores and axis_ranking:
+        axis_rank = axis_ranking
+        axis = axis_rank[0][0]
+    elif theme_scores:
         axis, axis_rank = infer_axis_by_themes_and_pairs(theme_scores, derived_from)
     else:
         axis = infer_dominant_axis(archetype_data or {"core_themes": core_themes})
@@ -647,9 +1064,9 @@ def integrate_life_expression(
     }
 
 
-def generate_full_archetype_report(chart_data: Dict[str, Any]) -> Dict[str, Any]:
-    base = extract_archetype_data(chart_data)
-    base["behavior_patterns"] = derive_behavior_patterns(chart_data)
-    if "life_narrative" not in base:
-        base.update(integrate_life_expression(chart_data, archetype_data=base))
-    return base
+@traced("archetype")
+def generate_full_archetype_report(
+    chart_data: Dict[str, Any], *, analysis: ChartAnalysis | None = None
+) -> Dict[str, Any]:
+    analysis = analysis or ChartAnalysis(chart_data)
+    return extract_archetype_data(chart_data, analysis=analysis)
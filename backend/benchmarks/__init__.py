@@ -0,0 +1 @@
+"""Offline benchmarks for the Astrologi-AI backend hot paths."""
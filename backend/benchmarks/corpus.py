@@ -0,0 +1,74 @@
+"""Deterministic synthetic birth inputs shared by the benchmarks."""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytz
+
+from backend.app import LocationData, compute_natal_chart
+
+__all__ = ["BirthInput", "synthetic_births", "synthetic_charts"]
+
+# Fixed locations so the corpus never needs OpenCage.
+CITIES = (
+    ("İstanbul, Türkiye", 41.0082, 28.9784, "Europe/Istanbul"),
+    ("Ankara, Türkiye", 39.9334, 32.8597, "Europe/Istanbul"),
+    ("İzmir, Türkiye", 38.4237, 27.1428, "Europe/Istanbul"),
+    ("Berlin, Deutschland", 52.5200, 13.4050, "Europe/Berlin"),
+    ("London, United Kingdom", 51.5072, -0.1276, "Europe/London"),
+    ("New York, United States", 40.7128, -74.0060, "America/New_York"),
+    ("São Paulo, Brasil", -23.5558, -46.6396, "America/Sao_Paulo"),
+    ("Tokyo, Japan", 35.6762, 139.6503, "Asia/Tokyo"),
+    ("Sydney, Australia", -33.8688, 151.2093, "Australia/Sydney"),
+    ("Reykjavík, Ísland", 64.1466, -21.9426, "Atlantic/Reykjavik"),
+)
+
+DEFAULT_SEED = 20241019
+
+
+@dataclass(frozen=True, slots=True)
+class BirthInput:
+    location: LocationData
+    local_dt: datetime
+    utc_dt: datetime
+
+    def as_payload(self) -> Dict[str, str]:
+        """Request payload equivalent to this birth, as the frontend would send it."""
+        return {
+            "date": self.local_dt.strftime("%Y-%m-%d"),
+            "time": self.local_dt.strftime("%H:%M"),
+            "city": self.location.label,
+        }
+
+
+def synthetic_births(count: int = 300, *, seed: int = DEFAULT_SEED) -> List[BirthInput]:
+    """Return ``count`` reproducible births spread over 1940–2010 and ten cities."""
+    rng = random.Random(seed)
+    births: List[BirthInput] = []
+    for _ in range(count):
+        label, latitude, longitude, timezone = rng.choice(CITIES)
+        naive = datetime(
+            rng.randint(1940, 2010),
+            rng.randint(1, 12),
+            rng.randint(1, 28),
+            rng.randint(0, 23),
+            rng.randint(0, 59),
+        )
+        tz = pytz.timezone(timezone)
+        local_dt = tz.localize(naive)
+        births.append(
+            BirthInput(
+                location=LocationData(latitude=latitude, longitude=longitude, timezone=timezone, label=label),
+                local_dt=local_dt,
+                utc_dt=local_dt.astimezone(pytz.utc),
+            )
+        )
+    return births
+
+
+def synthetic_charts(count: int = 300, *, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """Compute full natal charts for :func:`synthetic_births`."""
+    return [compute_natal_chart(birth.location, birth.local_dt, birth.utc_dt) for birth in synthetic_births(count, seed=seed)]
@@ -0,0 +1,58 @@
+"""Measure prompt tokens saved by the compact chart encoding.
+
+Usage::
+
+    python -m backend.benchmarks.prompt_tokens --charts 50
+
+Compares the legacy ``json.dumps(chart_data)`` prompt context with
+``encode_chart`` output for the same charts, counted with the bundled
+tokenizer.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+from typing import Any, Dict, List, Mapping
+
+from backend.app import _build_formatted_aspects, _build_formatted_house_positions, _build_formatted_planet_positions
+from backend.benchmarks.corpus import synthetic_charts
+from backend.prompt_codec import CHART_LEGEND, encode_chart
+from backend.token_budget import count_tokens
+
+
+def _client_chart(chart: Mapping[str, Any]) -> Dict[str, Any]:
+    """Chart as the frontend stores and re-posts it (with formatted strings)."""
+    enriched = dict(chart)
+    enriched["formatted_positions"] = _build_formatted_planet_positions(enriched)
+    enriched["formatted_houses"] = _build_formatted_house_positions(enriched)
+    enriched["formatted_aspects"] = _build_formatted_aspects(enriched)
+    return enriched
+
+
+def run(count: int) -> Dict[str, Any]:
+    legacy: List[int] = []
+    compact: List[int] = []
+    for chart in synthetic_charts(count):
+        legacy.append(count_tokens(json.dumps(_client_chart(chart), ensure_ascii=False)))
+        compact.append(count_tokens(f"{CHART_LEGEND}\n{encode_chart(chart)}"))
+    reduction = 1 - (sum(compact) / sum(legacy)) if legacy else 0.0
+    return {
+        "charts": count,
+        "legacy_tokens_mean": round(statistics.mean(legacy), 1),
+        "compact_tokens_mean": round(statistics.mean(compact), 1),
+        "legacy_tokens_max": max(legacy),
+        "compact_tokens_max": max(compact),
+        "reduction": round(reduction, 3),
+    }
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--charts", type=int, default=50, help="number of synthetic charts to encode")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.charts), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Micro-benchmarks for the chart and archetype hot paths.
+
+Usage::
+
+    python -m backend.benchmarks.suite run --output bench/2024-10-19.json
+    python -m backend.benchmarks.suite run --baseline bench/main.json --threshold 0.15
+    python -m backend.benchmarks.suite compare bench/main.json bench/branch.json --threshold 0.15
+    python -m backend.benchmarks.suite batch --charts 100000
+
+``run`` times every stage over a fixed synthetic corpus and writes the
+results as JSON.  ``compare`` (or ``run --baseline``) exits with status 1
+when any stage's median per-call time regressed by more than the threshold.
+``batch`` times ``score_archetypes_batch`` against the per-chart functions
+it replaces, once each, over a large corpus.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import pickle
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from backend.app import (
+    build_category_card,
+    build_interpretation_categories,
+    build_life_card,
+    build_shadow_card,
+    calc_aspects,
+    calc_houses,
+    calc_planets,
+    julian_day,
+    normalize_ai_payload,
+)
+from backend.archetype_engine import (
+    call_ai_model,
+    clean_text,
+    extract_archetype_data,
+    analyze_aspects_weighted,
+    generate_full_archetype_report,
+    infer_axis_by_themes_and_pairs,
+    limit_sentences,
+    score_archetypes_batch,
+)
+from backend.benchmarks.corpus import DEFAULT_SEED, synthetic_births, synthetic_charts
+from backend.textnorm import cache_clear as clear_text_cache
+
+DEFAULT_CORPUS_SIZE = 300
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_BATCH_CHARTS = 100_000
+DEFAULT_BATCH_DISTINCT = 5_000
+
+# (name, function, inputs[, reset]); ``reset`` runs before every timed pass.
+Stage = Tuple[Any, ...]
+
+
+def _llm_like_texts(reports: Sequence[Dict[str, Any]]) -> List[str]:
+    """Raw model output shapes that clean_text/limit_sentences see in production."""
+    texts = []
+    for index, report in enumerate(reports):
+        narrative = report.get("life_expression") or call_ai_model("")
+        themes = report.get("core_themes") or []
+        if index % 3 == 0:
+            texts.append(f"```json\n{json.dumps({'summary': narrative}, ensure_ascii=False)}\n```")
+        elif index % 3 == 1:
+            texts.append(f"Summary - {narrative}  Temalar: {json.dumps(themes)} • {narrative}")
+        else:
+            texts.append(f"{narrative}\n\n• {' • '.join(themes)}\n{narrative}")
+    return texts
+
+
+def build_stages(corpus_size: int, seed: int) -> List[Stage]:
+    """Prepare the inputs for every stage once, outside the timed loops."""
+    births = synthetic_births(corpus_size, seed=seed)
+    charts = synthetic_charts(corpus_size, seed=seed)
+    jds = [julian_day(birth.utc_dt) for birth in births]
+    house_inputs = [(jd, birth.location.latitude, birth.location.longitude) for jd, birth in zip(jds, births)]
+    houses = [calc_houses(*args) for args in house_inputs]
+    planet_inputs = [(jd, [0.0, *cusps], angles) for jd, (cusps, angles) in zip(jds, houses)]
+    aspect_inputs = [(chart["planets"], chart["angles"]) for chart in charts]
+    reports = [generate_full_archetype_report(chart) for chart in charts]
+    texts = _llm_like_texts(reports)
+    ai_payloads = [
+        normalize_ai_payload({"headline": "Kozmik Yorum", "summary": text, "advice": "Kendi ritmine güven."})
+        for text in texts
+    ]
+    category_inputs = list(zip(reports, ai_payloads))
+    categories = [build_interpretation_categories(report, payload) for report, payload in category_inputs]
+    life_inputs = [(payload, report.get("life_narrative"), report) for report, payload in category_inputs]
+    shadow_inputs = [
+        (category.get("shadow"), report.get("behavior_patterns"))
+        for category, report in zip(categories, reports)
+    ]
+
+    return [
+        ("julian_day", julian_day, [birth.utc_dt for birth in births]),
+        ("calc_houses", lambda args: calc_houses(*args), house_inputs),
+        ("calc_planets", lambda args: calc_planets(args[0], args[1], angles=args[2]), planet_inputs),
+        ("calc_aspects", lambda args: calc_aspects(*args), aspect_inputs),
+        ("extract_archetype_data", extract_archetype_data, charts),
+        ("generate_full_archetype_report", generate_full_archetype_report, charts),
+        # The text normaliser memoises per string; clear it so every pass measures the cleanup itself.
+        ("clean_text", clean_text, texts, clear_text_cache),
+        ("limit_sentences", limit_sentences, texts, clear_text_cache),
+        ("build_interpretation_categories", lambda args: build_interpretation_categories(*args), category_inputs),
+        ("build_life_card", lambda args: build_life_card(*args), life_inputs),
+        (
+            "build_category_card",
+            lambda category: build_category_card(category, default_title="İş & Amaç"),
+            [category.get("career") for category in categories],
+        ),
+        ("build_shadow_card", lambda args: build_shadow_card(*args), shadow_inputs),
+    ]
+
+
+def time_stage(
+    func: Callable[[Any], Any],
+    inputs: Sequence[Any],
+    repeats: int,
+    reset: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """Time ``func`` over the whole corpus ``repeats`` times; report per-call microseconds.
+
+    ``reset`` (untimed) runs before each pass, to drop memoised results.
+    """
+    func(inputs[0])  # warm caches and lazy imports
+    per_call: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            if reset is not None:
+                reset()
+            started = time.perf_counter()
+            for item in inputs:
+                func(item)
+            per_call.append((time.perf_counter() - started) / len(inputs) * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_us": round(statistics.median(per_call), 3),
+        "min_us": round(min(per_call), 3),
+        "max_us": round(max(per_call), 3),
+    }
+
+
+def run_suite(corpus_size: int, repeats: int, seed: int, only: Sequence[str] | None = None) -> Dict[str, Any]:
+    stages = build_stages(corpus_size, seed)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, func, inputs, *reset in stages:
+        if only and name not in only:
+            continue
+        results[name] = time_stage(func, inputs, repeats, *reset)
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus_size": corpus_size,
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "stages": results,
+    }
+
+
+def time_batch(chart_count: int, distinct: int, seed: int) -> Dict[str, Any]:
+    """Wall time of scoring ``chart_count`` charts per chart and in one batch.
+
+    Only ``distinct`` charts are computed; the rest are pickled copies of
+    them, so every chart still has its own dicts and strings, as charts
+    loaded from MongoDB would.  Both paths run with the GC paused, like
+    :func:`time_stage`.
+    """
+    unique = synthetic_charts(min(distinct, chart_count), seed=seed)
+    charts = [pickle.loads(pickle.dumps(unique[index % len(unique)])) for index in range(chart_count)]
+    score_archetypes_batch(unique[:10])  # warm the key table and lazy imports
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for chart in charts:
+            theme_scores, derived_from = analyze_aspects_weighted(chart)
+            infer_axis_by_themes_and_pairs(theme_scores, derived_from)
+        per_chart = time.perf_counter() - started
+        started = time.perf_counter()
+        score_archetypes_batch(charts)
+        batch = time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "charts": chart_count,
+        "distinct": len(unique),
+        "per_chart_s": round(per_chart, 3),
+        "batch_s": round(batch, 3),
+        "speedup": round(per_chart / batch, 2) if batch else None,
+    }
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+) -> Tuple[List[str], List[str]]:
+    """Return (report lines, regressed stage names)."""
+    lines: List[str] = []
+    regressions: List[str] = []
+    base_stages = baseline.get("stages") or {}
+    for name, stats in (current.get("stages") or {}).items():
+        base = base_stages.get(name)
+        if not base:
+            lines.append(f"{name:<34} {stats['median_us']:>12.2f}us   (new)")
+            continue
+        ratio = stats["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        lines.append(
+            f"{name:<34} {base['median_us']:>12.2f}us -> {stats['median_us']:>12.2f}us  {ratio:+7.1%}{flag}"
+        )
+    return lines, regressions
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Astrologi-AI hot path micro-benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--corpus", type=int, default=DEFAULT_CORPUS_SIZE)
+    run_parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--stage", action="append", help="only run the named stage (repeatable)")
+    run_parser.add_argument("--output", help="where to write the results JSON (default: stdout)")
+    run_parser.add_argument("--baseline", help="results JSON to compare against")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    batch_parser = commands.add_parser("batch", help="time batch archetype scoring against the per-chart path")
+    batch_parser.add_argument("--charts", type=int, default=DEFAULT_BATCH_CHARTS)
+    batch_parser.add_argument("--distinct", type=int, default=DEFAULT_BATCH_DISTINCT)
+    batch_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+    args = parser.parse_args(argv)
+    # Per-chart INFO logs and missing-ephemeris warnings would dominate the timings.
+    logging.disable(logging.WARNING)
+
+    if args.command == "batch":
+        print(json.dumps(time_batch(args.charts, args.distinct, args.seed), indent=2))
+        return 0
+
+    if args.command == "run":
+        results = run_suite(args.corpus, args.repeats, args.seed, args.stage)
+        rendered = json.dumps(results, indent=2, ensure_ascii=False)
+        if args.output:
+            output = Path(args.output)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(rendered + "\n", encoding="utf-8")
+        else:
+            print(rendered)
+        if not args.baseline:
+            return 0
+        baseline, current = _load(args.baseline), results
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    lines, regressions = compare_results(baseline, current, args.threshold)
+    print("\n".join(lines), file=sys.stderr)
+    if regressions:
+        print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Circuit breakers for outbound dependencies (Groq, OpenCage, Mongo).
+
+Each breaker watches the outcome of the last ``CIRCUIT_WINDOW`` calls.  Once
+at least ``CIRCUIT_MIN_CALLS`` are recorded and the failure rate reaches
+``CIRCUIT_FAILURE_RATE`` it opens: callers get :class:`CircuitOpen`
+immediately instead of waiting out a timeout, and fall back to whatever the
+call site already does without the dependency.  After ``CIRCUIT_OPEN_SECONDS``
+the breaker goes half-open and lets ``CIRCUIT_HALF_OPEN_CALLS`` trial calls
+through; a success closes it, a failure opens it for another period.
+
+State is per worker process.  Transitions are logged as ``circuit_state``
+events, exported as the ``astrologi_circuit_state`` gauge and shown in
+``/api/health``.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from backend.config import env_float, env_int
+from backend.eventlog import log_event
+from backend.metrics import record_circuit_rejection, record_circuit_state
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CLOSED",
+    "HALF_OPEN",
+    "OPEN",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "circuit_breaker",
+    "circuit_states",
+]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+CIRCUIT_WINDOW = env_int("CIRCUIT_WINDOW", 20)
+CIRCUIT_MIN_CALLS = env_int("CIRCUIT_MIN_CALLS", 5)
+CIRCUIT_FAILURE_RATE = env_float("CIRCUIT_FAILURE_RATE", 0.5)
+CIRCUIT_OPEN_SECONDS = env_float("CIRCUIT_OPEN_SECONDS", 30.0)
+CIRCUIT_HALF_OPEN_CALLS = env_int("CIRCUIT_HALF_OPEN_CALLS", 1)
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"{name} geçici olarak devre dışı (devre kesici açık).")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class _GuardedCall:
+    __slots__ = ("failed",)
+
+    def __init__(self) -> None:
+        self.failed: Optional[bool] = None
+
+    def observe_status(self, status_code: int) -> None:
+        """Classify an HTTP answer: only throttling and server errors count as failures."""
+        self.failed = status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a sliding window of call outcomes."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: int = CIRCUIT_WINDOW,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        half_open_calls: int = CIRCUIT_HALF_OPEN_CALLS,
+    ) -> None:
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self._outcomes: Deque[bool] = deque(maxlen=max(window, self.min_calls))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._lock = Lock()
+        record_circuit_state(name, CLOSED)
+
+    @property
+    def state(self) -> str:
+        return self.snapshot()["state"]
+
+    def subscribe(self, listener: Callable[[str, str], None]) -> None:
+        """Call ``listener(name, state)`` after every transition."""
+        self._listeners.append(listener)
+
+    def allow(self) -> None:
+        """Reserve a call, or raise :class:`CircuitOpen` if none may be made now."""
+        with self._lock:
+            transitions = self._maybe_half_open()
+            allowed = self._state == CLOSED
+            if self._state == HALF_OPEN and self._trial_calls < self.half_open_calls:
+                self._trial_calls += 1
+                allowed = True
+            retry_after = max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+        self._notify(transitions)
+        if allowed:
+            return
+        record_circuit_rejection(self.name)
+        raise CircuitOpen(self.name, retry_after)
+
+    def check(self) -> None:
+        """Raise :class:`CircuitOpen` while open, without reserving a trial call."""
+        snapshot = self.snapshot()
+        if snapshot["state"] == OPEN:
+            record_circuit_rejection(self.name)
+            raise CircuitOpen(self.name, snapshot["retry_after"])
+
+    def record_success(self) -> None:
+        self._record(False)
+
+    def record_failure(self) -> None:
+        self._record(True)
+
+    @contextmanager
+    def guard(self) -> Iterator[_GuardedCall]:
+        """Run one call under the breaker; raising counts as a failure.
+
+        Call ``observe_status`` on the yielded object for HTTP calls so that
+        client errors (4xx other than 429) are not held against the dependency.
+        """
+        self.allow()
+        call = _GuardedCall()
+        try:
+            yield call
+        except Exception:
+            self._record(True if call.failed is None else call.failed)
+            raise
+        self._record(bool(call.failed))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            transitions = self._maybe_half_open()
+            failures = sum(self._outcomes)
+            body: Dict[str, Any] = {
+                "state": self._state,
+                "calls": len(self._outcomes),
+                "failure_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+            }
+            if self._state == OPEN:
+                body["retry_after"] = round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 1)
+        self._notify(transitions)
+        return body
+
+    def _record(self, failed: bool) -> None:
+        with self._lock:
+            transitions = self._maybe_half_open()
+            if self._state == HALF_OPEN:
+                transitions.append(self._open() if failed else self._close())
+            elif self._state == CLOSED:
+                self._outcomes.append(failed)
+                if failed and len(self._outcomes) >= self.min_calls:
+                    if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                        transitions.append(self._open())
+            # While open, late results of calls started before it opened are ignored.
+        self._notify(transitions)
+
+    # The helpers below run with ``_lock`` held and return the transitions they made.
+    def _maybe_half_open(self) -> List[str]:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trial_calls = 0
+            return [HALF_OPEN]
+        return []
+
+    def _open(self) -> str:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        return OPEN
+
+    def _close(self) -> str:
+        self._state = CLOSED
+        self._outcomes.clear()
+        return CLOSED
+
+    def _notify(self, transitions: List[str]) -> None:
+        for state in transitions:
+            record_circuit_state(self.name, state)
+            log_event(
+                logger,
+                "circuit_state",
+                level=logging.WARNING if state == OPEN else logging.INFO,
+                dependency=self.name,
+                state=state,
+            )
+            for listener in self._listeners:
+                try:
+                    listener(self.name, state)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Circuit listener failed for %s.", self.name)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = Lock()
+
+
+def circuit_breaker(name: str, **options: Any) -> CircuitBreaker:
+    """Return the process-wide breaker for ``name``, creating it with ``options``."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name, **options)
+    return breaker
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every registered breaker, keyed by dependency name."""
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
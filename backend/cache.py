@@ -0,0 +1,587 @@
+"""Cache interface shared by the backend, with local and shared tiers.
+
+Backends store opaque bytes under string keys with a TTL:
+
+* :class:`MemoryCache` is an in-process LRU bounded by the total size of its
+  entries (``CACHE_MEMORY_MAX_BYTES``).
+* :class:`SQLiteCache` is an on-disk table that survives restarts and is
+  shared by the workers of one node.
+* :class:`RedisCache` speaks the Redis protocol (Redis, Valkey, KeyDB, ...)
+  and is shared by every node.  Its calls run behind the ``cache`` circuit
+  breaker, so an unreachable server costs nothing but misses.
+
+``CACHE_URL`` picks the shared tier (``sqlite:///abs/path/cache.db`` or
+``redis://[:password@]host:port/db``; empty for memory only).  The
+configured tier always sits behind a :class:`MemoryCache`, and
+``CACHE_LOCAL_TTL_SECONDS`` bounds how stale that copy can get on another
+node.
+
+Callers use a :class:`CacheNamespace`, which prefixes keys and encodes values
+as compact JSON, zlib-compressed above ``CACHE_COMPRESS_MIN_BYTES``, behind a
+small binary header.  The header carries the logical expiry and the time the
+value took to compute.  :meth:`CacheNamespace.get_or_set` uses those for
+probabilistic early expiry: as an entry nears expiry, an increasing share of
+readers recompute it while the rest keep being served.  That way a popular
+key is refreshed once instead of by every request at the moment it expires.
+Cache failures are logged and read as misses; they never fail a request.
+
+``python -m backend.loadtest.resp_stub`` runs an in-memory Redis-protocol
+server for trying the shared tier locally.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import queue
+import random
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from backend.breaker import CircuitOpen, circuit_breaker
+from backend.config import env_float, env_int
+from backend.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CacheBackend",
+    "CacheError",
+    "CacheNamespace",
+    "MemoryCache",
+    "RedisCache",
+    "SQLiteCache",
+    "TieredCache",
+    "build_cache",
+]
+
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "astrologi")
+CACHE_MEMORY_MAX_BYTES = env_int("CACHE_MEMORY_MAX_BYTES", 32 * 1024 * 1024)
+CACHE_LOCAL_TTL_SECONDS = env_float("CACHE_LOCAL_TTL_SECONDS", 60.0)
+CACHE_SQLITE_MAX_ENTRIES = env_int("CACHE_SQLITE_MAX_ENTRIES", 100_000)
+CACHE_REDIS_POOL_SIZE = env_int("CACHE_REDIS_POOL_SIZE", 8)
+CACHE_TIMEOUT_SECONDS = env_float("CACHE_TIMEOUT_SECONDS", 0.25)
+CACHE_COMPRESS_MIN_BYTES = env_int("CACHE_COMPRESS_MIN_BYTES", 512)
+# XFetch beta: above 1 refreshes earlier, below 1 later; 0 disables early expiry.
+CACHE_EARLY_EXPIRY_BETA = env_float("CACHE_EARLY_EXPIRY_BETA", 1.0)
+
+# Per-entry bookkeeping counted against CACHE_MEMORY_MAX_BYTES besides key and value.
+_ENTRY_OVERHEAD_BYTES = 100
+# Longer keys are hashed so every tier accepts them.
+_MAX_KEY_LENGTH = 200
+
+# version, flags, logical expiry (unix seconds), compute time (seconds)
+_HEADER = struct.Struct("<BBdf")
+_FORMAT_VERSION = 1
+_FLAG_ZLIB = 0x01
+
+
+class CacheError(RuntimeError):
+    """A cache backend failed or answered with an error."""
+
+
+def encode_value(value: Any, *, expires_at: float, delta: float) -> bytes:
+    payload = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    flags = 0
+    if len(payload) >= CACHE_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, _FLAG_ZLIB
+    return _HEADER.pack(_FORMAT_VERSION, flags, expires_at, delta) + payload
+
+
+def decode_value(data: bytes) -> Tuple[Any, float, float]:
+    """``(value, expires_at, delta)``; raises ``ValueError`` on foreign or corrupt data."""
+    if len(data) < _HEADER.size:
+        raise ValueError("truncated cache entry")
+    version, flags, expires_at, delta = _HEADER.unpack_from(data)
+    if version != _FORMAT_VERSION:
+        raise ValueError(f"unknown cache entry version {version}")
+    payload = data[_HEADER.size:]
+    if flags & _FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return json.loads(payload), expires_at, delta
+
+
+class CacheBackend:
+    """Bytes in, bytes out, with a TTL in seconds; ``get`` returns ``None`` on a miss."""
+
+    name = "cache"
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        return None
+
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU evicting the least recently used entries above ``max_bytes``."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int = CACHE_MEMORY_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cost(key: str, value: bytes) -> int:
+        return len(key) + len(value) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        cost = self._cost(key, value)
+        if ttl <= 0 or cost > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._size += cost
+            while self._size > self.max_bytes:
+                oldest, (_, stored) = self._entries.popitem(last=False)
+                self._size -= self._cost(oldest, stored)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= self._cost(key, entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk tier in one SQLite file (WAL mode), one connection per thread.
+
+    Expired rows are skipped on read and swept every ``_SWEEP_EVERY`` writes,
+    which also trims the table to ``max_entries`` rows, soonest to expire first.
+    """
+
+    name = "sqlite"
+    _SWEEP_EVERY = 500
+
+    def __init__(self, path: str, *, max_entries: int = CACHE_SQLITE_MAX_ENTRIES) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=max(CACHE_TIMEOUT_SECONDS, 1.0), isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as exc:
+            raise CacheError(f"SQLite cache read failed: {exc}") from exc
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, sqlite3.Binary(value), time.time() + ttl),
+            )
+            with self._lock:
+                self._writes += 1
+                sweep = self._writes % self._SWEEP_EVERY == 0
+            if sweep:
+                self._sweep(connection)
+        except sqlite3.Error as exc:
+            raise CacheError(f"SQLite cache write failed: {exc}") from exc
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as exc:
+            raise CacheError(f"SQLite cache delete failed: {exc}") from exc
+
+    def _sweep(self, connection: sqlite3.Connection) -> None:
+        connection.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        excess = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+
+    def ping(self) -> bool:
+        self._connection().execute("SELECT 1").fetchone()
+        return True
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class _RespConnection:
+    """One socket speaking RESP2, the Redis wire protocol."""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def command(self, *args: Any) -> Any:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Cache server closed the connection.")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            raise CacheError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Cache server closed the connection.")
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise CacheError(f"Unexpected reply from cache server: {line[:40]!r}")
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """Shared tier over the Redis protocol with a small per-process connection pool."""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = CACHE_TIMEOUT_SECONDS,
+        pool_size: int = CACHE_REDIS_POOL_SIZE,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.breaker = circuit_breaker("cache")
+        self._pool: "queue.LifoQueue[_RespConnection]" = queue.LifoQueue()
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_url(cls, url: str, **options: Any) -> "RedisCache":
+        parsed = urlparse(url)
+        db = parsed.path.strip("/")
+        return cls(
+            parsed.hostname or "127.0.0.1",
+            parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            **options,
+        )
+
+    def _checkout(self) -> _RespConnection:
+        if self._pid != os.getpid():
+            # Sockets inherited across fork are shared with the parent; start over.
+            self._pool = queue.LifoQueue()
+            self._pid = os.getpid()
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        connection = _RespConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                connection.command("AUTH", self.password)
+            if self.db:
+                connection.command("SELECT", self.db)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    def _command(self, *args: Any) -> Any:
+        try:
+            with self.breaker.guard():
+                connection = self._checkout()
+                try:
+                    reply = connection.command(*args)
+                except CacheError:
+                    # An error reply leaves the connection usable.
+                    self._checkin(connection)
+                    raise
+                except Exception:
+                    connection.close()
+                    raise
+                self._checkin(connection)
+                return reply
+        except (CircuitOpen, CacheError):
+            raise
+        except (OSError, ValueError) as exc:
+            raise CacheError(f"Cache server unavailable: {exc}") from exc
+
+    def _checkin(self, connection: _RespConnection) -> None:
+        if self._pool.qsize() < self.pool_size:
+            self._pool.put(connection)
+        else:
+            connection.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl > 0:
+            self._command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def ping(self) -> bool:
+        return self._command("PING") == "PONG"
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class TieredCache(CacheBackend):
+    """A local tier in front of a shared one; shared hits are copied into the local tier.
+
+    Local copies live at most ``local_ttl`` seconds, the staleness bound for
+    entries deleted or replaced on another node.
+    """
+
+    def __init__(self, local: CacheBackend, shared: CacheBackend, *, local_ttl: float = CACHE_LOCAL_TTL_SECONDS) -> None:
+        self.local = local
+        self.shared = shared
+        self.local_ttl = local_ttl
+        self.name = f"{local.name}+{shared.name}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value, self.local_ttl)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.local.set(key, value, min(ttl, self.local_ttl))
+        self.shared.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def ping(self) -> bool:
+        return self.shared.ping()
+
+    def close(self) -> None:
+        self.shared.close()
+
+
+class CacheNamespace:
+    """Typed view of a backend: prefixed keys, JSON values, default TTL, early expiry.
+
+    Values must be JSON-serialisable; each read returns a fresh copy.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        name: str,
+        *,
+        ttl: float,
+        beta: float = CACHE_EARLY_EXPIRY_BETA,
+        prefix: str = CACHE_KEY_PREFIX,
+    ) -> None:
+        self.backend = backend
+        self.name = name
+        self.ttl = ttl
+        self.beta = beta
+        self._prefix = f"{prefix}:{name}:"
+        # Keys this process is refreshing early; other readers keep the cached value meanwhile.
+        self._refreshing: set = set()
+        self._refreshing_lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        full = self._prefix + key
+        if len(full) > _MAX_KEY_LENGTH:
+            full = self._prefix + "sha1:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return full
+
+    def _load(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        try:
+            data = self.backend.get(self._key(key))
+        except CircuitOpen:
+            return None
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Cache read failed for %s:%s: %s", self.name, key, exc)
+            return None
+        if data is None:
+            return None
+        try:
+            entry = decode_value(data)
+        except (ValueError, zlib.error) as exc:
+            logger.debug("Discarding unreadable cache entry %s:%s: %s", self.name, key, exc)
+            return None
+        return entry if entry[1] > time.time() else None
+
+    def get(self, key: str) -> Any:
+        """Cached value for ``key``, or ``None``."""
+        entry = self._load(key)
+        record_cache(self.name, entry is not None)
+        return None if entry is None else entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, *, delta: float = 0.0) -> None:
+        """Store ``value``; ``delta`` is how long it took to compute, for early expiry."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        try:
+            data = encode_value(value, expires_at=time.time() + ttl, delta=delta)
+        except (TypeError, ValueError) as exc:
+            logger.warning("Value for %s:%s is not cacheable: %s", self.name, key, exc)
+            return
+        try:
+            self.backend.set(self._key(key), data, ttl)
+        except CircuitOpen:
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Cache write failed for %s:%s: %s", self.name, key, exc)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.backend.delete(self._key(key))
+        except CircuitOpen:
+            return
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Cache delete failed for %s:%s: %s", self.name, key, exc)
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Cached value for ``key``, computing and storing it on a miss or early expiry.
+
+        An early refresh that raises falls back to the still-valid cached value.
+        """
+        entry = self._load(key)
+        if entry is not None:
+            value, expires_at, delta = entry
+            # XFetch: recompute with probability rising towards expiry, scaled by compute time.
+            if self.beta <= 0 or time.time() - delta * self.beta * math.log(1.0 - random.random()) < expires_at:
+                record_cache(self.name, True)
+                return value
+            with self._refreshing_lock:
+                if key in self._refreshing:
+                    record_cache(self.name, True)
+                    return value
+                self._refreshing.add(key)
+        record_cache(self.name, False)
+        started = time.perf_counter()
+        try:
+            fresh = compute()
+        except Exception:
+            if entry is None:
+                raise
+            logger.debug("Early refresh of %s:%s failed; serving the cached value.", self.name, key, exc_info=True)
+            return entry[0]
+        finally:
+            if entry is not None:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+        self.set(key, fresh, ttl, delta=time.perf_counter() - started)
+        return fresh
+
+
+def build_cache(url: str = CACHE_URL) -> CacheBackend:
+    """Backend for ``url``: memory only, or memory in front of SQLite or Redis."""
+    local = MemoryCache()
+    if not url or url == "memory":
+        return local
+    scheme, _, rest = url.partition(":")
+    scheme = scheme.lower()
+    if scheme == "sqlite":
+        # sqlite:///var/cache/astrologi.db (absolute) or sqlite:cache.db (relative)
+        shared: CacheBackend = SQLiteCache(rest[2:] if rest.startswith("//") else rest)
+    elif scheme == "redis":
+        shared = RedisCache.from_url(url)
+    else:
+        raise ValueError(f"Unsupported CACHE_URL scheme {scheme!r}")
+    return TieredCache(local, shared)
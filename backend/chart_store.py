@@ -0,0 +1,163 @@
+"""Server-side store of computed natal charts, keyed by birth inputs.
+
+A chart depends only on the normalised (date, time, city) inputs and the
+chart engine, so its id is ``<chart_hash>:<engine version>``: repeat requests
+find it with one ``_id`` lookup, and bumping the engine version naturally
+orphans charts computed by older code.  A :class:`CacheNamespace` sits in
+front of Mongo; when Mongo is unavailable charts are still computed and
+cached, just not persisted.
+
+Writers that only need the id (profile saves, imports) use :meth:`ChartStore.warm`:
+the id is derived from the inputs immediately and a missing chart is computed
+on a small background pool instead of on the request thread.
+"""
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from backend.cache import CacheNamespace, MemoryCache
+from backend.config import env_int
+from backend.profile_store import chart_hash
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ChartStore"]
+
+CHART_WARM_WORKERS = env_int("CHART_WARM_WORKERS", 2)
+
+
+class ChartStore:
+    """Look up or compute charts; returned charts are private copies.
+
+    Cache entries are encoded, so every cache hit already decodes to a fresh copy.
+    """
+
+    def __init__(
+        self,
+        get_collection: Callable[[], Any],
+        engine_version: str,
+        *,
+        cache: Optional[CacheNamespace] = None,
+    ) -> None:
+        self.get_collection = get_collection
+        self.engine_version = engine_version
+        self.cache = cache if cache is not None else CacheNamespace(MemoryCache(), "chart", ttl=86400.0)
+        self._warming: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def chart_id(self, date: Any, time_value: Any, city: Any) -> Optional[str]:
+        """Id for the inputs, or ``None`` when they are incomplete (never stored)."""
+        key = chart_hash(date, time_value, city)
+        return f"{key}:{self.engine_version}" if key else None
+
+    def _collection(self) -> Any:
+        try:
+            return self.get_collection()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Chart store collection unavailable: %s", exc)
+            return None
+
+    def get(self, chart_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the stored chart ``chart_id``, if any."""
+        cached = self.cache.get(chart_id)
+        if isinstance(cached, dict):
+            return cached
+        collection = self._collection()
+        if collection is None:
+            return None
+        try:
+            document = collection.find_one({"_id": chart_id}, {"chart": 1})
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Chart lookup failed for %s.", chart_id)
+            return None
+        if not document or not isinstance(document.get("chart"), dict):
+            return None
+        self.cache.set(chart_id, document["chart"])
+        return copy.deepcopy(document["chart"])
+
+    def get_or_compute(
+        self,
+        date: Any,
+        time_value: Any,
+        city: Any,
+        compute: Callable[[], Dict[str, Any]],
+    ) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Return ``(chart_id, chart)``, computing and persisting the chart on a miss.
+
+        ``chart_id`` is ``None`` when the inputs cannot be keyed (e.g. no
+        birth time); the chart is then computed every time.
+        """
+        chart_id = self.chart_id(date, time_value, city)
+        if chart_id is None:
+            return None, compute()
+        stored = self.get(chart_id)
+        if stored is not None:
+            return chart_id, stored
+        chart = compute()
+        self.cache.set(chart_id, chart)
+        collection = self._collection()
+        if collection is not None:
+            try:
+                collection.update_one(
+                    {"_id": chart_id},
+                    {
+                        "$setOnInsert": {
+                            "chart": chart,
+                            "engine_version": self.engine_version,
+                            "created_at": datetime.utcnow(),
+                        }
+                    },
+                    upsert=True,
+                )
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not persist chart %s.", chart_id)
+        return chart_id, chart
+
+    def warm(
+        self,
+        date: Any,
+        time_value: Any,
+        city: Any,
+        compute: Callable[[], Dict[str, Any]],
+    ) -> Tuple[Optional[str], bool]:
+        """Return ``(chart_id, stored)`` without blocking on a computation.
+
+        ``stored`` is true when the chart is already cached or persisted.
+        Otherwise the chart is computed in the background, at most once per
+        id at a time, and is available under the same id once done.
+        """
+        chart_id = self.chart_id(date, time_value, city)
+        if chart_id is None:
+            return None, False
+        if self.get(chart_id) is not None:
+            return chart_id, True
+        with self._lock:
+            if chart_id in self._warming:
+                return chart_id, False
+            self._warming.add(chart_id)
+            # Threads do not survive gunicorn's fork; each worker builds its own pool.
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, CHART_WARM_WORKERS), thread_name_prefix="chart-warm"
+                )
+            executor = self._executor
+        executor.submit(self._warm, chart_id, date, time_value, city, compute)
+        return chart_id, False
+
+    def _warm(self, chart_id: str, date: Any, time_value: Any, city: Any, compute: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self.get_or_compute(date, time_value, city, compute)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Background chart computation failed for %s: %s", chart_id, exc)
+        finally:
+            with self._lock:
+                self._warming.discard(chart_id)
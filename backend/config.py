@@ -1,8 +1,11 @@
 """Configuration objects for the Flask application."""
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
 
 def _get_env(key: str, default: str | None = None) -> str | None:
     """Fetch environment variables with an optional default."""
@@ -12,6 +15,38 @@ def _get_env(key: str, default: str | None = None) -> str | None:
     return os.environ.get(key, default)
 
 
+def env_int(key: str, default: int) -> int:
+    """Read an integer environment variable, falling back on invalid values."""
+    value = _get_env(key)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Invalid value for %s=%s; using default %s", key, value, default)
+        return default
+
+
+def env_float(key: str, default: float) -> float:
+    """Read a float environment variable, falling back on invalid values."""
+    value = _get_env(key)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning("Invalid value for %s=%s; using default %s", key, value, default)
+        return default
+
+
+def env_bool(key: str, default: bool = False) -> bool:
+    """Read a boolean flag such as ``1``/``true``/``yes`` from the environment."""
+    value = _get_env(key)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 @dataclass(slots=True)
 class BaseConfig:
     """Base configuration shared across environments."""
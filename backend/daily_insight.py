@@ -0,0 +1,545 @@
+"""Nightly pregeneration of daily insights.
+
+Usage::
+
+    python -m backend.daily_insight run                 # tomorrow (UTC)
+    python -m backend.daily_insight run --date 2026-10-20 --batch-size 500
+    python -m backend.daily_insight run --date 2026-10-20 --restart
+
+The job streams profiles in ``_id`` order, compares the sky at noon UTC of the
+target day with each stored natal chart, and reduces the result to a transit
+signature: the Moon's sign and phase, the retrograde bodies and the tightest
+transit to the personal points.  Profiles with the same signature share one
+generated text, so the number of LLM calls grows with the number of distinct
+signatures rather than with the number of users.  New signatures are generated
+through a rate-limited worker pool.
+
+Everything lives in one collection, told apart by ``_id`` prefix:
+
+* ``run:<date>`` is the checkpoint, with the last profile ``_id`` whose batch
+  is fully written.  A crashed run resumes after it.
+* ``text:<date>:<signature>`` holds one generated text.  A resumed run reuses
+  texts that are already stored, but only LLM-refined ones: a deterministic
+  fallback written while Groq was down is replaced by the next run (resumed
+  or ``--restart``) and by on-demand requests, and only reused within the run
+  that wrote it.
+* ``profile:<date>:<profile id>`` is what ``GET /api/daily-insight`` reads.
+
+All documents expire through a TTL index after ``DAILY_INSIGHT_TTL_DAYS``.
+
+The endpoint never generates on the request thread.  For today or tomorrow
+(UTC) it returns the stored insight, or answers ``202`` with ``Retry-After``
+and generates the missing one on a small background pool.  A stored fallback
+is served as is while a refined one is generated in the background.  At most
+``DAILY_INSIGHT_MAX_PENDING`` profiles wait there per worker; beyond that it
+answers ``503``.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+try:
+    from pymongo import UpdateOne
+except ImportError:  # pragma: no cover - optional dependency
+    UpdateOne = None  # type: ignore[assignment]
+
+from backend.config import env_float, env_int
+from backend.db import MongoUnavailable
+from backend.eventlog import log_event
+from backend.sky import SkyService, SkySnapshot
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "DailyInsightPipeline",
+    "RateLimiter",
+    "RunReport",
+    "init_app",
+    "transit_signature",
+]
+
+DAILY_INSIGHT_BATCH_SIZE = env_int("DAILY_INSIGHT_BATCH_SIZE", 500)
+DAILY_INSIGHT_REQUESTS_PER_MINUTE = env_float("DAILY_INSIGHT_REQUESTS_PER_MINUTE", 30.0)
+DAILY_INSIGHT_CONCURRENCY = env_int("DAILY_INSIGHT_CONCURRENCY", 4)
+DAILY_INSIGHT_TTL_DAYS = env_float("DAILY_INSIGHT_TTL_DAYS", 3.0)
+DAILY_INSIGHT_MAX_PENDING = env_int("DAILY_INSIGHT_MAX_PENDING", 64)
+DAILY_INSIGHT_RETRY_AFTER_SECONDS = 5
+DAILY_TRANSIT_ORB = env_float("DAILY_TRANSIT_ORB", 2.0)
+# One transit keeps signatures to at most ~300 per day (9 bodies x 5 aspects x 7
+# points); with two almost every profile gets its own and nothing is shared.
+DAILY_SIGNATURE_TRANSITS = env_int("DAILY_SIGNATURE_TRANSITS", 1)
+
+# Degraded texts are stored and served but never shared across runs.
+REUSABLE_SOURCES = frozenset({"refined"})
+
+# The Moon passes through a 2° orb in about four hours, so its aspects do not
+# describe a whole day; its sign and phase enter the signature instead.
+TRANSIT_BODIES = ("Sun", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto")
+NATAL_POINTS = ("Sun", "Moon", "Mercury", "Venus", "Mars")
+NATAL_ANGLES = {"Ascendant": "ascendant", "Midheaven": "midheaven"}
+_TRANSIT_ASPECTS = (("Conjunction", 0), ("Sextile", 60), ("Square", 90), ("Trine", 120), ("Opposition", 180))
+
+Generate = Callable[[Mapping[str, Any]], Tuple[Dict[str, str], str]]
+
+
+def _natal_longitudes(chart: Mapping[str, Any]) -> Dict[str, float]:
+    planets = chart.get("planets") or {}
+    points: Dict[str, float] = {}
+    for name in NATAL_POINTS:
+        longitude = (planets.get(name) or {}).get("longitude")
+        if isinstance(longitude, (int, float)):
+            points[name] = float(longitude)
+    angles = chart.get("angles") or {}
+    for name, key in NATAL_ANGLES.items():
+        if isinstance(angles.get(key), (int, float)):
+            points[name] = float(angles[key])
+    return points
+
+
+def transit_signature(
+    snapshot: SkySnapshot,
+    chart: Mapping[str, Any],
+    *,
+    orb: float = DAILY_TRANSIT_ORB,
+    keep: int = DAILY_SIGNATURE_TRANSITS,
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """``(signature, context)`` for ``chart`` under ``snapshot``'s sky, or ``None`` without a usable chart.
+
+    ``context`` is everything the generated text may depend on; the
+    signature is its hash, so equal contexts share one text.
+    """
+    natal = _natal_longitudes(chart)
+    if not natal:
+        return None
+    found: List[Tuple[float, str]] = []
+    for body in TRANSIT_BODIES:
+        transit = snapshot.planets.get(body)
+        if transit is None:
+            continue
+        for point, natal_longitude in natal.items():
+            difference = abs(transit["longitude"] - natal_longitude) % 360
+            difference = 360 - difference if difference > 180 else difference
+            for aspect, angle in _TRANSIT_ASPECTS:
+                distance = abs(difference - angle)
+                if distance <= orb:
+                    found.append((distance, f"{body} {aspect} {point}"))
+                    break
+    found.sort()
+    moon = snapshot.planets.get("Moon") or {}
+    context = {
+        "moon_sign": moon.get("sign"),
+        "moon_phase": snapshot.moon.get("phase"),
+        "retrogrades": [body for body in snapshot.retrogrades if body in TRANSIT_BODIES],
+        "transits": sorted(label for _, label in found[:keep]),
+    }
+    material = json.dumps(context, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:16], context
+
+
+class RateLimiter:
+    """Token bucket shared by the generation workers."""
+
+    def __init__(self, per_minute: float, *, burst: int = 1) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+
+class RunReport:
+    """Totals for one run; ``resumed_after`` is the checkpoint it started from."""
+
+    __slots__ = ("date", "profiles", "skipped", "generated", "reused", "resumed_after", "complete")
+
+    def __init__(self, target: date) -> None:
+        self.date = target.isoformat()
+        self.profiles = 0
+        self.skipped = 0
+        self.generated = 0
+        self.reused = 0
+        self.resumed_after: Optional[str] = None
+        self.complete = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _run_id(target: date) -> str:
+    return f"run:{target.isoformat()}"
+
+
+def _text_id(target: date, signature: str) -> str:
+    return f"text:{target.isoformat()}:{signature}"
+
+
+def _profile_id(target: date, profile_id: Any) -> str:
+    return f"profile:{target.isoformat()}:{profile_id}"
+
+
+class DailyInsightPipeline:
+    """Compute, generate and store daily insights; see the module docstring."""
+
+    def __init__(
+        self,
+        get_collection: Callable[[], Any],
+        sky: SkyService,
+        load_chart: Callable[[Mapping[str, Any]], Optional[Mapping[str, Any]]],
+        generate: Generate,
+        *,
+        requests_per_minute: float = DAILY_INSIGHT_REQUESTS_PER_MINUTE,
+        concurrency: int = DAILY_INSIGHT_CONCURRENCY,
+    ) -> None:
+        self.get_collection = get_collection
+        self.sky = sky
+        self.load_chart = load_chart
+        self.generate = generate
+        self.limiter = RateLimiter(requests_per_minute, burst=max(1, concurrency))
+        self.concurrency = max(1, concurrency)
+        self._indexed = False
+        self._sky: Optional[Tuple[date, SkySnapshot]] = None
+        self._pending: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _collection(self) -> Any:
+        collection = self.get_collection()
+        if not self._indexed:
+            self._indexed = True
+            try:
+                collection.create_index(
+                    [("created_at", 1)], name="ttl", expireAfterSeconds=int(DAILY_INSIGHT_TTL_DAYS * 86400)
+                )
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not create the daily insight TTL index.")
+        return collection
+
+    def sky_for(self, target: date) -> SkySnapshot:
+        """The sky at noon UTC of ``target``; the last day asked for is memoised."""
+        cached = self._sky
+        if cached is not None and cached[0] == target:
+            return cached[1]
+        snapshot = self.sky.compute(datetime(target.year, target.month, target.day, 12, tzinfo=timezone.utc))
+        self._sky = (target, snapshot)
+        return snapshot
+
+    def _generate_missing(
+        self,
+        collection: Any,
+        target: date,
+        contexts: Mapping[str, Mapping[str, Any]],
+        report: Optional[RunReport],
+        *,
+        degraded_since: Optional[datetime] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Stored or newly generated text for every signature in ``contexts``.
+
+        Stored texts are reused if refined, or if degraded but written at or
+        after ``degraded_since`` (the current run); the rest are generated.
+        """
+        texts: Dict[str, Dict[str, Any]] = {}
+        ids = [_text_id(target, signature) for signature in contexts]
+        for document in collection.find({"_id": {"$in": ids}}):
+            if document.get("source") in REUSABLE_SOURCES or (
+                degraded_since is not None and document.get("created_at") and document["created_at"] >= degraded_since
+            ):
+                texts[document["signature"]] = document
+        missing = [signature for signature in contexts if signature not in texts]
+        if report is not None:
+            report.reused += len(contexts) - len(missing)
+        if not missing:
+            return texts
+
+        def work(signature: str) -> Dict[str, Any]:
+            self.limiter.acquire()
+            insight, source = self.generate(contexts[signature])
+            return {
+                "_id": _text_id(target, signature),
+                "kind": "text",
+                "date": target.isoformat(),
+                "signature": signature,
+                "context": dict(contexts[signature]),
+                "insight": insight,
+                "source": source,
+                "created_at": datetime.utcnow(),
+            }
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(missing)), thread_name_prefix="daily-insight") as pool:
+            generated = list(pool.map(work, missing))
+        for document in generated:
+            collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+            texts[document["signature"]] = document
+        if report is not None:
+            report.generated += len(generated)
+        return texts
+
+    def _profile_document(self, target: date, profile_id: Any, text: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            "_id": _profile_id(target, profile_id),
+            "kind": "profile",
+            "date": target.isoformat(),
+            "profile_id": str(profile_id),
+            "signature": text["signature"],
+            "context": text["context"],
+            "insight": text["insight"],
+            "source": text["source"],
+            "created_at": datetime.utcnow(),
+        }
+
+    def _process_batch(
+        self,
+        collection: Any,
+        target: date,
+        snapshot: SkySnapshot,
+        profiles: List[Mapping[str, Any]],
+        report: RunReport,
+        started_at: datetime,
+    ) -> None:
+        signatures: Dict[Any, str] = {}
+        contexts: Dict[str, Dict[str, Any]] = {}
+        for profile in profiles:
+            chart = self.load_chart(profile)
+            result = transit_signature(snapshot, chart) if chart else None
+            if result is None:
+                report.skipped += 1
+                continue
+            signature, context = result
+            signatures[profile["_id"]] = signature
+            contexts[signature] = context
+        texts = self._generate_missing(collection, target, contexts, report, degraded_since=started_at)
+        operations = [
+            UpdateOne(
+                {"_id": _profile_id(target, profile_id)},
+                {"$set": self._profile_document(target, profile_id, texts[signature])},
+                upsert=True,
+            )
+            for profile_id, signature in signatures.items()
+        ]
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+        report.profiles += len(signatures)
+
+    def run(
+        self,
+        profiles: Any,
+        target: date,
+        *,
+        batch_size: int = DAILY_INSIGHT_BATCH_SIZE,
+        restart: bool = False,
+    ) -> RunReport:
+        """Pregenerate ``target``'s insights for every profile, resuming from the checkpoint."""
+        if UpdateOne is None:
+            raise RuntimeError("pymongo is not installed; daily insight pregeneration is unavailable.")
+        collection = self._collection()
+        report = RunReport(target)
+        checkpoint = None if restart else collection.find_one({"_id": _run_id(target)})
+        if checkpoint and checkpoint.get("complete"):
+            report.complete = True
+            return report
+        query: Dict[str, Any] = {}
+        if checkpoint and checkpoint.get("last_profile_id") is not None:
+            query["_id"] = {"$gt": checkpoint["last_profile_id"]}
+            report.resumed_after = str(checkpoint["last_profile_id"])
+            for field in ("profiles", "skipped", "generated", "reused"):
+                setattr(report, field, int(checkpoint.get(field) or 0))
+
+        snapshot = self.sky_for(target)
+        started_at = datetime.utcnow()
+        # Birth inputs let ``load_chart`` re-resolve profiles without a usable chart_id.
+        fields = {"chart_id": 1, "chart": 1, "date": 1, "time": 1, "city": 1}
+        cursor = profiles.find(query, fields, batch_size=batch_size).sort([("_id", 1)])
+        batch: List[Mapping[str, Any]] = []
+        try:
+            for profile in cursor:
+                batch.append(profile)
+                if len(batch) >= batch_size:
+                    self._flush(collection, target, snapshot, batch, report, started_at)
+            self._flush(collection, target, snapshot, batch, report, started_at)
+        finally:
+            cursor.close()
+        report.complete = True
+        self._checkpoint(collection, target, None, report)
+        log_event(logger, "daily_insights_pregenerated", **report.as_dict())
+        return report
+
+    def _flush(
+        self,
+        collection: Any,
+        target: date,
+        snapshot: SkySnapshot,
+        batch: List[Mapping[str, Any]],
+        report: RunReport,
+        started_at: datetime,
+    ) -> None:
+        if not batch:
+            return
+        self._process_batch(collection, target, snapshot, batch, report, started_at)
+        self._checkpoint(collection, target, batch[-1]["_id"], report)
+        batch.clear()
+
+    def _checkpoint(self, collection: Any, target: date, last_profile_id: Any, report: RunReport) -> None:
+        fields = {key: value for key, value in report.as_dict().items() if key not in ("date", "resumed_after")}
+        if last_profile_id is not None:
+            fields["last_profile_id"] = last_profile_id
+        collection.update_one(
+            {"_id": _run_id(target)},
+            {"$set": {**fields, "kind": "run", "updated_at": datetime.utcnow()}, "$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    def stored_insight(self, profile: Mapping[str, Any], target: date) -> Optional[Dict[str, Any]]:
+        """The stored insight of one profile for ``target``, if already generated."""
+        return self._collection().find_one({"_id": _profile_id(target, profile["_id"])})
+
+    def schedule(self, profile: Mapping[str, Any], target: date) -> bool:
+        """Generate one profile's missing insight in the background.
+
+        Returns ``False`` when ``DAILY_INSIGHT_MAX_PENDING`` profiles are
+        already waiting; a profile that is already queued counts as accepted.
+        """
+        key = _profile_id(target, profile["_id"])
+        with self._lock:
+            if key in self._pending:
+                return True
+            if len(self._pending) >= DAILY_INSIGHT_MAX_PENDING:
+                return False
+            self._pending.add(key)
+            # Threads do not survive gunicorn's fork; each worker builds its own pool.
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="daily-insight-on-demand")
+            executor = self._executor
+        executor.submit(self._generate_scheduled, key, dict(profile), target)
+        return True
+
+    def _generate_scheduled(self, key: str, profile: Dict[str, Any], target: date) -> None:
+        try:
+            self.insight_for(profile, target)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("On-demand daily insight failed for %s.", key)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def insight_for(self, profile: Mapping[str, Any], target: date) -> Optional[Tuple[Dict[str, Any], bool]]:
+        """``(document, pregenerated)`` for one profile, generating on a miss.
+
+        A stored degraded insight counts as a miss.  Blocks on the rate
+        limiter and the LLM; request handlers use :meth:`schedule` instead.
+        Returns ``None`` when the profile has no usable chart.
+        """
+        collection = self._collection()
+        stored = collection.find_one({"_id": _profile_id(target, profile["_id"])})
+        if stored and stored.get("source") in REUSABLE_SOURCES:
+            return stored, True
+        chart = self.load_chart(profile)
+        result = transit_signature(self.sky_for(target), chart) if chart else None
+        if result is None:
+            return None
+        signature, context = result
+        text = self._generate_missing(collection, target, {signature: context}, None)[signature]
+        document = self._profile_document(target, profile["_id"], text)
+        collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+        return document, False
+
+
+def init_app(
+    app: Any,
+    pipeline: DailyInsightPipeline,
+    find_profile: Callable[[str], Optional[Mapping[str, Any]]],
+) -> None:
+    """Register ``GET /api/daily-insight?email=&date=`` (``date``: today or tomorrow, UTC)."""
+    from flask import jsonify, request
+
+    @app.route("/api/daily-insight", methods=["GET"])
+    def daily_insight():
+        email = request.args.get("email", "").strip().lower()
+        if not email:
+            return jsonify({"error": "email parametresi gereklidir."}), 400
+        today = datetime.utcnow().date()
+        raw_date = request.args.get("date", "").strip()
+        try:
+            target = date.fromisoformat(raw_date) if raw_date else today
+        except ValueError:
+            return jsonify({"error": "date YYYY-MM-DD biçiminde olmalıdır."}), 400
+        if target not in (today, today + timedelta(days=1)):
+            return jsonify({"error": "date yalnızca bugün veya yarın (UTC) olabilir."}), 400
+        try:
+            profile = find_profile(email)
+            if not profile:
+                return jsonify({"error": "Profil bulunamadı."}), 404
+            document = pipeline.stored_insight(profile, target)
+            if document is None and pipeline.load_chart(profile) is None:
+                return jsonify({"error": "Profilde kayıtlı doğum haritası yok."}), 404
+        except MongoUnavailable as exc:
+            return jsonify({"error": str(exc)}), 503
+        if document is not None and document.get("source") not in REUSABLE_SOURCES:
+            # Serve the fallback now; a refined one replaces it once Groq answers.
+            pipeline.schedule(profile, target)
+        if document is None:
+            if not pipeline.schedule(profile, target):
+                response = jsonify({"error": "Günlük içgörü kuyruğu dolu. Lütfen biraz sonra tekrar dene."})
+                response.status_code = 503
+                response.headers["Retry-After"] = str(DAILY_INSIGHT_RETRY_AFTER_SECONDS * 6)
+                return response
+            response = jsonify({"date": target.isoformat(), "status": "pending"})
+            response.status_code = 202
+            response.headers["Retry-After"] = str(DAILY_INSIGHT_RETRY_AFTER_SECONDS)
+            return response
+        response = jsonify(
+            {
+                "date": document["date"],
+                "insight": document["insight"],
+                "transits": document["context"].get("transits", []),
+                "moon": {"sign": document["context"].get("moon_sign"), "phase": document["context"].get("moon_phase")},
+                "source": document["source"],
+            }
+        )
+        response.headers["X-Daily-Insight-Source"] = "pregenerated"
+        return response
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Pregenerate daily insights for every profile.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="Generate insights for one day (default: tomorrow, UTC).")
+    run_parser.add_argument("--date", help="Target day as YYYY-MM-DD.")
+    run_parser.add_argument("--batch-size", type=int, default=DAILY_INSIGHT_BATCH_SIZE)
+    run_parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over.")
+    args = parser.parse_args(argv)
+
+    from backend.app import daily_insights, get_profile_collection
+
+    target = date.fromisoformat(args.date) if args.date else datetime.utcnow().date() + timedelta(days=1)
+    report = daily_insights.run(get_profile_collection(), target, batch_size=args.batch_size, restart=args.restart)
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
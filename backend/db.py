@@ -5,24 +5,30 @@ import logging
 import os
 import time
 from threading import Lock
-from typing import Optional, Tuple
+from typing import Any, List, Optional, Tuple
 
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, monitoring
     from pymongo.errors import PyMongoError
 except ImportError:  # pragma: no cover - optional dependency
     MongoClient = None  # type: ignore[assignment]
+    monitoring = None  # type: ignore[assignment]
 
     class PyMongoError(Exception):  # type: ignore[override]
         """Fallback error when pymongo is unavailable."""
 
+from backend.breaker import CircuitOpen, circuit_breaker
+from backend.metrics import mongo_event_listeners
+
 logger = logging.getLogger(__name__)
 
 __all__ = [
+    "MONGO_BREAKER",
     "MongoUnavailable",
     "get_mongo_client",
     "ensure_mongo_connection",
     "mongo_healthcheck",
+    "mongo_ping",
     "close_mongo_client",
 ]
 
@@ -34,6 +40,10 @@ class MongoUnavailable(RuntimeError):
 _client: Optional[MongoClient] = None
 _lock = Lock()
 _MONGO_URI = os.getenv("MONGO_URI")
+# Fed by the driver's command and heartbeat events, so it also sees a server that
+# has gone away while no request is running.
+MONGO_BREAKER = circuit_breaker("mongo")
+_DUPLICATE_KEY = 11000
 
 
 def _parse_int(key: str, default: int) -> int:
@@ -48,6 +58,11 @@ def _parse_int(key: str, default: int) -> int:
 
 
 def _build_client() -> MongoClient:
+    if _MONGO_URI and _MONGO_URI.startswith("memory://"):
+        from backend.loadtest.memory_mongo import MemoryMongoClient
+
+        logger.warning("Using the in-process Mongo stand-in (%s); data is not persisted.", _MONGO_URI)
+        return MemoryMongoClient()
     if MongoClient is None:
         raise MongoUnavailable("pymongo is not installed; MongoDB integration is disabled.")
     if not _MONGO_URI:
@@ -64,11 +79,46 @@ def _build_client() -> MongoClient:
         "socketTimeoutMS": _parse_int("MONGO_SOCKET_TIMEOUT_MS", 20000),
         "heartbeatFrequencyMS": _parse_int("MONGO_HEARTBEAT_FREQUENCY_MS", 10000),
         "appname": os.getenv("MONGO_APP_NAME", "astrologi-ai-backend"),
+        "event_listeners": [*mongo_event_listeners(), *_breaker_listeners()],
     }
 
     return MongoClient(_MONGO_URI, **options)
 
 
+if monitoring is not None:
+
+    class _BreakerCommandListener(monitoring.CommandListener):
+        def started(self, event: Any) -> None:
+            return None
+
+        def succeeded(self, event: Any) -> None:
+            MONGO_BREAKER.record_success()
+
+        def failed(self, event: Any) -> None:
+            # Duplicate keys are an answer from a healthy server, not an outage.
+            failure = event.failure if isinstance(event.failure, dict) else {}
+            if failure.get("code") == _DUPLICATE_KEY:
+                MONGO_BREAKER.record_success()
+            else:
+                MONGO_BREAKER.record_failure()
+
+    class _BreakerHeartbeatListener(monitoring.ServerHeartbeatListener):
+        def started(self, event: Any) -> None:
+            return None
+
+        def succeeded(self, event: Any) -> None:
+            MONGO_BREAKER.record_success()
+
+        def failed(self, event: Any) -> None:
+            MONGO_BREAKER.record_failure()
+
+
+def _breaker_listeners() -> List[Any]:
+    if monitoring is None:
+        return []
+    return [_BreakerCommandListener(), _BreakerHeartbeatListener()]
+
+
 def close_mongo_client() -> None:
     """Close and clear the cached client."""
     global _client  # noqa: PLW0603 - module level cache
@@ -101,7 +151,15 @@ def get_mongo_client(*, revalidate: bool = False) -> MongoClient:
 def ensure_mongo_connection(
     *, retries: int = 3, delay: float = 1.5, revalidate: bool = True
 ) -> MongoClient:
-    """Attempt to obtain a healthy Mongo client with retry/backoff."""
+    """Attempt to obtain a healthy Mongo client with retry/backoff.
+
+    Raises :class:`MongoUnavailable` at once, without retrying, while the
+    Mongo circuit breaker is open.
+    """
+    try:
+        MONGO_BREAKER.allow()
+    except CircuitOpen as exc:
+        raise MongoUnavailable(str(exc)) from exc
     last_error: Optional[Exception] = None
     for attempt in range(1, retries + 1):
         try:
@@ -128,3 +186,20 @@ def mongo_healthcheck() -> Tuple[bool, str]:
         return True, "Mongo connection healthy."
     except MongoUnavailable as exc:
         return False, str(exc)
+
+
+def mongo_ping() -> Tuple[bool, str]:
+    """Single ping on the shared client: no retries, sleeps or reconnects.
+
+    Meant for background health probes, which must not close the client that
+    in-flight requests are using; pymongo's own monitor handles reconnection.
+    """
+    if MongoClient is None:
+        return False, "MongoDB sürücüsü yüklenmemiş."
+    if not _MONGO_URI:
+        return False, "MongoDB disabled (MONGO_URI missing)."
+    try:
+        get_mongo_client().admin.command("ping")
+    except (PyMongoError, MongoUnavailable) as exc:
+        return False, str(exc)
+    return True, "Mongo connection healthy."
@@ -0,0 +1,198 @@
+"""Deadline budgets and hedged outbound calls for latency-sensitive pipelines."""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Callable, Deque, Optional, TypeVar
+
+from backend.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "DeadlineExceeded",
+    "Deadline",
+    "LatencyTracker",
+    "hedged_call",
+    "is_retryable",
+]
+
+T = TypeVar("T")
+
+_HEDGE_DEFAULT_DELAY = env_float("LLM_HEDGE_DEFAULT_DELAY_SECONDS", 4.0)
+_HEDGE_MIN_DELAY = env_float("LLM_HEDGE_MIN_DELAY_SECONDS", 0.25)
+_HEDGE_MIN_SAMPLES = env_int("LLM_HEDGE_MIN_SAMPLES", 20)
+_HEDGE_MAX_WORKERS = env_int("LLM_HEDGE_MAX_WORKERS", 16)
+# Backups are skipped once this many attempts are in flight, so attempts left
+# running after their request returned cannot crowd out new primaries.
+_HEDGE_MAX_BACKUP_INFLIGHT = max(1, _HEDGE_MAX_WORKERS // 2)
+_executor = ThreadPoolExecutor(
+    max_workers=_HEDGE_MAX_WORKERS,
+    thread_name_prefix="llm-hedge",
+)
+_inflight = 0
+_inflight_lock = Lock()
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when the remaining request budget is exhausted."""
+
+
+class Deadline:
+    """Monotonic time budget carried through a request pipeline."""
+
+    __slots__ = ("budget", "_expires_at")
+
+    def __init__(self, budget: float) -> None:
+        self.budget = max(0.0, float(budget))
+        self._expires_at = time.monotonic() + self.budget
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def timeout(self, cap: float | None = None) -> float:
+        """Return a per-call timeout bounded by ``cap`` and the remaining budget."""
+        remaining = self.remaining()
+        if remaining <= 0.0:
+            raise DeadlineExceeded("Request deadline exhausted.")
+        return remaining if cap is None else min(cap, remaining)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies used to pick hedge delays."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(float(seconds))
+
+    def percentile(self, quantile: float, default: float | None = None) -> float | None:
+        with self._lock:
+            if len(self._samples) < _HEDGE_MIN_SAMPLES:
+                return default
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(quantile * (len(ordered) - 1)))))
+        return ordered[index]
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether another attempt could succeed: timeouts, connection errors, 429 and 5xx.
+
+    Other HTTP errors (bad request, auth) fail the same way every time.
+    """
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # requests' Timeout/ConnectionError derive from OSError, as do socket errors.
+    return isinstance(error, (OSError, TimeoutError))
+
+
+def _release(_future: Future) -> None:
+    global _inflight  # noqa: PLW0603 - module level counter
+    with _inflight_lock:
+        _inflight -= 1
+
+
+def _submit(fn: Callable[[float], T], timeout: float, tracker: LatencyTracker | None, *, backup: bool) -> Optional[Future]:
+    global _inflight  # noqa: PLW0603 - module level counter
+    with _inflight_lock:
+        if backup and _inflight >= _HEDGE_MAX_BACKUP_INFLIGHT:
+            return None
+        _inflight += 1
+    future = _executor.submit(_timed, fn, timeout, tracker)
+    future.add_done_callback(_release)
+    return future
+
+
+def _timed(fn: Callable[[float], T], timeout: float, tracker: LatencyTracker | None) -> T:
+    started = time.monotonic()
+    result = fn(timeout)
+    if tracker is not None:
+        tracker.observe(time.monotonic() - started)
+    return result
+
+
+def hedged_call(
+    fn: Callable[[float], T],
+    *,
+    deadline: Deadline,
+    tracker: LatencyTracker | None = None,
+    per_call_timeout: float | None = None,
+    hedge_after: float | None = None,
+    retryable: Callable[[BaseException], bool] = is_retryable,
+) -> T:
+    """Run ``fn(timeout)`` and start one backup attempt if the primary is slow.
+
+    The backup is launched once the primary has been running longer than
+    ``hedge_after`` (by default the tracker's observed p90), or right away if
+    the primary fails with an error ``retryable`` accepts; any other error is
+    raised at once unless another attempt is still running (a backup refused
+    by a circuit breaker, say, just means there is no backup).  No backup is
+    started while half the pool is busy.  The
+    first successful attempt wins; if every attempt fails the last error is
+    raised, and :class:`DeadlineExceeded` is raised when the budget runs out
+    first.  Attempts still running when this returns cannot be interrupted;
+    they end at their own timeout, which never outlasts ``deadline``.
+    """
+
+    if hedge_after is None:
+        observed = tracker.percentile(0.9, _HEDGE_DEFAULT_DELAY) if tracker else _HEDGE_DEFAULT_DELAY
+        hedge_after = max(_HEDGE_MIN_DELAY, observed or _HEDGE_DEFAULT_DELAY)
+
+    primary = _submit(fn, deadline.timeout(per_call_timeout), tracker, backup=False)
+    assert primary is not None
+    pending: set[Future] = {primary}
+    hedged = False
+    last_error: Optional[BaseException] = None
+
+    while pending:
+        remaining = deadline.remaining()
+        if remaining <= 0.0:
+            break
+        wait_for = remaining if hedged else min(hedge_after, remaining)
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            error = future.exception()
+            if error is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            last_error = error
+            if not retryable(error):
+                if pending:
+                    logger.info("Attempt failed (%s); waiting for the one still running.", error)
+                    continue
+                raise error
+
+        if not hedged and not deadline.expired:
+            if done and not pending:
+                # Primary failed fast with a retryable error; the backup doubles as a retry.
+                reason = f"primary attempt failed ({last_error})"
+            elif not done:
+                reason = f"primary attempt exceeded hedge delay {hedge_after:.2f}s"
+            else:
+                continue
+            hedged = True
+            backup = _submit(fn, deadline.timeout(per_call_timeout), tracker, backup=True)
+            if backup is None:
+                logger.info("Skipping backup call (%s): hedge pool is busy.", reason)
+                continue
+            logger.info("Issuing backup call: %s.", reason)
+            pending.add(backup)
+
+    for future in pending:
+        future.cancel()
+    if pending or last_error is None:
+        raise DeadlineExceeded("Request deadline exhausted before any attempt completed.")
+    raise last_error
@@ -0,0 +1,245 @@
+"""Asynchronous, structured logging for the request path.
+
+:func:`configure_logging` moves the root logger's handlers behind a
+``QueueHandler``/``QueueListener`` pair, so formatting and stream I/O run on
+the listener thread instead of the request thread.  :func:`log_event` emits
+one JSON line per event with optional sampling; values wrapped in
+:func:`lazy` are only computed if the event is actually written, and
+credentials and birth data are redacted before serialisation.
+
+Plain ``logger.warning("... %s", value)`` calls get the same treatment for
+their arguments through a filter on the handlers behind the listener, so
+redaction and :func:`lazy` arguments also run on that thread.  The format string
+itself and exception tracebacks are not rewritten, so keep personal data
+out of those.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional
+
+from backend.config import env_bool
+
+__all__ = [
+    "configure_logging",
+    "lazy",
+    "log_event",
+    "redact",
+]
+
+REDACTED = "[redacted]"
+# Credentials: always masked wherever they appear in an event.
+_SECRET_KEYS = frozenset({"api_key", "apikey", "key", "authorization", "token", "secret", "password"})
+# Birth data and contact details identify a person; never written to logs.
+_PERSONAL_KEYS = frozenset(
+    {
+        "birth_date",
+        "birth_time",
+        "birth_place",
+        "birthdate",
+        "birthtime",
+        "birthplace",
+        "date",
+        "time",
+        "city",
+        "latitude",
+        "longitude",
+        "email",
+        "birth_datetime",
+    }
+)
+_SECRET_PATTERN = re.compile(r"(Bearer\s+)\S+|\b(gsk_|sk-)[A-Za-z0-9_\-]{6,}", re.IGNORECASE)
+
+
+def _parse_sample_rates(raw: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if not name.strip() or not value.strip():
+            continue
+        try:
+            rates[name.strip()] = min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            logging.getLogger(__name__).warning("Invalid LOG_SAMPLE_RATES entry %r ignored.", item)
+    return rates
+
+
+# Per-event overrides, e.g. ``LOG_SAMPLE_RATES="groq_response=0.1,houses_calculated=0"``.
+_SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+_listener: Optional[QueueListener] = None
+_listener_pid = 0
+_listener_lock = Lock()
+
+
+class _Lazy:
+    __slots__ = ("func", "args")
+
+    def __init__(self, func: Callable[..., Any], args: tuple) -> None:
+        self.func = func
+        self.args = args
+
+    def resolve(self) -> Any:
+        try:
+            return self.func(*self.args)
+        except Exception as exc:  # pylint: disable=broad-except
+            return f"<unavailable: {exc}>"
+
+
+def lazy(func: Callable[..., Any], *args: Any) -> _Lazy:
+    """Defer ``func(*args)`` until the event is formatted on the listener thread."""
+    return _Lazy(func, args)
+
+
+def _scrub(text: str) -> str:
+    return _SECRET_PATTERN.sub(lambda match: (match.group(1) or match.group(2) or "") + "***", text)
+
+
+def redact(value: Any) -> Any:
+    """Return ``value`` with credentials and birth data masked, recursively."""
+    if isinstance(value, _Lazy):
+        value = value.resolve()
+    if isinstance(value, Mapping):
+        cleaned = {}
+        for key, item in value.items():
+            lowered = str(key).lower()
+            if lowered in _SECRET_KEYS or lowered in _PERSONAL_KEYS:
+                cleaned[key] = REDACTED
+            else:
+                cleaned[key] = redact(item)
+        return cleaned
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return _scrub(value)
+    return value
+
+
+class _EventMessage:
+    """Log message whose JSON rendering is deferred until ``str()``."""
+
+    __slots__ = ("event", "fields")
+
+    def __init__(self, event: str, fields: Dict[str, Any]) -> None:
+        self.event = event
+        self.fields = fields
+
+    def __str__(self) -> str:
+        body = {"event": self.event, **redact(self.fields)}
+        return json.dumps(body, ensure_ascii=False, default=str)
+
+
+def log_event(
+    logger: logging.Logger,
+    event: str,
+    *,
+    level: int = logging.INFO,
+    sample: float = 1.0,
+    **fields: Any,
+) -> None:
+    """Log ``event`` with ``fields`` as one JSON line, keeping ``sample`` of them.
+
+    Nothing is formatted here: the level check and sampling happen first and
+    the JSON is produced on the listener thread.  Don't mutate objects passed
+    in ``fields`` after logging them.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = _SAMPLE_RATES.get(event, sample)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.log(level, "%s", _EventMessage(event, fields))
+
+
+class _RedactingFilter(logging.Filter):
+    """Mask credentials and birth data in a record's ``%`` arguments (once per record)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "_redacted", False):
+            return True
+        record._redacted = True  # pylint: disable=protected-access
+        args = record.args
+        if isinstance(args, Mapping):
+            record.args = redact(args)
+        elif args:
+            record.args = tuple(arg if isinstance(arg, _EventMessage) else redact(arg) for arg in args)
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """``QueueHandler`` that leaves message formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if _listener_pid != os.getpid():
+            _restart_listener(self)
+        self.queue.put_nowait(record)
+
+
+def _restart_listener(queue_handler: QueueHandler) -> None:
+    """Give a forked child its own queue and listener.
+
+    Threads do not survive gunicorn's fork (``--preload``); without this the
+    child would fill the inherited queue with nothing draining it.
+    """
+    global _listener, _listener_pid  # noqa: PLW0603 - module level singleton
+    with _listener_lock:
+        if _listener is None or _listener_pid == os.getpid():
+            return
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        queue_handler.queue = log_queue
+        _listener = QueueListener(log_queue, *_listener.handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+
+
+def configure_logging() -> None:
+    """Route root logging through a background queue listener (idempotent).
+
+    Disable with ``LOG_ASYNC=0`` to keep handlers synchronous, e.g. while
+    debugging in a REPL; arguments are redacted either way.
+    """
+    global _listener, _listener_pid  # noqa: PLW0603 - module level singleton
+    with _listener_lock:
+        if _listener is not None:
+            return
+        root = logging.getLogger()
+        if not env_bool("LOG_ASYNC", True):
+            _add_redaction(root.handlers)
+            return
+        handlers = list(root.handlers)
+        if not handlers:
+            handlers = [logging.StreamHandler()]
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        for handler in handlers:
+            root.removeHandler(handler)
+        _add_redaction(handlers)
+        root.addHandler(_DeferredQueueHandler(log_queue))
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _listener_pid = os.getpid()
+        atexit.register(_stop_listener)
+
+
+def _add_redaction(handlers: Iterable[logging.Handler]) -> None:
+    for handler in handlers:
+        if not any(isinstance(item, _RedactingFilter) for item in handler.filters):
+            handler.addFilter(_RedactingFilter())
+
+
+def _stop_listener() -> None:
+    global _listener  # noqa: PLW0603 - module level singleton
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,23 @@
+"""Gunicorn hooks for multi-worker Prometheus metrics.
+
+Picked up automatically by ``gunicorn wsgi:app`` when started from
+``backend/``.  Only active when ``PROMETHEUS_MULTIPROC_DIR`` is set.
+"""
+import os
+import shutil
+
+_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+def on_starting(server):
+    # Stale files from a previous master would be summed into the new counters.
+    if _MULTIPROC_DIR:
+        shutil.rmtree(_MULTIPROC_DIR, ignore_errors=True)
+        os.makedirs(_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if _MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,192 @@
+"""Background dependency probes behind a cached ``/api/health`` snapshot.
+
+:class:`HealthMonitor` runs every registered probe on a daemon thread each
+``HEALTH_PROBE_INTERVAL_SECONDS`` and keeps the last few latencies per
+dependency.  After each round it renders the snapshot to JSON once, so the
+health endpoint only returns pre-built bytes: load-balancer probes cost
+microseconds and never touch Mongo or the upstream APIs themselves.  Each
+worker runs its own monitor, started lazily on its first request so it
+survives gunicorn's fork.  Until the first round completes the snapshot
+reports ``"starting"``.
+
+Dependencies whose only cheap probe needs production credentials are
+registered with :meth:`HealthMonitor.add_passive` instead: their status comes
+from the circuit breaker that already watches real traffic, so N workers do
+not each spend the key on a synthetic request every interval.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import requests
+
+from backend.breaker import OPEN, CircuitBreaker
+from backend.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "HealthMonitor",
+    "http_probe",
+]
+
+HEALTH_PROBE_INTERVAL_SECONDS = env_float("HEALTH_PROBE_INTERVAL_SECONDS", 60.0)
+HEALTH_PROBE_TIMEOUT_SECONDS = env_float("HEALTH_PROBE_TIMEOUT_SECONDS", 3.0)
+HEALTH_LATENCY_WINDOW = env_int("HEALTH_LATENCY_WINDOW", 20)
+
+# A probe returns (ok, detail); raising counts as a failure with the exception as detail.
+Probe = Callable[[], Tuple[bool, str]]
+
+
+def http_probe(url: str, *, headers: Optional[Dict[str, str]] = None, timeout: float = HEALTH_PROBE_TIMEOUT_SECONDS) -> Probe:
+    """Probe that treats any non-5xx answer from ``url`` as reachable.
+
+    Auth failures (401/403) are reported as errors only when ``headers``
+    carry credentials, since unauthenticated probes expect them.
+    """
+
+    def probe() -> Tuple[bool, str]:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code >= 500:
+            return False, f"HTTP {response.status_code}"
+        if headers and response.status_code in (401, 403):
+            return False, f"Kimlik doğrulama reddedildi (HTTP {response.status_code})."
+        return True, f"HTTP {response.status_code}"
+
+    return probe
+
+
+class _ProbeState:
+    __slots__ = ("latencies", "ok", "detail", "checked_at", "consecutive_failures")
+
+    def __init__(self) -> None:
+        self.latencies: Deque[float] = deque(maxlen=max(HEALTH_LATENCY_WINDOW, 1))
+        self.ok: Optional[bool] = None
+        self.detail = "Henüz kontrol edilmedi."
+        self.checked_at: Optional[str] = None
+        self.consecutive_failures = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = list(self.latencies)
+        body: Dict[str, Any] = {
+            "status": "unknown" if self.ok is None else ("ok" if self.ok else "error"),
+            "detail": self.detail,
+            "checked_at": self.checked_at,
+            "consecutive_failures": self.consecutive_failures,
+        }
+        if latencies:
+            body["latency_ms"] = {
+                "last": round(latencies[-1] * 1000, 2),
+                "p50": round(statistics.median(latencies) * 1000, 2),
+                "max": round(max(latencies) * 1000, 2),
+            }
+        return body
+
+
+class HealthMonitor:
+    """Probe dependencies periodically and serve the last results as JSON bytes.
+
+    Probes run sequentially on one thread, so a hung dependency delays the
+    others by at most its probe timeout.
+    """
+
+    def __init__(self, interval: float = HEALTH_PROBE_INTERVAL_SECONDS) -> None:
+        self.interval = interval
+        self._probes: Dict[str, Probe] = {}
+        self._states: Dict[str, _ProbeState] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._passive: Dict[str, CircuitBreaker] = {}
+        self._static: Dict[str, Dict[str, Any]] = {}
+        self._snapshot = b""
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._render()
+
+    def add_probe(self, name: str, probe: Probe, *, breaker: Optional[CircuitBreaker] = None) -> None:
+        """Register ``probe``; with ``breaker`` its state is reported too and
+        the snapshot is re-rendered on every transition."""
+        self._probes[name] = probe
+        self._states[name] = _ProbeState()
+        if breaker is not None:
+            self._breakers[name] = breaker
+            breaker.subscribe(lambda _name, _state: self._render())
+        self._render()
+
+    def add_passive(self, name: str, breaker: CircuitBreaker) -> None:
+        """Report ``breaker``'s view of real calls instead of probing the dependency."""
+        self._passive[name] = breaker
+        breaker.subscribe(lambda _name, _state: self._render())
+        self._render()
+
+    def add_static(self, name: str, status: str, detail: str) -> None:
+        """Report a dependency that is not probed, e.g. ``disabled``."""
+        self._static[name] = {"status": status, "detail": detail}
+        self._render()
+
+    def ensure_running(self) -> None:
+        """Start the probe thread in this process if it is not running yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="health-monitor", daemon=True).start()
+
+    def probe_now(self) -> None:
+        """Run every probe once on the calling thread and refresh the snapshot."""
+        for name, probe in self._probes.items():
+            state = self._states[name]
+            started = time.perf_counter()
+            try:
+                ok, detail = probe()
+            except Exception as exc:  # pylint: disable=broad-except
+                ok, detail = False, f"{type(exc).__name__}: {exc}"
+            state.latencies.append(time.perf_counter() - started)
+            state.ok = ok
+            state.detail = detail
+            state.checked_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            state.consecutive_failures = 0 if ok else state.consecutive_failures + 1
+            if not ok and state.consecutive_failures == 1:
+                logger.warning("Health probe %s failed: %s", name, detail)
+        self._render()
+
+    def snapshot(self) -> bytes:
+        """The last rendered snapshot as UTF-8 JSON."""
+        return self._snapshot
+
+    def _render(self) -> None:
+        states = {name: state.as_dict() for name, state in self._states.items()}
+        for name, breaker in self._breakers.items():
+            states[name]["circuit"] = breaker.snapshot()
+        for name, breaker in self._passive.items():
+            circuit = breaker.snapshot()
+            states[name] = {
+                "status": "error" if circuit["state"] == OPEN else "ok",
+                "detail": f"Pasif izleme: son {circuit['calls']} çağrı, hata oranı {circuit['failure_rate']}.",
+                "circuit": circuit,
+            }
+        if any(state["status"] == "error" or state.get("circuit", {}).get("state") == OPEN for state in states.values()):
+            status = "degraded"
+        elif any(state["status"] == "unknown" for state in states.values()):
+            status = "starting"
+        else:
+            status = "ok"
+        body: Dict[str, Any] = {"status": status, **self._static, **states}
+        self._snapshot = json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.probe_now()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Health probe round failed.")
+            time.sleep(self.interval)
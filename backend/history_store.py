@@ -0,0 +1,209 @@
+"""Interpretation history: every generated interpretation, per profile.
+
+Documents live in their own collection, indexed on ``(profile_id,
+created_at)`` for the history timeline and on ``(chart_key, created_at)`` so
+a recent interpretation of the same chart can be served again instead of
+calling Groq.  A TTL index on ``created_at`` expires entries after
+``HISTORY_TTL_DAYS``.  Pages are addressed by an opaque cursor encoding the
+last ``(created_at, _id)`` seen, so fetching page N is a range scan rather
+than a skip over N pages.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+try:
+    from bson import ObjectId
+    from bson.errors import InvalidId
+except ImportError:  # pragma: no cover - optional dependency
+    ObjectId = None  # type: ignore[assignment]
+
+    class InvalidId(Exception):  # type: ignore[override]
+        """Fallback error when bson is unavailable."""
+
+from backend.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "HISTORY_INDEXES",
+    "HistoryStore",
+    "InvalidCursor",
+    "chart_fingerprint",
+    "interpretation_key",
+]
+
+HISTORY_TTL_DAYS = env_float("HISTORY_TTL_DAYS", 180.0)
+# A stored interpretation younger than this is served instead of a new one.
+HISTORY_REUSE_SECONDS = env_float("HISTORY_REUSE_SECONDS", 24 * 3600.0)
+HISTORY_PAGE_SIZE = env_int("HISTORY_PAGE_SIZE", 20)
+HISTORY_MAX_PAGE_SIZE = 100
+# Degraded results are recorded but never reused.
+REUSABLE_SOURCES = frozenset({"refined", "fallback"})
+
+HISTORY_INDEXES: Tuple[Tuple[list, Dict[str, Any]], ...] = (
+    ([("profile_id", 1), ("created_at", -1), ("_id", -1)], {"name": "profile_timeline"}),
+    ([("chart_key", 1), ("created_at", -1)], {"name": "chart_recent"}),
+    ([("created_at", 1)], {"name": "ttl", "expireAfterSeconds": int(HISTORY_TTL_DAYS * 86400)}),
+)
+
+# Lightweight list entries; ``full=1`` returns the stored response too.
+_SUMMARY_PROJECTION = {
+    "created_at": 1,
+    "source": 1,
+    "strategy": 1,
+    "chart_key": 1,
+    "response.themes": 1,
+    "response.tone": 1,
+    "response.ai_interpretation.headline": 1,
+}
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def interpretation_key(chart_ref: str, strategy: Any = None, axis_scores: Any = None) -> str:
+    """Key of everything that shapes an interpretation besides the model's randomness."""
+    material = json.dumps([chart_ref, strategy, axis_scores], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+def chart_fingerprint(chart: Mapping[str, Any]) -> str:
+    """Content hash for client-supplied charts that have no store id."""
+    material = json.dumps(chart, sort_keys=True, ensure_ascii=False, default=str)
+    return "sha1:" + hashlib.sha1(material.encode("utf-8")).hexdigest()
+
+
+def _encode_cursor(created_at: datetime, identifier: Any) -> str:
+    raw = f"{created_at.isoformat()}|{identifier}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        stamp, _, identifier = raw.partition("|")
+        created_at = datetime.fromisoformat(stamp)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor("Geçersiz sayfa imleci.") from exc
+    if ObjectId is not None:
+        try:
+            return created_at, ObjectId(identifier)
+        except (InvalidId, TypeError):
+            pass
+    return created_at, identifier
+
+
+class HistoryStore:
+    """Persist and page through interpretations; failures never break a request."""
+
+    def __init__(self, get_collection: Callable[[], Any]) -> None:
+        self.get_collection = get_collection
+        self._indexed = False
+
+    def _ensure_indexes(self, collection: Any) -> None:
+        if self._indexed:
+            return
+        self._indexed = True
+        for keys, options in HISTORY_INDEXES:
+            try:
+                collection.create_index(keys, **options)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not create history index %s.", options["name"])
+
+    def _collection(self) -> Any:
+        try:
+            collection = self.get_collection()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("History collection unavailable: %s", exc)
+            return None
+        self._ensure_indexes(collection)
+        return collection
+
+    def find_recent(self, chart_key: str, *, max_age_seconds: float = HISTORY_REUSE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Newest reusable interpretation for ``chart_key`` within ``max_age_seconds``."""
+        if max_age_seconds <= 0:
+            return None
+        collection = self._collection()
+        if collection is None:
+            return None
+        since = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+        try:
+            cursor = (
+                collection.find(
+                    {"chart_key": chart_key, "created_at": {"$gte": since}, "source": {"$in": sorted(REUSABLE_SOURCES)}}
+                )
+                .sort([("created_at", -1)])
+                .limit(1)
+            )
+            return next(iter(cursor), None)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("History lookup failed for %s.", chart_key)
+            return None
+
+    def record(
+        self,
+        *,
+        profile_id: Optional[str],
+        chart_key: str,
+        strategy: Any,
+        source: str,
+        response: Mapping[str, Any],
+    ) -> Optional[Any]:
+        """Store one interpretation; returns its id, or ``None`` if it could not be saved."""
+        collection = self._collection()
+        if collection is None:
+            return None
+        document = {
+            "profile_id": profile_id,
+            "chart_key": chart_key,
+            "strategy": strategy,
+            "source": source,
+            "response": dict(response),
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            return collection.insert_one(document).inserted_id
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not record interpretation history.")
+            return None
+
+    def page(
+        self,
+        profile_id: str,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        full: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of ``profile_id``'s history, newest first, plus the next cursor.
+
+        Unlike the other methods this raises on Mongo errors, for the caller to report.
+        """
+        collection = self.get_collection()
+        self._ensure_indexes(collection)
+        limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+        query: Dict[str, Any] = {"profile_id": profile_id}
+        if cursor:
+            created_at, identifier = _decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": identifier}},
+            ]
+        documents = list(
+            collection.find(query, None if full else _SUMMARY_PROJECTION)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit + 1)
+        )
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = _encode_cursor(last["created_at"], last["_id"])
+        return documents, next_cursor
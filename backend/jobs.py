@@ -0,0 +1,418 @@
+"""Asynchronous job mode for slow endpoints (interpretation, synastry).
+
+A ``POST`` to one of the registered endpoints with ``?async=1`` or a
+``Prefer: respond-async`` header is not handled inline: the request is
+captured and answered with ``202`` and a job id, and a bounded per-worker
+thread pool later replays it through Flask's normal dispatch, so the handler
+code, hooks and error responses are exactly those of the synchronous call.
+The web worker is free again as soon as the job is queued; the job pool
+(``JOB_WORKERS`` threads, ``JOB_MAX_PENDING`` waiting jobs) is the only place
+the 30–60s of LLM work is spent.  A full queue answers ``503`` with
+``Retry-After``.
+
+Clients follow a job with ``GET /api/jobs/<id>`` or the Server-Sent Events
+stream ``GET /api/jobs/<id>/events``.  Job state is kept in process and
+mirrored to Mongo when it is available, so any worker can answer a poll; the
+documents expire through a TTL index ``JOB_RESULT_TTL_SECONDS`` after the job
+finishes.  Under gunicorn's sync workers an open event stream holds a worker
+for up to ``JOB_SSE_MAX_SECONDS``, so polling is the better fit there.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from backend.config import env_float, env_int
+from backend.eventlog import log_event
+from backend.metrics import record_job, set_job_depth
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "JobQueue",
+    "JobRejected",
+    "init_app",
+]
+
+JOB_WORKERS = env_int("JOB_WORKERS", 2)
+JOB_MAX_PENDING = env_int("JOB_MAX_PENDING", 32)
+JOB_RESULT_TTL_SECONDS = env_float("JOB_RESULT_TTL_SECONDS", 900.0)
+JOB_SSE_POLL_SECONDS = env_float("JOB_SSE_POLL_SECONDS", 1.0)
+JOB_SSE_MAX_SECONDS = env_float("JOB_SSE_MAX_SECONDS", 60.0)
+# Comment line sent on an idle event stream so proxies do not close it.
+JOB_SSE_KEEPALIVE_SECONDS = 15.0
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = frozenset({SUCCEEDED, FAILED})
+
+# Request headers that describe the original transport rather than the call itself.
+_DROPPED_HEADERS = frozenset({"host", "content-length", "prefer", "connection"})
+
+
+class JobRejected(RuntimeError):
+    """Raised by :meth:`JobQueue.submit` when the queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Sunucu şu anda çok yoğun; lütfen biraz sonra tekrar dene.")
+        self.retry_after = retry_after
+
+
+class _Job:
+    __slots__ = (
+        "id", "endpoint", "status", "status_code", "result", "headers", "error",
+        "created_at", "started_at", "finished_at", "changed",
+    )
+
+    def __init__(self, endpoint: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.endpoint = endpoint
+        self.status = QUEUED
+        self.status_code: Optional[int] = None
+        self.result: Any = None
+        self.headers: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.changed = threading.Condition()
+
+    def as_document(self) -> Dict[str, Any]:
+        document = {
+            "_id": self.id,
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "status_code": self.status_code,
+            "result": self.result,
+            "headers": self.headers,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        # TTL index with expireAfterSeconds=0: unfinished jobs expire one TTL after creation.
+        document["expires_at"] = (self.finished_at or self.created_at) + timedelta(seconds=JOB_RESULT_TTL_SECONDS)
+        return document
+
+
+def serialise_job(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a job document."""
+    body: Dict[str, Any] = {"job_id": document["_id"], "status": document["status"]}
+    for key in ("created_at", "started_at", "finished_at"):
+        if document.get(key) is not None:
+            body[key] = document[key].isoformat(timespec="seconds") + "Z"
+    if document["status"] in FINISHED:
+        body["status_code"] = document.get("status_code")
+        body["result"] = document.get("result")
+        if document.get("error"):
+            body["error"] = document["error"]
+    return body
+
+
+class JobQueue:
+    """Run captured requests on a bounded pool and keep their results for a while."""
+
+    def __init__(
+        self,
+        app: Any,
+        get_collection: Optional[Callable[[], Any]] = None,
+        *,
+        workers: int = JOB_WORKERS,
+        max_pending: int = JOB_MAX_PENDING,
+        ttl: float = JOB_RESULT_TTL_SECONDS,
+    ) -> None:
+        self.app = app
+        self.get_collection = get_collection
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._indexed = False
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        endpoint: str,
+        *,
+        path: str,
+        method: str,
+        body: bytes,
+        headers: Iterable[tuple],
+        query_string: str,
+    ) -> Dict[str, Any]:
+        """Queue one request for replay; raises :class:`JobRejected` when full."""
+        job = _Job(endpoint)
+        with self._lock:
+            if self._queued + self._running >= self.workers + self.max_pending:
+                record_job(endpoint, "rejected")
+                raise JobRejected(retry_after=5)
+            self._queued += 1
+            self._jobs[job.id] = job
+            self._purge_locked()
+            self._publish_depth_locked()
+            executor = self._ensure_executor_locked()
+        self._store(job)
+        captured = {
+            "path": path,
+            "method": method,
+            "data": body,
+            "headers": [(key, value) for key, value in headers if key.lower() not in _DROPPED_HEADERS],
+            "query_string": query_string,
+        }
+        executor.submit(self._run, job, captured)
+        log_event(logger, "job_queued", job_id=job.id, endpoint=endpoint)
+        return job.as_document()
+
+    def _ensure_executor_locked(self) -> ThreadPoolExecutor:
+        # Threads do not survive gunicorn's fork; each worker builds its own pool.
+        if self._executor is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def _run(self, job: _Job, captured: Dict[str, Any]) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._publish_depth_locked()
+        self._transition(job, RUNNING, started_at=datetime.utcnow())
+        started = time.perf_counter()
+        try:
+            with self.app.test_request_context(
+                captured["path"],
+                method=captured["method"],
+                data=captured["data"],
+                headers=captured["headers"],
+                query_string=captured["query_string"],
+            ):
+                response = self.app.full_dispatch_request()
+            result = response.get_json(silent=True)
+            if result is None:
+                result = response.get_data(as_text=True)
+            status = SUCCEEDED if response.status_code < 400 else FAILED
+            self._transition(
+                job,
+                status,
+                status_code=response.status_code,
+                result=result,
+                headers={key: value for key, value in response.headers.items() if key.startswith("X-")},
+                finished_at=datetime.utcnow(),
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Job %s (%s) failed.", job.id, job.endpoint)
+            status = FAILED
+            self._transition(
+                job,
+                FAILED,
+                status_code=500,
+                error="İşlem tamamlanamadı.",
+                finished_at=datetime.utcnow(),
+            )
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._publish_depth_locked()
+        run_seconds = time.perf_counter() - started
+        wait_seconds = (job.started_at - job.created_at).total_seconds() if job.started_at else 0.0
+        record_job(job.endpoint, status, wait=wait_seconds, run=run_seconds)
+        log_event(
+            logger,
+            "job_finished",
+            job_id=job.id,
+            endpoint=job.endpoint,
+            status=status,
+            status_code=job.status_code,
+            wait_ms=round(wait_seconds * 1000, 1),
+            run_ms=round(run_seconds * 1000, 1),
+        )
+
+    def _transition(self, job: _Job, status: str, **fields: Any) -> None:
+        with job.changed:
+            job.status = status
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.changed.notify_all()
+        self._store(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job document from this worker, else from Mongo; ``None`` if unknown or expired."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            with job.changed:
+                return job.as_document()
+        collection = self._collection()
+        if collection is None:
+            return None
+        try:
+            return collection.find_one({"_id": job_id})
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Job lookup failed for %s.", job_id)
+            return None
+
+    def wait(self, job_id: str, timeout: float) -> None:
+        """Block until the job changes state or ``timeout`` passes."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            time.sleep(min(timeout, JOB_SSE_POLL_SECONDS))
+            return
+        with job.changed:
+            if job.status not in FINISHED:
+                job.changed.wait(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queued,
+                "running": self._running,
+                "max_pending": self.max_pending,
+            }
+
+    def _purge_locked(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.finished_at is None or oldest.finished_at > cutoff:
+                break
+            self._jobs.popitem(last=False)
+
+    def _publish_depth_locked(self) -> None:
+        set_job_depth(QUEUED, self._queued)
+        set_job_depth(RUNNING, self._running)
+
+    def _collection(self) -> Any:
+        if self.get_collection is None:
+            return None
+        try:
+            collection = self.get_collection()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Job collection unavailable: %s", exc)
+            return None
+        if not self._indexed:
+            self._indexed = True
+            try:
+                collection.create_index([("expires_at", 1)], name="ttl", expireAfterSeconds=0)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not create the job TTL index.")
+        return collection
+
+    def _store(self, job: _Job) -> None:
+        collection = self._collection()
+        if collection is None:
+            return
+        with job.changed:
+            document = job.as_document()
+        try:
+            collection.replace_one({"_id": job.id}, document, upsert=True)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Could not store job %s; it is only visible to this worker.", job.id)
+
+
+def _wants_async(request: Any) -> bool:
+    if request.args.get("async", "").lower() in ("1", "true", "yes"):
+        return True
+    return "respond-async" in request.headers.get("Prefer", "").lower()
+
+
+def _event(name: str, data: Dict[str, Any]) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def init_app(app: Any, queue: JobQueue, endpoints: Iterable[str]) -> None:
+    """Offer async mode on ``endpoints`` (view names) and register the job routes."""
+    from flask import Response, jsonify, request, url_for
+
+    async_endpoints = frozenset(endpoints)
+
+    @app.before_request
+    def _enqueue_async_request():
+        if request.method != "POST" or request.endpoint not in async_endpoints or not _wants_async(request):
+            return None
+        query = "&".join(
+            part for part in request.query_string.decode("latin-1").split("&") if part and not part.startswith("async=")
+        )
+        try:
+            document = queue.submit(
+                request.endpoint,
+                path=request.path,
+                method=request.method,
+                body=request.get_data(),
+                headers=request.headers.items(),
+                query_string=query,
+            )
+        except JobRejected as exc:
+            response = jsonify({"error": str(exc)})
+            response.status_code = 503
+            response.headers["Retry-After"] = str(exc.retry_after)
+            return response
+        body = serialise_job(document)
+        body["status_url"] = url_for("job_status", job_id=document["_id"])
+        body["events_url"] = url_for("job_events", job_id=document["_id"])
+        response = jsonify(body)
+        response.status_code = 202
+        response.headers["Location"] = body["status_url"]
+        response.headers["Preference-Applied"] = "respond-async"
+        return response
+
+    @app.route("/api/jobs/<job_id>", methods=["GET"])
+    def job_status(job_id: str):
+        document = queue.get(job_id)
+        if document is None:
+            return jsonify({"error": "İş bulunamadı veya süresi doldu."}), 404
+        response = jsonify(serialise_job(document))
+        if document["status"] not in FINISHED:
+            response.headers["Retry-After"] = "1"
+        return response
+
+    @app.route("/api/jobs/<job_id>/events", methods=["GET"])
+    def job_events(job_id: str):
+        if queue.get(job_id) is None:
+            return jsonify({"error": "İş bulunamadı veya süresi doldu."}), 404
+
+        def stream() -> Iterator[str]:
+            deadline = time.monotonic() + JOB_SSE_MAX_SECONDS
+            last_status = None
+            last_sent = time.monotonic()
+            while True:
+                document = queue.get(job_id)
+                if document is None:
+                    yield _event("error", {"error": "İş bulunamadı veya süresi doldu."})
+                    return
+                if document["status"] != last_status:
+                    last_status = document["status"]
+                    last_sent = time.monotonic()
+                    yield _event("status", serialise_job(document))
+                    if last_status in FINISHED:
+                        return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # The client reconnects (EventSource does so itself) or falls back to polling.
+                    yield _event("timeout", {"job_id": job_id, "status": last_status})
+                    return
+                if time.monotonic() - last_sent >= JOB_SSE_KEEPALIVE_SECONDS:
+                    last_sent = time.monotonic()
+                    yield ": keepalive\n\n"
+                queue.wait(job_id, min(remaining, JOB_SSE_KEEPALIVE_SECONDS))
+
+        response = Response(stream(), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    @app.route("/api/jobs", methods=["GET"])
+    def job_queue_stats():
+        return jsonify(queue.stats())
@@ -0,0 +1 @@
+"""Local load-testing tools: dependency stubs and traffic drivers."""
@@ -0,0 +1,49 @@
+"""Opt-in NDJSON request capture for traffic replay.
+
+Enabled by setting ``REQUEST_CAPTURE_PATH``.  Each line records one request
+(method, path, query, JSON body, status and arrival time) in the format
+read by ``python -m backend.loadtest.harness --replay``.  Arrival times are
+absolute epoch seconds, so lines written by different workers share one
+clock; the replay makes them relative to the earliest request.  Bodies
+contain birth data, so only enable capture on environments you control.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from threading import Lock
+from typing import Any
+
+from flask import Flask, Response, request
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["install_request_capture"]
+
+
+def install_request_capture(app: Flask, path: str) -> None:
+    """Append every non-OPTIONS request handled by ``app`` to ``path``."""
+    lock = Lock()
+
+    @app.after_request
+    def _capture_request(response: Response) -> Response:
+        if request.method == "OPTIONS":
+            return response
+        entry: dict[str, Any] = {
+            "ts": round(time.time(), 4),
+            "method": request.method,
+            "path": request.path,
+            "query": request.args.to_dict(),
+            "json": request.get_json(silent=True),
+            "status": response.status_code,
+        }
+        try:
+            line = json.dumps(entry, ensure_ascii=False, default=str)
+            with lock, open(path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        except OSError as exc:
+            logger.warning("Request capture to %s failed: %s", path, exc)
+        return response
+
+    logger.warning("Request capture enabled; writing NDJSON to %s.", path)
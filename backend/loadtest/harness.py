@@ -0,0 +1,444 @@
+"""HTTP load harness for the Flask routes, with synthetic traffic or NDJSON replay.
+
+Usage::
+
+    # Spawn stubs + gunicorn (4 workers) + in-process Mongo and drive a mix for 60s
+    python -m backend.loadtest.harness --spawn --workers 4 --concurrency 32 --duration 60 \\
+        --mix natal=3,interpretation=3,synastry=1,chat=2,profile=3
+
+    # Replay captured traffic (REQUEST_CAPTURE_PATH) against a running server at 2x speed
+    python -m backend.loadtest.harness --base-url http://127.0.0.1:5000 --replay capture.ndjson --replay-speed 2
+
+Synthetic profile traffic reads and updates a fixed pool of profiles, which
+are seeded before the clock starts: over HTTP against ``--base-url``, or, for
+a spawned stack on ``memory://`` Mongo (one store per worker), by the gunicorn
+master before it forks so every worker starts with the same profiles.
+
+Prints throughput, errors (5xx and transport failures) and 4xx answers, and
+p50/p95/p99 latency per route; ``--output`` also writes the report as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from threading import Lock, local
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import requests
+
+from backend.loadtest.stubs import STUB_CITIES
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = "natal=3,interpretation=3,synastry=1,chat=2,profile=3"
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedRequest:
+    route: str
+    method: str
+    path: str
+    query: Mapping[str, Any] | None = None
+    body: Any = None
+    offset: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    route: str
+    status: int
+    latency: float
+    finished_at: float
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in TrafficGenerator.ROUTES:
+            raise ValueError(f"Unknown route '{name}' in mix; expected one of {sorted(TrafficGenerator.ROUTES)}.")
+        mix.append((name, float(weight or 1)))
+    if not mix:
+        raise ValueError("Traffic mix is empty.")
+    return mix
+
+
+class TrafficGenerator:
+    """Synthetic payloads shaped like the frontend's requests."""
+
+    ROUTES = ("natal", "interpretation", "synastry", "chat", "profile")
+
+    def __init__(self, mix: Sequence[Tuple[str, float]], seed: int = 7, profiles: int = 200) -> None:
+        self._names = [name for name, _ in mix]
+        self._weights = [weight for _, weight in mix]
+        self._seed = seed
+        self._rng = random.Random(seed)
+        self._lock = Lock()
+        self._emails = [f"load{index}@example.com" for index in range(profiles)]
+
+    @property
+    def uses_profiles(self) -> bool:
+        return "profile" in self._names
+
+    def seed_profiles(self) -> List[Dict[str, str]]:
+        """The profile pool that ``profile`` traffic reads; the same for a given seed."""
+        return [
+            {"firstName": "Yük", "lastName": "Testi", "email": email, **self._birth(random.Random(f"{self._seed}:{index}"))}
+            for index, email in enumerate(self._emails)
+        ]
+
+    def _birth(self, rng: Optional[random.Random] = None) -> Dict[str, str]:
+        rng = rng or self._rng
+        return {
+            "date": f"{rng.randint(1950, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "city": rng.choice(STUB_CITIES)[0].split(",")[0],
+        }
+
+    def next(self) -> PlannedRequest:
+        with self._lock:
+            route = self._rng.choices(self._names, weights=self._weights)[0]
+            rng = self._rng
+            if route == "natal":
+                return PlannedRequest(route, "POST", "/natal-chart", body=self._birth())
+            if route == "interpretation":
+                return PlannedRequest(route, "POST", "/api/interpretation", body=self._birth())
+            if route == "synastry":
+                return PlannedRequest(
+                    route, "POST", "/api/calculate-synastry", body={"person1": self._birth(), "person2": self._birth()}
+                )
+            if route == "chat":
+                turns = rng.randint(0, 12)
+                history = [
+                    {"role": "user" if index % 2 == 0 else "assistant", "content": "Satürn karesi bana ne anlatıyor? " * 3}
+                    for index in range(turns)
+                ]
+                return PlannedRequest(
+                    route, "POST", "/api/chat/message", body={"message": "Bugün neye odaklanmalıyım?", "history": history}
+                )
+            email = rng.choice(self._emails)
+            if rng.random() < 0.7:
+                return PlannedRequest("profile", "GET", "/api/profile", query={"email": email})
+            profile = {"firstName": "Yük", "lastName": "Testi", "email": email, **self._birth()}
+            return PlannedRequest("profile", "POST", "/api/profile", body=profile)
+
+
+def seed_over_http(base_url: str, profiles: Sequence[Mapping[str, Any]], timeout: float) -> int:
+    """PUT every profile once; returns how many were not stored."""
+    failed = 0
+    with requests.Session() as session:
+        for profile in profiles:
+            try:
+                response = session.put(base_url.rstrip("/") + "/api/profile", json=profile, timeout=timeout)
+                failed += response.status_code >= 400
+            except requests.RequestException:
+                failed += 1
+    return failed
+
+
+def load_replay(path: str) -> List[PlannedRequest]:
+    """Captured requests with offsets relative to the earliest one.
+
+    Captures stamp absolute times, so files from several workers (or
+    concatenated captures) replay on one shared timeline.
+    """
+    planned: List[PlannedRequest] = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            planned.append(
+                PlannedRequest(
+                    route=entry.get("route") or entry["path"],
+                    method=(entry.get("method") or "GET").upper(),
+                    path=entry["path"],
+                    query=entry.get("query") or None,
+                    body=entry.get("json"),
+                    offset=float(entry.get("ts") or 0.0),
+                )
+            )
+    planned.sort(key=lambda item: item.offset)
+    if planned and planned[0].offset:
+        origin = planned[0].offset
+        planned = [replace(item, offset=item.offset - origin) for item in planned]
+    return planned
+
+
+class Runner:
+    def __init__(self, base_url: str, timeout: float) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.samples: List[Sample] = []
+        self._lock = Lock()
+        self._local = local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def execute(self, planned: PlannedRequest) -> None:
+        started = time.perf_counter()
+        try:
+            response = self._session().request(
+                planned.method,
+                self.base_url + planned.path,
+                params=planned.query,
+                json=planned.body if planned.method != "GET" else None,
+                timeout=self.timeout,
+            )
+            status = response.status_code
+        except requests.RequestException:
+            status = 0
+        finished = time.perf_counter()
+        with self._lock:
+            self.samples.append(Sample(planned.route, status, finished - started, finished))
+
+    def run_closed_loop(self, source: Iterator[PlannedRequest], concurrency: int) -> None:
+        source_lock = Lock()
+
+        def worker() -> None:
+            while True:
+                with source_lock:
+                    planned = next(source, None)
+                if planned is None:
+                    return
+                self.execute(planned)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+
+    def run_open_loop(self, planned: Sequence[PlannedRequest], concurrency: int, speed: float) -> None:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for item in planned:
+                delay = item.offset / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.execute, item)
+
+
+def _percentile(ordered: Sequence[float], quantile: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(quantile * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_report(samples: Sequence[Sample], elapsed: float) -> Dict[str, Any]:
+    routes: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        routes.setdefault(sample.route, []).append(sample)
+
+    def summarise(items: Sequence[Sample]) -> Dict[str, Any]:
+        latencies = sorted(item.latency for item in items)
+        errors = sum(1 for item in items if item.status == 0 or item.status >= 500)
+        client_errors = sum(1 for item in items if 400 <= item.status < 500)
+        return {
+            "requests": len(items),
+            "errors": errors,
+            "client_errors": client_errors,
+            "throughput_rps": round(len(items) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+            "statuses": {str(code): sum(1 for item in items if item.status == code) for code in sorted({i.status for i in items})},
+        }
+
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "total": summarise(samples),
+        "routes": {name: summarise(items) for name, items in sorted(routes.items())},
+    }
+
+
+def print_report(report: Mapping[str, Any]) -> None:
+    header = f"{'route':<28}{'reqs':>8}{'err':>6}{'4xx':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for name, stats in rows:
+        print(
+            f"{name:<28}{stats['requests']:>8}{stats['errors']:>6}{stats['client_errors']:>6}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+class SpawnedStack:
+    """Stub upstreams plus a gunicorn backend wired to them and to in-process Mongo.
+
+    With ``memory://`` Mongo and ``seed_profiles``, gunicorn preloads
+    :mod:`backend.loadtest.seeded_app`, so the profiles are written once in
+    the master and inherited by every worker.
+    """
+
+    def __init__(self, args: argparse.Namespace, seed_profiles: int = 0) -> None:
+        self.args = args
+        self.seed_profiles = seed_profiles
+        self.seeded = False
+        self.processes: List[subprocess.Popen] = []
+        self.base_url = ""
+
+    def __enter__(self) -> "SpawnedStack":
+        stub_port, app_port = _free_port(), _free_port()
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR.parent), env.get("PYTHONPATH")]))
+        stub_cmd = [
+            sys.executable, "-m", "backend.loadtest.stubs",
+            "--port", str(stub_port),
+            "--llm-latency", self.args.llm_latency,
+            "--error-rate", str(self.args.stub_error_rate),
+            "--throttle-rate", str(self.args.stub_throttle_rate),
+        ]
+        self.processes.append(
+            subprocess.Popen(stub_cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        )
+        _wait_for(f"http://127.0.0.1:{stub_port}/geocode/v1/json?q=Ankara")
+
+        env.update(
+            {
+                "GROQ_API_KEY": "stub",
+                "GROQ_API_URL": f"http://127.0.0.1:{stub_port}/v1/chat/completions",
+                "OPENCAGE_API_KEY": "stub",
+                "OPENCAGE_API_URL": f"http://127.0.0.1:{stub_port}/geocode/v1/json",
+                "MONGO_URI": env.get("LOADTEST_MONGO_URI", "memory://loadtest"),
+            }
+        )
+        app_cmd = [
+            sys.executable, "-m", "gunicorn",
+            "--chdir", str(BACKEND_DIR),
+            "--config", str(BACKEND_DIR / "gunicorn.conf.py"),
+            "--bind", f"127.0.0.1:{app_port}",
+            "--workers", str(self.args.workers),
+            "--threads", str(self.args.threads),
+            "--timeout", "120",
+            "--log-level", "warning",
+        ]
+        if self.seed_profiles and env["MONGO_URI"].startswith("memory://"):
+            env["LOADTEST_SEED_PROFILES"] = str(self.seed_profiles)
+            env["LOADTEST_SEED"] = str(self.args.seed)
+            app_cmd += ["--preload", "backend.loadtest.seeded_app:app"]
+            self.seeded = True
+        else:
+            app_cmd.append("wsgi:app")
+        self.processes.append(subprocess.Popen(app_cmd, env=env))
+        self.base_url = f"http://127.0.0.1:{app_port}"
+        _wait_for(f"{self.base_url}/api/health", timeout=60)
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        for process in reversed(self.processes):
+            process.send_signal(signal.SIGTERM)
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def _execute(args: argparse.Namespace, base_url: str, *, seeded: bool = False) -> Dict[str, Any]:
+    runner = Runner(base_url, args.timeout)
+    if not args.replay and not seeded and args.seed_profiles:
+        generator = TrafficGenerator(parse_mix(args.mix), seed=args.seed, profiles=args.profiles)
+        if generator.uses_profiles:
+            failed = seed_over_http(base_url, generator.seed_profiles(), args.timeout)
+            if failed:
+                print(f"warning: {failed} of {args.profiles} seed profiles were not stored", file=sys.stderr)
+    started = time.perf_counter()
+    if args.replay:
+        planned = load_replay(args.replay)
+        if args.replay_speed > 0:
+            runner.run_open_loop(planned, args.concurrency, args.replay_speed)
+        else:
+            runner.run_closed_loop(iter(planned), args.concurrency)
+    else:
+        generator = TrafficGenerator(parse_mix(args.mix), seed=args.seed, profiles=args.profiles)
+
+        def source() -> Iterator[PlannedRequest]:
+            issued = 0
+            while args.requests is None or issued < args.requests:
+                if args.duration and time.perf_counter() - started >= args.duration:
+                    return
+                issued += 1
+                yield generator.next()
+
+        runner.run_closed_loop(source(), args.concurrency)
+    return build_report(runner.samples, time.perf_counter() - started)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Drive the backend routes under concurrency.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="route weights, e.g. natal=3,chat=1")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run synthetic traffic")
+    parser.add_argument("--requests", type=int, default=None, help="stop after N synthetic requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--profiles", type=int, default=200, help="size of the profile pool read by profile traffic")
+    parser.add_argument(
+        "--no-seed-profiles", dest="seed_profiles", action="store_false", help="do not seed the profile pool first"
+    )
+    parser.add_argument("--replay", help="NDJSON capture to replay instead of synthetic traffic")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="time scale for replay; 0 = as fast as possible")
+    parser.add_argument("--output", help="write the JSON report here")
+    spawn = parser.add_argument_group("spawned stack")
+    spawn.add_argument("--spawn", action="store_true", help="start stubs + gunicorn + in-process Mongo")
+    spawn.add_argument("--workers", type=int, default=2)
+    spawn.add_argument("--threads", type=int, default=1)
+    spawn.add_argument("--llm-latency", default="lognormal:0.8,0.4")
+    spawn.add_argument("--stub-error-rate", type=float, default=0.0)
+    spawn.add_argument("--stub-throttle-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.spawn:
+        seed_profiles = args.profiles if args.seed_profiles and not args.replay else 0
+        with SpawnedStack(args, seed_profiles) as stack:
+            report = _execute(args, stack.base_url, seeded=stack.seeded)
+    else:
+        report = _execute(args, args.base_url)
+
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
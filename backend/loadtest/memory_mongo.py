@@ -0,0 +1,403 @@
+"""In-process stand-in for the subset of pymongo the backend uses.
+
+Selected with ``MONGO_URI=memory://`` so load tests can exercise the profile
+routes without a real MongoDB.  Data lives in the worker process only; each
+gunicorn worker therefore has its own store.
+"""
+from __future__ import annotations
+
+import copy
+import uuid
+from threading import RLock
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    from bson import ObjectId
+except ImportError:  # pragma: no cover - optional dependency
+    ObjectId = None  # type: ignore[assignment]
+
+__all__ = ["MemoryMongoClient"]
+
+_MISSING = object()
+
+
+def _new_id() -> Any:
+    return ObjectId() if ObjectId is not None else uuid.uuid4().hex
+
+
+def _get_path(document: Mapping[str, Any], path: str) -> Any:
+    current: Any = document
+    for part in path.split("."):
+        if not isinstance(current, Mapping) or part not in current:
+            return _MISSING
+        current = current[part]
+    return current
+
+
+def _set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    parts = path.split(".")
+    current = document
+    for part in parts[:-1]:
+        current = current.setdefault(part, {})
+    current[parts[-1]] = value
+
+
+def _unset_path(document: Dict[str, Any], path: str) -> None:
+    parts = path.split(".")
+    current: Any = document
+    for part in parts[:-1]:
+        current = current.get(part) if isinstance(current, dict) else None
+        if current is None:
+            return
+    if isinstance(current, dict):
+        current.pop(parts[-1], None)
+
+
+def _compare(value: Any, operator: str, expected: Any) -> bool:
+    if operator == "$eq":
+        return value == expected
+    if operator == "$ne":
+        return value != expected
+    if operator == "$in":
+        return value in expected
+    if operator == "$nin":
+        return value not in expected
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(expected)
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if operator == "$gt":
+            return value > expected
+        if operator == "$gte":
+            return value >= expected
+        if operator == "$lt":
+            return value < expected
+        if operator == "$lte":
+            return value <= expected
+    except TypeError:
+        return False
+    raise NotImplementedError(f"Unsupported query operator {operator}")
+
+
+def _matches(document: Mapping[str, Any], query: Mapping[str, Any] | None) -> bool:
+    for key, expected in (query or {}).items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in expected):
+                return False
+            continue
+        if key == "$and":
+            if not all(_matches(document, clause) for clause in expected):
+                return False
+            continue
+        value = _get_path(document, key)
+        if isinstance(expected, Mapping) and expected and all(str(op).startswith("$") for op in expected):
+            if not all(_compare(value, op, operand) for op, operand in expected.items()):
+                return False
+        elif value is _MISSING or value != expected:
+            return False
+    return True
+
+
+def _project(document: Mapping[str, Any], projection: Mapping[str, Any] | Sequence[str] | None) -> Dict[str, Any]:
+    result = copy.deepcopy(dict(document))
+    if not projection:
+        return result
+    if not isinstance(projection, Mapping):
+        projection = {field: 1 for field in projection}
+    include = {key for key, flag in projection.items() if flag and key != "_id"}
+    if include:
+        projected: Dict[str, Any] = {}
+        for key in include:
+            value = _get_path(result, key)
+            if value is not _MISSING:
+                _set_path(projected, key, value)
+        if projection.get("_id", 1) and "_id" in result:
+            projected["_id"] = result["_id"]
+        return projected
+    for key, flag in projection.items():
+        if not flag:
+            _unset_path(result, key)
+    return result
+
+
+def _apply_update(document: Dict[str, Any], update: Mapping[str, Any], *, inserting: bool) -> None:
+    for operator, fields in update.items():
+        if operator == "$set":
+            for key, value in fields.items():
+                _set_path(document, key, copy.deepcopy(value))
+        elif operator == "$setOnInsert":
+            if inserting:
+                for key, value in fields.items():
+                    _set_path(document, key, copy.deepcopy(value))
+        elif operator == "$unset":
+            for key in fields:
+                _unset_path(document, key)
+        elif operator == "$inc":
+            for key, value in fields.items():
+                current = _get_path(document, key)
+                _set_path(document, key, (0 if current is _MISSING else current) + value)
+        else:
+            raise NotImplementedError(f"Unsupported update operator {operator}")
+
+
+class DuplicateKeyError(Exception):
+    """Raised when a unique index would be violated."""
+
+
+class _Result:
+    def __init__(self, **fields: Any) -> None:
+        self.__dict__.update(fields)
+
+
+class MemoryCursor:
+    def __init__(self, documents: List[Dict[str, Any]], projection: Any) -> None:
+        self._documents = documents
+        self._projection = projection
+        self._limit = 0
+
+    def sort(self, key_or_list: Any, direction: int = 1) -> "MemoryCursor":
+        keys = key_or_list if isinstance(key_or_list, list) else [(key_or_list, direction)]
+        for key, order in reversed(keys):
+            self._documents.sort(
+                key=lambda doc: (_get_path(doc, key) is _MISSING, _sort_key(_get_path(doc, key))),
+                reverse=order < 0,
+            )
+        return self
+
+    def limit(self, count: int) -> "MemoryCursor":
+        self._limit = count
+        return self
+
+    def batch_size(self, _size: int) -> "MemoryCursor":
+        return self
+
+    def close(self) -> None:
+        self._documents = []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        documents = self._documents[: self._limit] if self._limit else self._documents
+        for document in documents:
+            yield _project(document, self._projection)
+
+
+def _sort_key(value: Any) -> Tuple[str, Any]:
+    if value is _MISSING or value is None:
+        return ("", 0)
+    return (type(value).__name__, value if not isinstance(value, (dict, list)) else str(value))
+
+
+class MemoryCollection:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._documents: Dict[Any, Dict[str, Any]] = {}
+        self._unique: List[Tuple[str, ...]] = []
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._lock = RLock()
+
+    # -- indexes -------------------------------------------------------------
+    def create_index(self, keys: Any, **options: Any) -> str:
+        key_list = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = options.get("name") or "_".join(f"{key}_{order}" for key, order in key_list)
+        with self._lock:
+            self._indexes[name] = {"key": key_list, **options}
+            if options.get("unique"):
+                self._unique.append(tuple(key for key, _ in key_list))
+        return name
+
+    def index_information(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {"_id_": {"key": [("_id", 1)]}, **copy.deepcopy(self._indexes)}
+
+    def _check_unique(self, candidate: Mapping[str, Any], ignore_id: Any = None) -> None:
+        for fields in self._unique:
+            values = tuple(_get_path(candidate, field) for field in fields)
+            if all(value is _MISSING for value in values):
+                continue
+            for identifier, document in self._documents.items():
+                if identifier == ignore_id:
+                    continue
+                if tuple(_get_path(document, field) for field in fields) == values:
+                    raise DuplicateKeyError(f"E11000 duplicate key {dict(zip(fields, values))}")
+
+    # -- reads ---------------------------------------------------------------
+    def _select(self, query: Mapping[str, Any] | None) -> List[Dict[str, Any]]:
+        return [document for document in self._documents.values() if _matches(document, query)]
+
+    def find_one(self, query: Mapping[str, Any] | None = None, projection: Any = None, **_: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for document in self._documents.values():
+                if _matches(document, query):
+                    return _project(document, projection)
+        return None
+
+    def find(self, query: Mapping[str, Any] | None = None, projection: Any = None, **_: Any) -> MemoryCursor:
+        with self._lock:
+            return MemoryCursor([copy.deepcopy(doc) for doc in self._select(query)], projection)
+
+    def count_documents(self, query: Mapping[str, Any] | None = None, **_: Any) -> int:
+        with self._lock:
+            return len(self._select(query))
+
+    # -- writes --------------------------------------------------------------
+    def insert_one(self, document: Mapping[str, Any], **_: Any) -> _Result:
+        with self._lock:
+            stored = copy.deepcopy(dict(document))
+            stored.setdefault("_id", _new_id())
+            if stored["_id"] in self._documents:
+                raise DuplicateKeyError(f"E11000 duplicate key _id={stored['_id']}")
+            self._check_unique(stored)
+            self._documents[stored["_id"]] = stored
+            return _Result(inserted_id=stored["_id"], acknowledged=True)
+
+    def _upsert_document(self, query: Mapping[str, Any], update: Mapping[str, Any]) -> Dict[str, Any]:
+        seed = {key: value for key, value in query.items() if not key.startswith("$") and not isinstance(value, Mapping)}
+        document: Dict[str, Any] = {}
+        for key, value in seed.items():
+            _set_path(document, key, copy.deepcopy(value))
+        if any(key.startswith("$") for key in update):
+            _apply_update(document, update, inserting=True)
+        else:
+            document.update(copy.deepcopy(dict(update)))
+        document.setdefault("_id", _new_id())
+        self._check_unique(document)
+        self._documents[document["_id"]] = document
+        return document
+
+    def _modify(self, query: Mapping[str, Any], update: Mapping[str, Any], *, upsert: bool, replace: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], bool]:
+        """Return (before, after, inserted)."""
+        for identifier, document in self._documents.items():
+            if _matches(document, query):
+                before = copy.deepcopy(document)
+                candidate = copy.deepcopy(document)
+                if replace:
+                    candidate = {"_id": identifier, **copy.deepcopy(dict(update))}
+                else:
+                    _apply_update(candidate, update, inserting=False)
+                self._check_unique(candidate, ignore_id=identifier)
+                self._documents[identifier] = candidate
+                return before, candidate, False
+        if not upsert:
+            return None, None, False
+        return None, self._upsert_document(query, update), True
+
+    def update_one(self, query: Mapping[str, Any], update: Mapping[str, Any], upsert: bool = False, **_: Any) -> _Result:
+        with self._lock:
+            before, after, inserted = self._modify(query, update, upsert=upsert)
+            return _Result(
+                matched_count=0 if inserted or after is None else 1,
+                modified_count=0 if inserted or after is None else 1,
+                upserted_id=after["_id"] if inserted and after else None,
+                acknowledged=True,
+            )
+
+    def replace_one(self, query: Mapping[str, Any], replacement: Mapping[str, Any], upsert: bool = False, **_: Any) -> _Result:
+        with self._lock:
+            before, after, inserted = self._modify(query, replacement, upsert=upsert, replace=True)
+            return _Result(
+                matched_count=0 if inserted or after is None else 1,
+                modified_count=0 if inserted or after is None else 1,
+                upserted_id=after["_id"] if inserted and after else None,
+                acknowledged=True,
+            )
+
+    def find_one_and_update(
+        self,
+        query: Mapping[str, Any],
+        update: Mapping[str, Any],
+        projection: Any = None,
+        upsert: bool = False,
+        return_document: Any = False,
+        **_: Any,
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            before, after, _inserted = self._modify(query, update, upsert=upsert)
+            chosen = after if return_document else before
+            return _project(chosen, projection) if chosen is not None else None
+
+    def delete_one(self, query: Mapping[str, Any], **_: Any) -> _Result:
+        with self._lock:
+            for identifier, document in list(self._documents.items()):
+                if _matches(document, query):
+                    del self._documents[identifier]
+                    return _Result(deleted_count=1, acknowledged=True)
+            return _Result(deleted_count=0, acknowledged=True)
+
+    def delete_many(self, query: Mapping[str, Any] | None = None, **_: Any) -> _Result:
+        with self._lock:
+            doomed = [identifier for identifier, document in self._documents.items() if _matches(document, query)]
+            for identifier in doomed:
+                del self._documents[identifier]
+            return _Result(deleted_count=len(doomed), acknowledged=True)
+
+    def bulk_write(self, requests: Iterable[Any], ordered: bool = True, **_: Any) -> _Result:
+        """Apply pymongo ``UpdateOne``/``ReplaceOne``/``InsertOne``/``DeleteOne`` requests."""
+        counts = {"inserted": 0, "matched": 0, "modified": 0, "upserted": 0, "deleted": 0}
+        upserted_ids: Dict[int, Any] = {}
+        for index, operation in enumerate(requests):
+            kind = type(operation).__name__
+            document = getattr(operation, "_doc", None)
+            query = getattr(operation, "_filter", None) or {}
+            upsert = bool(getattr(operation, "_upsert", False))
+            if kind == "InsertOne":
+                self.insert_one(document)
+                counts["inserted"] += 1
+            elif kind in {"UpdateOne", "ReplaceOne"}:
+                method = self.update_one if kind == "UpdateOne" else self.replace_one
+                result = method(query, document, upsert=upsert)
+                if result.upserted_id is not None:
+                    counts["upserted"] += 1
+                    upserted_ids[index] = result.upserted_id
+                else:
+                    counts["matched"] += result.matched_count
+                    counts["modified"] += result.modified_count
+            elif kind == "DeleteOne":
+                counts["deleted"] += self.delete_one(query).deleted_count
+            else:
+                raise NotImplementedError(f"Unsupported bulk operation {kind}")
+        return _Result(
+            inserted_count=counts["inserted"],
+            matched_count=counts["matched"],
+            modified_count=counts["modified"],
+            upserted_count=counts["upserted"],
+            deleted_count=counts["deleted"],
+            upserted_ids=upserted_ids,
+            acknowledged=True,
+        )
+
+
+class MemoryDatabase:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = RLock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+    def command(self, name: str, *_: Any, **__: Any) -> Dict[str, Any]:
+        return {"ok": 1.0}
+
+
+# Shared by every client so data survives ``close_mongo_client()`` reconnects.
+_databases: Dict[str, MemoryDatabase] = {}
+_databases_lock = RLock()
+
+
+class MemoryMongoClient:
+    """Drop-in for ``MongoClient`` covering the calls made by ``backend``."""
+
+    def __init__(self, *_: Any, **__: Any) -> None:
+        self.admin = MemoryDatabase("admin")
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        with _databases_lock:
+            if name not in _databases:
+                _databases[name] = MemoryDatabase(name)
+            return _databases[name]
+
+    def close(self) -> None:
+        """Nothing to release; data stays for the life of the process."""
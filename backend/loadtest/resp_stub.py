@@ -0,0 +1,202 @@
+"""In-memory Redis-protocol server standing in for the shared cache tier.
+
+Usage::
+
+    python -m backend.loadtest.resp_stub --port 6390 --latency fixed:0.001
+
+Then start the backend with ``CACHE_URL=redis://127.0.0.1:6390/0``.  Only the
+commands :class:`backend.cache.RedisCache` sends are implemented (``PING``,
+``AUTH``, ``SELECT``, ``GET``, ``SET`` with ``EX``/``PX``/``NX``/``XX``,
+``DEL``), plus ``EXISTS``, ``DBSIZE`` and ``FLUSHDB`` for inspection.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.loadtest.stubs import parse_latency
+
+__all__ = ["RespStubServer", "serve"]
+
+
+class _Store:
+    def __init__(self) -> None:
+        self.databases: Dict[int, Dict[bytes, Tuple[Optional[float], bytes]]] = {}
+        self.lock = threading.Lock()
+
+    def db(self, index: int) -> Dict[bytes, Tuple[Optional[float], bytes]]:
+        return self.databases.setdefault(index, {})
+
+
+class _Status:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class _Error:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+def _encode(reply: Any) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, bool):
+        return b":%d\r\n" % int(reply)
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    if isinstance(reply, _Status):
+        return b"+%s\r\n" % reply.text.encode()
+    if isinstance(reply, _Error):
+        return b"-%s\r\n" % reply.text.encode()
+    raise TypeError(f"cannot encode {reply!r}")
+
+
+_OK = _Status("OK")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "RespStubServer"
+
+    def handle(self) -> None:
+        db = 0
+        authenticated = self.server.password is None
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            delay = self.server.sample_latency()
+            if delay:
+                time.sleep(delay)
+            name = args[0].upper()
+            if name == b"QUIT":
+                self.wfile.write(_encode(_OK))
+                return
+            if name == b"AUTH":
+                authenticated = args[-1].decode() == self.server.password
+                reply: Any = _OK if authenticated else _Error("WRONGPASS invalid password")
+            elif not authenticated:
+                reply = _Error("NOAUTH Authentication required.")
+            elif name == b"SELECT":
+                db = int(args[1])
+                reply = _OK
+            else:
+                reply = self.server.execute(db, name, args[1:])
+            self.wfile.write(_encode(reply))
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command, as sent by telnet/nc
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+class RespStubServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        *,
+        latency: Callable[[random.Random], float] = lambda rng: 0.0,
+        password: Optional[str] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.store = _Store()
+        self.password = password
+        self._latency = latency
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        with self._rng_lock:
+            return self._latency(self._rng)
+
+    def execute(self, db: int, name: bytes, args: List[bytes]) -> Any:
+        now = time.monotonic()
+        with self.store.lock:
+            data = self.store.db(db)
+            if name == b"PING":
+                return _Status("PONG") if not args else args[0]
+            if name == b"GET":
+                entry = data.get(args[0])
+                if entry is None or (entry[0] is not None and entry[0] <= now):
+                    data.pop(args[0], None)
+                    return None
+                return entry[1]
+            if name == b"SET":
+                return self._set(data, args, now)
+            if name == b"DEL":
+                return sum(data.pop(key, None) is not None for key in args)
+            if name == b"EXISTS":
+                return sum(key in data and (data[key][0] is None or data[key][0] > now) for key in args)
+            if name == b"DBSIZE":
+                return len(data)
+            if name == b"FLUSHDB":
+                data.clear()
+                return _OK
+        return _Error(f"ERR unknown command '{name.decode(errors='replace')}'")
+
+    @staticmethod
+    def _set(data: Dict[bytes, Tuple[Optional[float], bytes]], args: List[bytes], now: float) -> Any:
+        if len(args) < 2:
+            return _Error("ERR wrong number of arguments for 'set' command")
+        key, value, options = args[0], args[1], [option.upper() for option in args[2:]]
+        expires_at = None
+        for index, option in enumerate(options):
+            if option in (b"EX", b"PX"):
+                amount = float(args[2 + index + 1])
+                expires_at = now + (amount if option == b"EX" else amount / 1000)
+        exists = key in data and (data[key][0] is None or data[key][0] > now)
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        data[key] = (expires_at, value)
+        return _OK
+
+
+def serve(host: str = "127.0.0.1", port: int = 6390, **options: Any) -> RespStubServer:
+    """Start a server on a daemon thread and return it (``shutdown()`` to stop)."""
+    server = RespStubServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="resp-stub", daemon=True).start()
+    return server
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run an in-memory Redis-protocol server for the shared cache tier.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--latency", default="fixed:0", help="per-command latency spec, as in backend.loadtest.stubs")
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    server = RespStubServer(
+        (args.host, args.port), latency=parse_latency(args.latency), password=args.password, seed=args.seed
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""WSGI entry point for the load harness: the backend with a seeded profile pool.
+
+Served as ``gunicorn --preload backend.loadtest.seeded_app:app`` by
+``python -m backend.loadtest.harness --spawn``.  With ``memory://`` Mongo each
+worker has its own store, so the profiles from ``LOADTEST_SEED_PROFILES`` and
+``LOADTEST_SEED`` (the harness's ``--profiles`` and ``--seed``) are written
+here, once, in the master; the forked workers inherit identical copies.
+"""
+from __future__ import annotations
+
+import logging
+import os
+
+from backend.app import app, get_profile_collection
+from backend.loadtest.harness import TrafficGenerator
+from backend.profile_store import extract_profile_payload, save_profile
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["app"]
+
+
+def _seed() -> None:
+    count = int(os.getenv("LOADTEST_SEED_PROFILES", "0"))
+    if count <= 0:
+        return
+    generator = TrafficGenerator([("profile", 1.0)], seed=int(os.getenv("LOADTEST_SEED", "7")), profiles=count)
+    collection = get_profile_collection()
+    for profile in generator.seed_profiles():
+        save_profile(collection, extract_profile_payload(profile))
+    logger.warning("Seeded %d load-test profiles before forking.", count)
+
+
+_seed()
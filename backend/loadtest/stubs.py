@@ -0,0 +1,286 @@
+"""Fake Groq (OpenAI-compatible) and OpenCage servers for local load tests.
+
+Usage::
+
+    python -m backend.loadtest.stubs --port 8099 --llm-latency lognormal:0.8,0.4 --error-rate 0.02
+
+Then start the backend with::
+
+    GROQ_API_KEY=stub GROQ_API_URL=http://127.0.0.1:8099/v1/chat/completions \\
+    OPENCAGE_API_KEY=stub OPENCAGE_API_URL=http://127.0.0.1:8099/geocode/v1/json \\
+    gunicorn --chdir backend wsgi:app
+
+Latency specs are ``fixed:S``, ``uniform:LOW,HIGH``, ``normal:MEAN,STDDEV`` or
+``lognormal:MEDIAN,SIGMA`` (all in seconds).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List
+
+from flask import Flask, Response, jsonify, request
+
+from backend.archetype_engine import call_ai_model
+
+__all__ = ["StubSettings", "create_stub_app", "parse_latency"]
+
+STUB_CITIES = (
+    ("İstanbul, Türkiye", 41.0082, 28.9784, "Europe/Istanbul"),
+    ("Ankara, Türkiye", 39.9334, 32.8597, "Europe/Istanbul"),
+    ("İzmir, Türkiye", 38.4237, 27.1428, "Europe/Istanbul"),
+    ("Berlin, Deutschland", 52.5200, 13.4050, "Europe/Berlin"),
+    ("London, United Kingdom", 51.5072, -0.1276, "Europe/London"),
+    ("New York, United States", 40.7128, -74.0060, "America/New_York"),
+    ("Tokyo, Japan", 35.6762, 139.6503, "Asia/Tokyo"),
+)
+
+
+def _default_canned() -> List[str]:
+    narrative = call_ai_model("Themes: growth, healing\nTone: natural expansion\nAxis: Yay–İkizler\nFocus: öz farkındalık")
+    return [
+        json.dumps(
+            {
+                "headline": "İçsel Dengeyi Ararken",
+                "summary": narrative,
+                "reasons": ["Duygularını sorumluluklarınla dengelemek olgunlaşma alanın."],
+                "actions": ["Her gün 5 dakikalık nefesle bedeni ve zihni hizala."],
+                "advice": "Kendi ritmine güven.",
+                "themes": ["growth", "healing"],
+            },
+            ensure_ascii=False,
+        )
+    ]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec such as ``lognormal:0.8,0.4`` into a sampler."""
+    kind, _, raw = spec.partition(":")
+    params = [float(part) for part in raw.split(",") if part.strip()] if raw else []
+    kind = kind.strip().lower()
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal" and len(params) == 2:
+        mu = math.log(params[0]) if params[0] > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, params[1])
+    raise ValueError(f"Invalid latency spec '{spec}'.")
+
+
+DEFAULT_LLM_LATENCY = "lognormal:0.8,0.4"
+DEFAULT_GEO_LATENCY = "uniform:0.05,0.2"
+
+
+@dataclass(slots=True)
+class StubSettings:
+    llm_latency: str = DEFAULT_LLM_LATENCY
+    geo_latency: str = DEFAULT_GEO_LATENCY
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    stream_chunk_delay: float = 0.01
+    canned: List[str] = field(default_factory=_default_canned)
+    seed: int | None = None
+
+
+class _Dice:
+    """Thread-safe shared RNG so concurrent requests draw reproducible samples."""
+
+    def __init__(self, seed: int | None) -> None:
+        self._rng = random.Random(seed)
+        self._lock = Lock()
+
+    def sample(self, sampler: Callable[[random.Random], float]) -> float:
+        with self._lock:
+            return sampler(self._rng)
+
+    def chance(self, rate: float) -> bool:
+        with self._lock:
+            return self._rng.random() < rate
+
+    def choice(self, items: List[str]) -> str:
+        with self._lock:
+            return self._rng.choice(items)
+
+
+def _openai_error(message: str, error_type: str, status: int) -> Response:
+    response = jsonify({"error": {"message": message, "type": error_type}})
+    response.status_code = status
+    if status == 429:
+        response.headers["Retry-After"] = "1"
+    return response
+
+
+def create_stub_app(settings: StubSettings | None = None) -> Flask:
+    """Build the stub Flask app serving both fake upstreams."""
+    settings = settings or StubSettings()
+    stub = Flask(__name__)
+    dice = _Dice(settings.seed)
+    llm_latency = parse_latency(settings.llm_latency)
+    geo_latency = parse_latency(settings.geo_latency)
+
+    def injected_failure() -> Response | None:
+        if dice.chance(settings.throttle_rate):
+            return _openai_error("Rate limit reached (stub).", "rate_limit_exceeded", 429)
+        if dice.chance(settings.error_rate):
+            return _openai_error("Upstream failure (stub).", "server_error", 500)
+        return None
+
+    @stub.route("/v1/chat/completions", methods=["POST"])
+    @stub.route("/openai/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        payload = request.get_json(silent=True) or {}
+        latency = dice.sample(llm_latency)
+        failure = injected_failure()
+        if failure is not None:
+            time.sleep(latency * 0.2)
+            return failure
+
+        content = dice.choice(settings.canned)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = payload.get("model") or "stub-model"
+        created = int(time.time())
+        prompt_chars = sum(len(str(message.get("content") or "")) for message in payload.get("messages") or [])
+        usage = {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_chars // 4 + len(content) // 4,
+        }
+
+        if payload.get("stream"):
+            def events() -> Iterator[str]:
+                time.sleep(latency)
+                words = content.split(" ")
+                for index, word in enumerate(words):
+                    delta: Dict[str, Any] = {"content": word if index == 0 else f" {word}"}
+                    if index == 0:
+                        delta["role"] = "assistant"
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    time.sleep(settings.stream_chunk_delay)
+                final = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return Response(events(), mimetype="text/event-stream")
+
+        time.sleep(latency)
+        return jsonify(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+        )
+
+    @stub.route("/v1/models", methods=["GET"])
+    @stub.route("/openai/v1/models", methods=["GET"])
+    def models():
+        return jsonify({"object": "list", "data": [{"id": "stub-model", "object": "model"}]})
+
+    @stub.route("/geocode/v1/json", methods=["GET"])
+    def geocode():
+        query = (request.args.get("q") or "").strip()
+        time.sleep(dice.sample(geo_latency))
+        if dice.chance(settings.throttle_rate):
+            response = jsonify({"status": {"code": 429, "message": "Too Many Requests"}, "results": []})
+            response.status_code = 429
+            return response
+        if dice.chance(settings.error_rate):
+            response = jsonify({"status": {"code": 503, "message": "Service Unavailable"}, "results": []})
+            response.status_code = 503
+            return response
+        if not query:
+            response = jsonify({"status": {"code": 400, "message": "missing query"}, "results": []})
+            response.status_code = 400
+            return response
+
+        match = next((city for city in STUB_CITIES if city[0].lower().startswith(query.lower())), None)
+        if match is None:
+            # Unknown names resolve deterministically so any corpus works.
+            digest = int(hashlib.sha1(query.lower().encode("utf-8")).hexdigest(), 16)
+            match = STUB_CITIES[digest % len(STUB_CITIES)]
+        label, latitude, longitude, timezone = match
+        return jsonify(
+            {
+                "results": [
+                    {
+                        "formatted": label,
+                        "geometry": {"lat": latitude, "lng": longitude},
+                        "annotations": {"timezone": {"name": timezone}},
+                        "confidence": 9,
+                    }
+                ],
+                "status": {"code": 200, "message": "OK"},
+                "total_results": 1,
+            }
+        )
+
+    return stub
+
+
+def _load_canned(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    items = data if isinstance(data, list) else [data]
+    return [item if isinstance(item, str) else json.dumps(item, ensure_ascii=False) for item in items]
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run fake Groq/OpenCage upstreams for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--llm-latency", default=DEFAULT_LLM_LATENCY)
+    parser.add_argument("--geo-latency", default=DEFAULT_GEO_LATENCY)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 5xx")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.01)
+    parser.add_argument("--canned", help="JSON file with a list of completion contents (strings or objects)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    settings = StubSettings(
+        llm_latency=args.llm_latency,
+        geo_latency=args.geo_latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        stream_chunk_delay=args.stream_chunk_delay,
+        seed=args.seed,
+    )
+    if args.canned:
+        settings.canned = _load_canned(args.canned)
+    create_stub_app(settings).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Prometheus metrics for the Astrologi-AI backend.
+
+Metrics are exposed at ``/metrics`` in the text exposition format.  Under
+gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty writable directory so
+every worker writes its samples to shared files and the scrape aggregates
+them (see ``backend/gunicorn.conf.py``).  Without ``prometheus_client``
+installed every helper here is a no-op and ``/metrics`` answers 503.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Gauge = Histogram = None  # type: ignore[assignment]
+
+try:
+    from pymongo import monitoring
+except ImportError:  # pragma: no cover - optional dependency
+    monitoring = None  # type: ignore[assignment]
+
+__all__ = [
+    "METRICS_ENABLED",
+    "init_app",
+    "mongo_event_listeners",
+    "record_cache",
+    "record_circuit_rejection",
+    "record_circuit_state",
+    "record_job",
+    "set_job_depth",
+    "time_ephemeris",
+    "track_dependency",
+]
+
+METRICS_ENABLED = Counter is not None
+_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+
+_REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+_DEPENDENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+_JOB_BUCKETS = (0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0)
+_FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+if METRICS_ENABLED:
+    HTTP_REQUESTS = Counter(
+        "astrologi_http_requests_total",
+        "HTTP requests handled, by route template, method and status.",
+        ["route", "method", "status"],
+    )
+    HTTP_LATENCY = Histogram(
+        "astrologi_http_request_duration_seconds",
+        "HTTP request latency by route template and method.",
+        ["route", "method"],
+        buckets=_REQUEST_BUCKETS,
+    )
+    DEPENDENCY_REQUESTS = Counter(
+        "astrologi_dependency_requests_total",
+        "Outbound calls by dependency (groq, opencage, mongo) and outcome.",
+        ["dependency", "outcome"],
+    )
+    DEPENDENCY_LATENCY = Histogram(
+        "astrologi_dependency_duration_seconds",
+        "Outbound call latency by dependency.",
+        ["dependency"],
+        buckets=_DEPENDENCY_BUCKETS,
+    )
+    DEPENDENCY_INFLIGHT = Gauge(
+        "astrologi_dependency_inflight",
+        "Outbound calls currently in flight; dependency=groq is the in-flight LLM count.",
+        ["dependency"],
+        multiprocess_mode="livesum",
+    )
+    CACHE_REQUESTS = Counter(
+        "astrologi_cache_requests_total",
+        "In-process cache lookups by cache and result (hit or miss).",
+        ["cache", "result"],
+    )
+    CIRCUIT_STATE = Gauge(
+        "astrologi_circuit_state",
+        "Circuit breaker state per dependency: 0 closed, 1 half-open, 2 open (max across workers).",
+        ["dependency"],
+        multiprocess_mode="livemax",
+    )
+    CIRCUIT_REJECTIONS = Counter(
+        "astrologi_circuit_rejections_total",
+        "Calls refused without contacting the dependency because its breaker was open.",
+        ["dependency"],
+    )
+    JOB_QUEUE_DEPTH = Gauge(
+        "astrologi_job_queue_depth",
+        "Async jobs waiting for (state=queued) or holding (state=running) a job worker.",
+        ["state"],
+        multiprocess_mode="livesum",
+    )
+    JOBS = Counter(
+        "astrologi_jobs_total",
+        "Async jobs by endpoint and outcome (succeeded, failed, rejected when the queue is full).",
+        ["endpoint", "outcome"],
+    )
+    JOB_LATENCY = Histogram(
+        "astrologi_job_duration_seconds",
+        "Async job time by endpoint and phase: wait (queued) or run (executing).",
+        ["endpoint", "phase"],
+        buckets=_JOB_BUCKETS,
+    )
+    EPHEMERIS_LATENCY = Histogram(
+        "astrologi_ephemeris_duration_seconds",
+        "Swiss Ephemeris house and planet computation time per chart.",
+        buckets=_FAST_BUCKETS,
+    )
+    MONGO_CHECKOUT_WAIT = Histogram(
+        "astrologi_mongo_pool_checkout_wait_seconds",
+        "Time spent waiting to check a connection out of the Mongo pool.",
+        buckets=_FAST_BUCKETS,
+    )
+
+
+class _DependencyCall:
+    __slots__ = ("outcome",)
+
+    def __init__(self) -> None:
+        self.outcome = "ok"
+
+    def observe_status(self, status_code: int) -> None:
+        """Count HTTP error responses that the caller handles without raising."""
+        if status_code >= 400:
+            self.outcome = "error"
+
+
+@contextmanager
+def track_dependency(name: str) -> Iterator[_DependencyCall]:
+    """Count, time and track the in-flight state of one outbound call."""
+    call = _DependencyCall()
+    if not METRICS_ENABLED:
+        yield call
+        return
+    inflight = DEPENDENCY_INFLIGHT.labels(name)
+    inflight.inc()
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.outcome = "error"
+        raise
+    finally:
+        inflight.dec()
+        DEPENDENCY_LATENCY.labels(name).observe(time.perf_counter() - started)
+        DEPENDENCY_REQUESTS.labels(name, call.outcome).inc()
+
+
+_cache_children: Dict[Tuple[str, bool], Any] = {}
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one lookup against ``cache``; hit ratio is hits / (hits + misses)."""
+    if not METRICS_ENABLED:
+        return
+    child = _cache_children.get((cache, hit))
+    if child is None:
+        child = _cache_children.setdefault((cache, hit), CACHE_REQUESTS.labels(cache, "hit" if hit else "miss"))
+    child.inc()
+
+
+_CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def record_circuit_state(dependency: str, state: str) -> None:
+    if METRICS_ENABLED:
+        CIRCUIT_STATE.labels(dependency).set(_CIRCUIT_STATE_VALUES[state])
+
+
+def record_circuit_rejection(dependency: str) -> None:
+    if METRICS_ENABLED:
+        CIRCUIT_REJECTIONS.labels(dependency).inc()
+
+
+def set_job_depth(state: str, value: int) -> None:
+    if METRICS_ENABLED:
+        JOB_QUEUE_DEPTH.labels(state).set(value)
+
+
+def record_job(endpoint: str, outcome: str, *, wait: float | None = None, run: float | None = None) -> None:
+    """Count one finished (or rejected) job and observe its queue wait and run time."""
+    if not METRICS_ENABLED:
+        return
+    JOBS.labels(endpoint, outcome).inc()
+    if wait is not None:
+        JOB_LATENCY.labels(endpoint, "wait").observe(wait)
+    if run is not None:
+        JOB_LATENCY.labels(endpoint, "run").observe(run)
+
+
+@contextmanager
+def time_ephemeris() -> Iterator[None]:
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        EPHEMERIS_LATENCY.observe(time.perf_counter() - started)
+
+
+if monitoring is not None:
+
+    class _MongoCommandListener(monitoring.CommandListener):
+        def started(self, event: Any) -> None:
+            DEPENDENCY_INFLIGHT.labels("mongo").inc()
+
+        def succeeded(self, event: Any) -> None:
+            self._finish(event, "ok")
+
+        def failed(self, event: Any) -> None:
+            self._finish(event, "error")
+
+        @staticmethod
+        def _finish(event: Any, outcome: str) -> None:
+            DEPENDENCY_INFLIGHT.labels("mongo").dec()
+            DEPENDENCY_LATENCY.labels("mongo").observe(event.duration_micros / 1e6)
+            DEPENDENCY_REQUESTS.labels("mongo", outcome).inc()
+
+    class _MongoPoolListener(monitoring.ConnectionPoolListener):
+        # Checkout happens on the calling thread, so a thread-local start time pairs
+        # each "started" event with its "checked out"/"failed" completion.
+        def __init__(self) -> None:
+            self._local = threading.local()
+
+        def connection_check_out_started(self, event: Any) -> None:
+            self._local.started = time.perf_counter()
+
+        def connection_checked_out(self, event: Any) -> None:
+            self._observe()
+
+        def connection_check_out_failed(self, event: Any) -> None:
+            self._observe()
+
+        def _observe(self) -> None:
+            started = getattr(self._local, "started", None)
+            if started is not None:
+                self._local.started = None
+                MONGO_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+        def _ignore(self, event: Any) -> None:
+            return None
+
+        pool_created = pool_ready = pool_cleared = pool_closed = _ignore
+        connection_created = connection_ready = connection_closed = connection_checked_in = _ignore
+
+
+def mongo_event_listeners() -> List[Any]:
+    """pymongo listeners feeding the Mongo latency and pool checkout metrics."""
+    if not METRICS_ENABLED or monitoring is None:
+        return []
+    return [_MongoCommandListener(), _MongoPoolListener()]
+
+
+def _render() -> bytes:
+    if _MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+def init_app(app: Any) -> None:
+    """Register per-route request metrics and the ``/metrics`` endpoint."""
+    from flask import g, jsonify, request
+
+    if METRICS_ENABLED:
+
+        @app.before_request
+        def _start_request_timer() -> None:
+            g._metrics_started = time.perf_counter()
+
+        @app.after_request
+        def _record_request(response: Any) -> Any:
+            started = g.pop("_metrics_started", None)
+            if started is None:
+                return response
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_LATENCY.labels(route, request.method).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+            return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        if not METRICS_ENABLED:
+            return jsonify({"error": "prometheus_client yüklü değil; metrikler devre dışı."}), 503
+        return _render(), 200, {"Content-Type": CONTENT_TYPE_LATEST}
@@ -0,0 +1,423 @@
+"""Profile persistence: declared indexes, per-endpoint projections and a read cache.
+
+Profiles are read far more often than written, so :func:`find_profile` keeps
+recently read documents in a small in-process LRU.  Writes go through
+:func:`save_profile`, which replaces the cached entry with the stored
+document.  Each worker has its own cache, so a profile saved through another
+worker can be served stale for up to ``PROFILE_CACHE_TTL_SECONDS``.
+
+With ``PROFILE_WRITE_BEHIND=1``, repeated saves of an existing profile are
+coalesced in memory and flushed in batches; reads in the same worker see the
+queued state, and the queue is flushed on clean shutdown.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Condition, Lock, Thread
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+try:
+    from pymongo import ReturnDocument, UpdateOne
+except ImportError:  # pragma: no cover - optional dependency
+    ReturnDocument = UpdateOne = None  # type: ignore[assignment]
+
+from backend.config import env_bool, env_float, env_int
+from backend.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "PROFILE_INDEXES",
+    "PROFILE_PROJECTIONS",
+    "chart_hash",
+    "ensure_profile_indexes",
+    "extract_profile_payload",
+    "find_profile",
+    "flush_pending_profiles",
+    "invalidate_profile",
+    "save_profile",
+    "serialise_profile",
+    "validate_profile_payload",
+]
+
+# (keys, options) pairs passed to ``create_index``; creation is idempotent.
+PROFILE_INDEXES: Tuple[Tuple[list, Dict[str, Any]], ...] = (
+    ([("email", 1)], {"name": "email_unique", "unique": True}),
+    ([("chart_hash", 1)], {"name": "chart_hash", "sparse": True}),
+)
+
+# Named field sets for read endpoints; ``None`` returns the whole document.
+PROFILE_PROJECTIONS: Dict[str, Optional[Dict[str, int]]] = {
+    "full": None,
+    "summary": {"firstName": 1, "lastName": 1, "email": 1, "created_at": 1, "updated_at": 1},
+    "birth": {"email": 1, "date": 1, "time": 1, "city": 1, "chart_hash": 1, "chart_id": 1},
+}
+
+PROFILE_CACHE_SIZE = env_int("PROFILE_CACHE_SIZE", 1024)
+PROFILE_CACHE_TTL_SECONDS = env_float("PROFILE_CACHE_TTL_SECONDS", 30.0)
+PROFILE_WRITE_BEHIND = env_bool("PROFILE_WRITE_BEHIND", False)
+
+# (email, view) -> (expires_at, document)
+_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_cache_lock = Lock()
+# Bumped on every write; a read only fills the cache if no write happened meanwhile.
+_write_generation = 0
+_indexed_collections: set = set()
+_CLOCK_TIME = re.compile(r"^(\d{1,2}):(\d{2})(?::00)?$")
+
+
+def chart_hash(date: Any, time_value: Any, city: Any) -> Optional[str]:
+    """Stable key for the birth inputs a chart is computed from."""
+    parts = [" ".join(str(value or "").split()) for value in (date, time_value, city)]
+    if not all(parts):
+        return None
+    clock = _CLOCK_TIME.match(parts[1])
+    if clock:
+        parts[1] = f"{int(clock.group(1)):02d}:{clock.group(2)}"
+    parts[2] = parts[2].casefold()
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def serialise_profile(document: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert MongoDB document into JSON-serialisable dict."""
+    result = dict(document)
+    identifier = result.pop("_id", None)
+    if identifier is not None:
+        result["id"] = str(identifier)
+    created_at = result.get("created_at")
+    if isinstance(created_at, datetime):
+        result["created_at"] = created_at.isoformat()
+    updated_at = result.get("updated_at")
+    if isinstance(updated_at, datetime):
+        result["updated_at"] = updated_at.isoformat()
+    return result
+
+
+def _normalise_chart_payload(chart_data: Any) -> Dict[str, Any] | None:
+    if isinstance(chart_data, dict):
+        return dict(chart_data)
+    if isinstance(chart_data, str):
+        try:
+            parsed = json.loads(chart_data)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def extract_profile_payload(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """Normalise a client profile payload into the stored document shape."""
+    first_name = str(payload.get("firstName") or "").strip()
+    last_name = str(payload.get("lastName") or "").strip()
+    email = str(payload.get("email") or "").strip().lower()
+
+    profile_payload: Dict[str, Any] = {
+        "firstName": first_name,
+        "lastName": last_name,
+        "email": email,
+        "date": payload.get("date"),
+        "time": payload.get("time"),
+        "city": payload.get("city"),
+        "chart": _normalise_chart_payload(payload.get("chart")),
+        "chart_hash": chart_hash(payload.get("date"), payload.get("time"), payload.get("city")),
+        "updated_at": datetime.utcnow(),
+    }
+    # Exports carry the stored chart reference; keep it so a round trip
+    # does not orphan the profile from its chart.
+    chart_id = payload.get("chart_id")
+    if isinstance(chart_id, str) and chart_id:
+        profile_payload["chart_id"] = chart_id
+    return profile_payload
+
+
+def validate_profile_payload(profile_payload: Mapping[str, Any]) -> list[str]:
+    """Return user-facing validation errors; empty when the payload can be stored."""
+    errors = []
+    if not profile_payload.get("firstName"):
+        errors.append("firstName gereklidir.")
+    if not profile_payload.get("lastName"):
+        errors.append("lastName gereklidir.")
+    email = profile_payload.get("email")
+    if not email:
+        errors.append("email gereklidir.")
+    elif "@" not in str(email):
+        errors.append("Geçerli bir email giriniz.")
+    for key in ("date", "time", "city"):
+        if not profile_payload.get(key):
+            errors.append(f"{key} alanı gereklidir.")
+    return errors
+
+
+def ensure_profile_indexes(collection: Any) -> None:
+    """Create the declared profile indexes once per collection and process.
+
+    A failure (e.g. existing duplicate emails blocking the unique index) is
+    logged and not retried until restart; reads and writes keep working.
+    """
+    key = (getattr(getattr(collection, "database", None), "name", None), collection.name)
+    if key in _indexed_collections:
+        return
+    _indexed_collections.add(key)
+    for keys, options in PROFILE_INDEXES:
+        try:
+            collection.create_index(keys, **options)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not create profile index %s on %s.", options["name"], collection.name)
+
+
+def _project(document: Mapping[str, Any], view: str) -> Dict[str, Any]:
+    fields = PROFILE_PROJECTIONS[view]
+    if fields is None:
+        return dict(document)
+    projected = {key: document[key] for key in fields if key in document}
+    if "_id" in document:
+        projected["_id"] = document["_id"]
+    return projected
+
+
+def _cache_get(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key: Tuple[str, str], document: Dict[str, Any], generation: Optional[int] = None) -> None:
+    with _cache_lock:
+        if generation is not None and generation != _write_generation:
+            return
+        _cache[key] = (time.monotonic() + PROFILE_CACHE_TTL_SECONDS, document)
+        _cache.move_to_end(key)
+        while len(_cache) > PROFILE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def invalidate_profile(email: str) -> None:
+    """Drop every cached view of ``email``."""
+    global _write_generation  # noqa: PLW0603 - module level cache
+    with _cache_lock:
+        _write_generation += 1
+        for view in PROFILE_PROJECTIONS:
+            _cache.pop((email, view), None)
+
+
+def _find_stored(collection: Any, email: str, view: str) -> Optional[Dict[str, Any]]:
+    key = (email, view)
+    if PROFILE_CACHE_SIZE > 0:
+        cached = _cache_get(key)
+        record_cache("profile", cached is not None)
+        if cached is not None:
+            return cached
+    with _cache_lock:
+        generation = _write_generation
+    document = collection.find_one({"email": email}, PROFILE_PROJECTIONS[view])
+    if document is not None and PROFILE_CACHE_SIZE > 0:
+        _cache_put(key, document, generation)
+    return document
+
+
+def find_profile(collection: Any, email: str, *, view: str = "full") -> Optional[Dict[str, Any]]:
+    """Return the ``view`` projection of the profile for ``email``, read-through cached.
+
+    Changes still queued by write-behind are applied on top of the stored
+    document.  Cached documents are shared between callers and must not be
+    mutated.
+    """
+    if view not in PROFILE_PROJECTIONS:
+        raise ValueError(f"Unknown profile view {view!r}")
+    pending = _write_behind.pending_payload(email) if _write_behind is not None else None
+    if pending is None:
+        return _find_stored(collection, email, view)
+    stored = _find_stored(collection, email, "full")
+    if stored is None:
+        return None
+    return _project({**stored, **pending}, view)
+
+
+class _PendingWrite:
+    __slots__ = ("collection", "payload", "first_queued", "last_queued")
+
+    def __init__(self, collection: Any, payload: Dict[str, Any], now: float) -> None:
+        self.collection = collection
+        self.payload = payload
+        self.first_queued = now
+        self.last_queued = now
+
+
+class _WriteBehindQueue:
+    """Coalesce profile updates per email and flush them with ``bulk_write``.
+
+    An email is flushed once it has been quiet for ``window`` seconds, and
+    never later than ``max_delay`` seconds after its first queued change;
+    ``max_pending`` queued emails force an immediate flush.  Those bounds are
+    the durability boundary: a crash loses at most ``max_delay`` seconds of
+    profile edits.  Profile creation always writes synchronously.
+    """
+
+    def __init__(self, window: float, max_delay: float, max_pending: int) -> None:
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self.max_pending = max_pending
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._stopping = False
+
+    def pending_payload(self, email: str) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            entry = self._pending.get(email)
+            return entry.payload if entry is not None else None
+
+    def enqueue(self, collection: Any, profile_payload: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queue an update; returns the resulting document, or ``None`` if it must be written now."""
+        email = profile_payload["email"]
+        current = find_profile(collection, email)
+        if current is None or self._stopping:
+            return None
+        now = time.monotonic()
+        with self._condition:
+            entry = self._pending.get(email)
+            if entry is None:
+                self._pending[email] = _PendingWrite(collection, dict(profile_payload), now)
+            else:
+                # A fresh object, so an in-flight flush can tell it was superseded.
+                replacement = _PendingWrite(collection, {**entry.payload, **profile_payload}, entry.first_queued)
+                replacement.last_queued = now
+                self._pending[email] = replacement
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="profile-write-behind", daemon=True)
+                self._thread.start()
+                # Registered here, after logging is configured, so the final flush can still log.
+                atexit.register(self.stop)
+            self._condition.notify()
+        return {**current, **profile_payload}
+
+    def _due(self, now: float) -> Tuple[List[Tuple[str, _PendingWrite]], Optional[float]]:
+        if self._stopping or len(self._pending) >= self.max_pending:
+            return list(self._pending.items()), None
+        due: List[Tuple[str, _PendingWrite]] = []
+        next_deadline: Optional[float] = None
+        for email, entry in self._pending.items():
+            deadline = min(entry.last_queued + self.window, entry.first_queued + self.max_delay)
+            if deadline <= now:
+                due.append((email, entry))
+            elif next_deadline is None or deadline < next_deadline:
+                next_deadline = deadline
+        return due, next_deadline
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                due, next_deadline = self._due(time.monotonic())
+                while not due:
+                    if self._stopping:
+                        return
+                    timeout = None if next_deadline is None else max(next_deadline - time.monotonic(), 0.0)
+                    self._condition.wait(timeout)
+                    due, next_deadline = self._due(time.monotonic())
+            if not self._write(due):
+                with self._condition:
+                    if self._stopping:
+                        return
+                    self._condition.wait(self.window)
+
+    def _write(self, due: List[Tuple[str, _PendingWrite]]) -> bool:
+        by_collection: Dict[int, List[Tuple[str, _PendingWrite]]] = {}
+        for email, entry in due:
+            by_collection.setdefault(id(entry.collection), []).append((email, entry))
+        ok = True
+        for entries in by_collection.values():
+            operations = [
+                UpdateOne(
+                    {"email": email},
+                    {"$set": entry.payload, "$setOnInsert": {"created_at": datetime.utcnow()}},
+                    upsert=True,
+                )
+                for email, entry in entries
+            ]
+            try:
+                entries[0][1].collection.bulk_write(operations, ordered=False)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Write-behind flush of %s profiles failed; will retry.", len(operations))
+                ok = False
+                continue
+            for email, entry in entries:
+                invalidate_profile(email)
+            with self._condition:
+                for email, entry in entries:
+                    if self._pending.get(email) is entry:
+                        del self._pending[email]
+        return ok
+
+    def flush(self) -> None:
+        """Write everything queued now, on the calling thread."""
+        with self._condition:
+            due = list(self._pending.items())
+        if due:
+            self._write(due)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=max(self.max_delay, 5.0))
+        self.flush()
+
+
+_write_behind: Optional[_WriteBehindQueue] = None
+if PROFILE_WRITE_BEHIND and UpdateOne is not None:
+    _write_behind = _WriteBehindQueue(
+        env_float("PROFILE_WRITE_BEHIND_WINDOW_SECONDS", 0.5),
+        env_float("PROFILE_WRITE_BEHIND_MAX_DELAY_SECONDS", 2.0),
+        env_int("PROFILE_WRITE_BEHIND_MAX_PENDING", 500),
+    )
+
+
+def flush_pending_profiles() -> None:
+    """Flush write-behind profile updates immediately (no-op when disabled)."""
+    if _write_behind is not None:
+        _write_behind.flush()
+
+
+def save_profile(collection: Any, profile_payload: Mapping[str, Any]) -> Dict[str, Any]:
+    """Upsert ``profile_payload`` by email and write the result through to the cache.
+
+    With ``PROFILE_WRITE_BEHIND=1`` updates to existing profiles are queued
+    and coalesced instead (see :class:`_WriteBehindQueue`).
+    """
+    email = profile_payload["email"]
+    if _write_behind is not None:
+        queued = _write_behind.enqueue(collection, profile_payload)
+        if queued is not None:
+            return queued
+    invalidate_profile(email)
+    document = collection.find_one_and_update(
+        {"email": email},
+        {
+            "$set": dict(profile_payload),
+            "$setOnInsert": {"created_at": datetime.utcnow()},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER if ReturnDocument is not None else True,
+    )
+    if document is not None and PROFILE_CACHE_SIZE > 0:
+        # Invalidate again so a read that raced with this write cannot cache the old copy.
+        invalidate_profile(email)
+        for view in PROFILE_PROJECTIONS:
+            _cache_put((email, view), _project(document, view))
+    return document
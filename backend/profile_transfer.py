@@ -0,0 +1,261 @@
+"""Streaming NDJSON export and import of the profiles collection.
+
+Usage::
+
+    python -m backend.profile_transfer export --output profiles.ndjson
+    python -m backend.profile_transfer import --input profiles.ndjson --batch-size 1000
+
+Export walks a batched cursor and yields one JSON line per profile, so memory
+stays flat regardless of collection size.  Import runs every line through
+:func:`extract_profile_payload`/:func:`validate_profile_payload`, exactly as
+``POST /api/profile`` does, and writes valid records with unordered
+``bulk_write`` upserts keyed by email.  The same operations are exposed to
+operators as ``GET /api/admin/profile-export`` and
+``POST /api/admin/profile-import`` (NDJSON request body).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+except ImportError:  # pragma: no cover - optional dependency
+    UpdateOne = None  # type: ignore[assignment]
+
+    class BulkWriteError(Exception):  # type: ignore[override]
+        """Fallback error when pymongo is unavailable."""
+
+from backend.admin import admin_required
+from backend.config import env_int
+from backend.db import MongoUnavailable
+from backend.eventlog import log_event
+from backend.profile_store import (
+    extract_profile_payload,
+    invalidate_profile,
+    serialise_profile,
+    validate_profile_payload,
+)
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ImportReport",
+    "export_profiles",
+    "import_profiles",
+    "init_app",
+]
+
+PROFILE_TRANSFER_BATCH_SIZE = env_int("PROFILE_TRANSFER_BATCH_SIZE", 1000)
+# Only the first errors are kept verbatim; the rest are counted.
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportReport:
+    """Running totals for one import; ``errors`` carries ``{"line", "email", "error"}`` records."""
+
+    __slots__ = ("lines", "upserted", "matched", "invalid", "failed", "errors")
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.upserted = 0
+        self.matched = 0
+        self.invalid = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def reject(self, line: int, error: str, email: Optional[str] = None) -> None:
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "email": email, "error": error})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lines": self.lines,
+            "upserted": self.upserted,
+            "matched": self.matched,
+            "invalid": self.invalid,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.invalid + self.failed > len(self.errors),
+        }
+
+
+def export_profiles(collection: Any, *, batch_size: int = PROFILE_TRANSFER_BATCH_SIZE) -> Iterator[str]:
+    """Yield every profile as one NDJSON line, reading the cursor in batches."""
+    cursor = collection.find({}, batch_size=batch_size)
+    try:
+        for document in cursor:
+            yield json.dumps(serialise_profile(document), ensure_ascii=False, default=str) + "\n"
+    finally:
+        cursor.close()
+
+
+def _created_at(record: Dict[str, Any]) -> datetime:
+    value = record.get("created_at")
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+
+def _flush(collection: Any, batch: List[tuple], report: ImportReport) -> None:
+    """Write ``batch`` of ``(line, email, operation)`` as one unordered bulk upsert."""
+    if not batch:
+        return
+    try:
+        result = collection.bulk_write([operation for _, _, operation in batch], ordered=False)
+        report.upserted += result.upserted_count
+        report.matched += result.matched_count
+    except BulkWriteError as exc:
+        details = exc.details or {}
+        report.upserted += details.get("nUpserted", 0)
+        report.matched += details.get("nMatched", 0)
+        for error in details.get("writeErrors", []):
+            line, email, _ = batch[error.get("index", 0)]
+            report.failed += 1
+            report.reject(line, error.get("errmsg", "write failed"), email)
+    for _, email, _ in batch:
+        invalidate_profile(email)
+    batch.clear()
+
+
+def import_profiles(
+    collection: Any,
+    lines: Iterable[Any],
+    *,
+    batch_size: int = PROFILE_TRANSFER_BATCH_SIZE,
+) -> ImportReport:
+    """Upsert profiles from NDJSON ``lines`` (str or bytes), ``batch_size`` per ``bulk_write``.
+
+    A batch is flushed early when an email repeats inside it, so later lines
+    win exactly as they would with sequential ``POST /api/profile`` calls.
+    """
+    if UpdateOne is None:
+        raise RuntimeError("pymongo is not installed; profile import is unavailable.")
+    report = ImportReport()
+    batch: List[tuple] = []
+    batch_emails: set = set()
+    for number, raw in enumerate(lines, start=1):
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", errors="replace")
+        if not raw.strip():
+            continue
+        report.lines += 1
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as exc:
+            report.invalid += 1
+            report.reject(number, f"Geçersiz JSON: {exc.msg}")
+            continue
+        if not isinstance(record, dict):
+            report.invalid += 1
+            report.reject(number, "Her satır bir JSON nesnesi olmalıdır.")
+            continue
+        profile_payload = extract_profile_payload(record)
+        errors = validate_profile_payload(profile_payload)
+        email = profile_payload["email"]
+        if errors:
+            report.invalid += 1
+            report.reject(number, " ".join(errors), email or None)
+            continue
+        if email in batch_emails:
+            _flush(collection, batch, report)
+            batch_emails.clear()
+        batch.append(
+            (
+                number,
+                email,
+                UpdateOne(
+                    {"email": email},
+                    {"$set": profile_payload, "$setOnInsert": {"created_at": _created_at(record)}},
+                    upsert=True,
+                ),
+            )
+        )
+        batch_emails.add(email)
+        if len(batch) >= batch_size:
+            _flush(collection, batch, report)
+            batch_emails.clear()
+    _flush(collection, batch, report)
+    return report
+
+
+def init_app(app: Any, get_collection: Callable[[], Any]) -> None:
+    """Register the admin export/import endpoints on ``app``."""
+    from flask import Response, jsonify, request, stream_with_context
+
+    @app.route("/api/admin/profile-export", methods=["GET"])
+    @admin_required
+    def export_profiles_endpoint():
+        batch_size = request.args.get("batch_size", type=int) or PROFILE_TRANSFER_BATCH_SIZE
+        try:
+            collection = get_collection()
+        except MongoUnavailable as exc:
+            return jsonify({"error": str(exc)}), 503
+        filename = f"profiles-{datetime.utcnow():%Y%m%dT%H%M%SZ}.ndjson"
+        return Response(
+            stream_with_context(export_profiles(collection, batch_size=batch_size)),
+            mimetype="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    @app.route("/api/admin/profile-import", methods=["POST"])
+    @admin_required
+    def import_profiles_endpoint():
+        batch_size = request.args.get("batch_size", type=int) or PROFILE_TRANSFER_BATCH_SIZE
+        try:
+            collection = get_collection()
+        except MongoUnavailable as exc:
+            return jsonify({"error": str(exc)}), 503
+        report = import_profiles(collection, request.stream, batch_size=batch_size)
+        log_event(logger, "profiles_imported", **{key: value for key, value in report.as_dict().items() if key != "errors"})
+        status = 200 if not (report.invalid or report.failed) else 207
+        return jsonify(report.as_dict()), status
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream profiles to or from NDJSON.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export", help="Write every profile as NDJSON.")
+    export_parser.add_argument("--output", default="-", help="Target file (default: stdout).")
+    export_parser.add_argument("--batch-size", type=int, default=PROFILE_TRANSFER_BATCH_SIZE)
+    import_parser = sub.add_parser("import", help="Upsert profiles from NDJSON.")
+    import_parser.add_argument("--input", default="-", help="Source file (default: stdin).")
+    import_parser.add_argument("--batch-size", type=int, default=PROFILE_TRANSFER_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from backend.app import get_profile_collection
+
+    collection = get_profile_collection()
+    if args.command == "export":
+        target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            count = 0
+            for line in export_profiles(collection, batch_size=args.batch_size):
+                target.write(line)
+                count += 1
+        finally:
+            if target is not sys.stdout:
+                target.close()
+        print(f"exported {count} profiles", file=sys.stderr)
+        return 0
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    try:
+        report = import_profiles(collection, source, batch_size=args.batch_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2), file=sys.stderr)
+    return 0 if not (report.invalid or report.failed) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
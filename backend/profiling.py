@@ -0,0 +1,188 @@
+"""Opt-in, admin-gated profiling of individual requests.
+
+A request is profiled when ``PROFILING_ENABLED=1`` and either it carries
+``X-Profile: 1`` together with a valid ``X-Admin-Token``, or it is picked by
+``PROFILE_SAMPLE_RATE``.  The request runs under ``pyinstrument`` (a
+sampling profiler) when installed, otherwise under ``cProfile``, while
+``tracemalloc`` records allocations.  Results are written to
+``PROFILE_OUTPUT_DIR`` and linked from the ``X-Profile-*`` response headers.
+
+At most one request is profiled at a time and no more than one every
+``PROFILE_MIN_INTERVAL_SECONDS``, so a single production worker can leave
+this enabled.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+from flask import g, jsonify, request, send_from_directory
+
+from backend.admin import admin_required, is_admin_request
+from backend.config import env_bool, env_float, env_int
+from backend.eventlog import log_event
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # pragma: no cover - optional dependency
+    SamplingProfiler = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PROFILING_ENABLED", "init_app"]
+
+PROFILING_ENABLED = env_bool("PROFILING_ENABLED", False)
+PROFILE_OUTPUT_DIR = Path(os.getenv("PROFILE_OUTPUT_DIR") or "/tmp/astrologi-profiles")
+PROFILE_SAMPLE_RATE = env_float("PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_MIN_INTERVAL_SECONDS = env_float("PROFILE_MIN_INTERVAL_SECONDS", 60.0)
+PROFILE_TOP_ALLOCATIONS = env_int("PROFILE_TOP_ALLOCATIONS", 25)
+PROFILE_HEADER = "X-Profile"
+
+_PROFILE_NAME = re.compile(r"^[0-9a-f]{12}\.(?:html|speedscope\.json|prof|stats\.txt|alloc\.txt)$")
+
+
+class _RateLimiter:
+    """Admit one profile at a time, at most once per ``interval`` seconds."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._busy = threading.Lock()
+        self._last = float("-inf")
+
+    def acquire(self) -> bool:
+        if not self._busy.acquire(blocking=False):
+            return False
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            self._busy.release()
+            return False
+        self._last = now
+        return True
+
+    def release(self) -> None:
+        self._busy.release()
+
+
+_limiter = _RateLimiter(PROFILE_MIN_INTERVAL_SECONDS)
+
+
+class _RequestProfile:
+    """One running profile; ``stop`` writes its artefacts and returns file names."""
+
+    def __init__(self, path: str) -> None:
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.path = path
+        self.started = time.perf_counter()
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(10)
+        if SamplingProfiler is not None:
+            self._sampler = SamplingProfiler(interval=0.001)
+            self._cprofile = None
+            self._sampler.start()
+        else:
+            self._sampler = None
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> list[str]:
+        if self._sampler is not None:
+            self._sampler.stop()
+        else:
+            self._cprofile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        elapsed = time.perf_counter() - self.started
+
+        PROFILE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+        base = PROFILE_OUTPUT_DIR / self.profile_id
+        files: list[str] = []
+        if self._sampler is not None:
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            Path(f"{base}.html").write_text(self._sampler.output_html(), encoding="utf-8")
+            Path(f"{base}.speedscope.json").write_text(
+                self._sampler.output(renderer=SpeedscopeRenderer()), encoding="utf-8"
+            )
+            files += [f"{self.profile_id}.html", f"{self.profile_id}.speedscope.json"]
+        else:
+            self._cprofile.dump_stats(f"{base}.prof")
+            summary = io.StringIO()
+            pstats.Stats(self._cprofile, stream=summary).sort_stats("cumulative").print_stats(60)
+            Path(f"{base}.stats.txt").write_text(summary.getvalue(), encoding="utf-8")
+            files += [f"{self.profile_id}.prof", f"{self.profile_id}.stats.txt"]
+
+        lines = [f"{self.path} {elapsed * 1000:.1f}ms; top {PROFILE_TOP_ALLOCATIONS} allocations by line"]
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+            lines.append(str(stat))
+        Path(f"{base}.alloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        files.append(f"{self.profile_id}.alloc.txt")
+        return files
+
+
+def _should_profile() -> bool:
+    if request.headers.get(PROFILE_HEADER) == "1" and is_admin_request():
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def init_app(app: Any) -> None:
+    """Register the profiling hooks and the artefact download route."""
+    if not PROFILING_ENABLED:
+        return
+
+    @app.before_request
+    def _start_profile() -> None:
+        if request.method == "OPTIONS" or request.path.startswith("/api/admin/profiles"):
+            return
+        if not _should_profile() or not _limiter.acquire():
+            return
+        try:
+            g._request_profile = _RequestProfile(request.path)
+        except Exception:  # pylint: disable=broad-except
+            _limiter.release()
+            logger.exception("Could not start request profiler.")
+
+    def _finish(response: Optional[Any]) -> None:
+        profile = g.pop("_request_profile", None)
+        if profile is None:
+            return
+        try:
+            files = profile.stop()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not write request profile.")
+            return
+        finally:
+            _limiter.release()
+        log_event(logger, "request_profiled", path=profile.path, profile_id=profile.profile_id, files=files)
+        if response is not None:
+            response.headers["X-Profile-Id"] = profile.profile_id
+            response.headers["X-Profile-Files"] = ", ".join(f"/api/admin/profiles/{name}" for name in files)
+
+    @app.after_request
+    def _stop_profile(response: Any) -> Any:
+        _finish(response)
+        return response
+
+    @app.teardown_request
+    def _abandon_profile(_exc: Optional[BaseException]) -> None:
+        _finish(None)
+
+    @app.route("/api/admin/profiles/<name>", methods=["GET"])
+    @admin_required
+    def download_profile(name: str):
+        if not _PROFILE_NAME.match(name):
+            return jsonify({"error": "Geçersiz profil dosyası."}), 404
+        return send_from_directory(PROFILE_OUTPUT_DIR, name)
@@ -0,0 +1,225 @@
+"""Compact, deterministic chart serialisation for LLM prompts."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, List, Mapping, Tuple
+
+from backend.config import env_int
+from backend.metrics import record_cache
+
+__all__ = [
+    "CHART_LEGEND",
+    "encode_chart",
+    "encode_aspects",
+]
+
+CHART_LEGEND = (
+    "Harita kodu: 'Gezegen Burç Derece Ev' (R=retro, H=ev); "
+    "açılarda son sayı orb derecesidir."
+)
+
+SIGN_CODES = {
+    "aries": "Ari",
+    "taurus": "Tau",
+    "gemini": "Gem",
+    "cancer": "Can",
+    "leo": "Leo",
+    "virgo": "Vir",
+    "libra": "Lib",
+    "scorpio": "Sco",
+    "sagittarius": "Sag",
+    "capricorn": "Cap",
+    "aquarius": "Aqu",
+    "pisces": "Pis",
+}
+_SIGN_ORDER = tuple(SIGN_CODES.values())
+# Aspects to the DSC/IC mirror those to the ASC/MC, so they add tokens but no meaning.
+_MIRRORED_ANGLES = frozenset({"Descendant", "Imum Coeli"})
+_ASPECT_ANGLES = {"conjunction": 0.0, "sextile": 60.0, "square": 90.0, "trine": 120.0, "opposition": 180.0}
+
+_CACHE_SIZE = env_int("PROMPT_CODEC_CACHE_SIZE", 1024)
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _sign_code(sign: Any, longitude: float | None) -> str:
+    if isinstance(sign, str) and sign.strip():
+        return SIGN_CODES.get(sign.strip().lower(), sign.strip()[:3])
+    if longitude is not None:
+        return _SIGN_ORDER[int((longitude % 360) // 30) % 12]
+    return "?"
+
+
+def _position(details: Mapping[str, Any]) -> Tuple[str, int | None]:
+    longitude = _number(details.get("longitude"))
+    degree = _number(details.get("degree"))
+    if degree is None and longitude is not None:
+        degree = longitude % 30
+    return _sign_code(details.get("sign"), longitude), int(degree) if degree is not None else None
+
+
+def _planet_fields(chart: Mapping[str, Any]) -> List[tuple]:
+    planets = chart.get("planets")
+    if isinstance(planets, Mapping):
+        items = planets.items()
+    elif isinstance(planets, list):
+        items = [
+            (entry.get("name") or entry.get("planet"), entry)
+            for entry in planets
+            if isinstance(entry, Mapping)
+        ]
+    else:
+        return []
+
+    fields = []
+    for name, details in items:
+        if not name or not isinstance(details, Mapping):
+            continue
+        sign, degree = _position(details)
+        house = details.get("house")
+        house_value = int(house) if _number(house) is not None else None
+        retrograde = bool(details.get("retrograde") or details.get("is_retrograde"))
+        fields.append((str(name), sign, degree, house_value, retrograde))
+    return fields
+
+
+def _birth_fields(chart: Mapping[str, Any]) -> tuple:
+    location = chart.get("location")
+    city = location.get("city") if isinstance(location, Mapping) else None
+    timezone = chart.get("timezone") or (location.get("timezone") if isinstance(location, Mapping) else None)
+    return tuple(str(value) for value in (chart.get("birth_datetime"), city, timezone) if value)
+
+
+def _angle_fields(chart: Mapping[str, Any]) -> List[tuple]:
+    angles = chart.get("angles")
+    if not isinstance(angles, Mapping):
+        return []
+    fields = []
+    for key, label in (("ascendant", "ASC"), ("midheaven", "MC")):
+        longitude = _number(angles.get(key))
+        if longitude is None:
+            continue
+        fields.append((label, _sign_code(angles.get(f"{key}_sign"), longitude), int(longitude % 30)))
+    return fields
+
+
+def _cusp_fields(chart: Mapping[str, Any]) -> List[tuple]:
+    houses = chart.get("house_positions")
+    if not isinstance(houses, Mapping):
+        return []
+    fields = []
+    for index in sorted(houses, key=lambda value: int(value) if str(value).isdigit() else 99):
+        details = houses[index]
+        if isinstance(details, Mapping):
+            fields.append((str(index), _position(details)[0]))
+    return fields
+
+
+def _aspect_orb(aspect: Mapping[str, Any]) -> float | None:
+    orb = _number(aspect.get("orb"))
+    if orb is not None:
+        return abs(orb)
+    exact = _number(aspect.get("exact_angle"))
+    expected = _ASPECT_ANGLES.get(str(aspect.get("aspect") or "").lower())
+    if exact is None or expected is None:
+        return None
+    return abs(exact - expected)
+
+
+def _aspect_fields(aspects: Any, *, skip_mirrored: bool = False) -> List[tuple]:
+    if not isinstance(aspects, list):
+        return []
+    fields = []
+    for aspect in aspects:
+        if not isinstance(aspect, Mapping):
+            continue
+        planet1 = aspect.get("planet1") or aspect.get("planet_1")
+        planet2 = aspect.get("planet2") or aspect.get("planet_2")
+        name = aspect.get("aspect") or aspect.get("type")
+        if not planet1 or not planet2 or not name:
+            continue
+        if skip_mirrored and (planet1 in _MIRRORED_ANGLES or planet2 in _MIRRORED_ANGLES):
+            continue
+        orb = _aspect_orb(aspect)
+        fields.append((str(planet1), str(name).capitalize(), str(planet2), round(orb, 1) if orb is not None else None))
+    return fields
+
+
+def _join_aspects(fields: List[tuple]) -> str:
+    return "; ".join(
+        f"{planet1} {name} {planet2}" + (f" {orb:g}" if orb is not None else "")
+        for planet1, name, planet2, orb in fields
+    )
+
+
+def encode_aspects(aspects: Any) -> str:
+    """Render an aspect list as ``Sun Square Saturn 1.5; ...``."""
+    return _join_aspects(_aspect_fields(aspects))
+
+
+def _render(birth: tuple, angles: List[tuple], planets: List[tuple], cusps: List[tuple], aspects: List[tuple]) -> str:
+    lines = []
+    if birth:
+        lines.append("Doğum: " + " | ".join(birth))
+    if angles:
+        lines.append(" | ".join(f"{label} {sign} {degree}" for label, sign, degree in angles))
+    if planets:
+        rendered = []
+        for name, sign, degree, house, retrograde in planets:
+            text = f"{name} {sign}" + (f" {degree}" if degree is not None else "")
+            if house is not None:
+                text += f" H{house}"
+            if retrograde:
+                text += " R"
+            rendered.append(text)
+        lines.append("; ".join(rendered))
+    if cusps:
+        lines.append("Evler: " + " ".join(f"{index}{sign}" for index, sign in cusps))
+    if aspects:
+        lines.append("Açılar: " + _join_aspects(aspects))
+    return "\n".join(lines)
+
+
+def _encode(chart: Mapping[str, Any]) -> str:
+    return _render(
+        _birth_fields(chart),
+        _angle_fields(chart),
+        _planet_fields(chart),
+        _cusp_fields(chart),
+        _aspect_fields(chart.get("aspects"), skip_mirrored=True),
+    )
+
+
+def encode_chart(chart: Mapping[str, Any] | None, *, cache_key: str | None = None) -> str:
+    """Render only the interpretively relevant fields of ``chart`` as dense text.
+
+    The birth moment, place and timezone lead, followed by angles, planets,
+    cusps and aspects.  With ``cache_key`` (a stored chart's ``chart_id``,
+    which identifies its content) the result is memoised under that key, so
+    a repeat prompt for the same chart skips the extraction entirely.
+    """
+
+    if not isinstance(chart, Mapping):
+        return ""
+    if cache_key is None or _CACHE_SIZE <= 0:
+        return _encode(chart)
+    with _cache_lock:
+        cached = _cache.get(cache_key)
+        if cached is not None:
+            _cache.move_to_end(cache_key)
+    record_cache("prompt_codec", cached is not None)
+    if cached is not None:
+        return cached
+    encoded = _encode(chart)
+    with _cache_lock:
+        _cache[cache_key] = encoded
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return encoded
@@ -0,0 +1,265 @@
+"""Current-sky snapshot, refreshed in the background and shared by every request.
+
+:class:`SkyService` computes the geocentric positions of the chart bodies for
+"now" every ``SKY_REFRESH_SECONDS`` on a daemon thread, together with the
+retrograde list, the Moon phase and the sign ingresses due within
+``SKY_INGRESS_HORIZON_DAYS``.  Each result is an immutable
+:class:`SkySnapshot` whose JSON body and ETag are rendered once, so
+``GET /api/sky/now`` costs the same under any load and transit logic can read
+``service.current()`` in-process instead of running the ephemeris again.
+
+Snapshots are taken at the ``SKY_REFRESH_SECONDS`` boundaries of the epoch
+rather than at whenever a worker happened to wake up, so every worker
+serves byte-identical bodies and ETags for the same interval.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import swisseph as swe
+
+from backend.config import env_float
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "SkyService",
+    "SkySnapshot",
+    "init_app",
+    "moon_phase",
+]
+
+SKY_REFRESH_SECONDS = env_float("SKY_REFRESH_SECONDS", 60.0)
+SKY_INGRESS_HORIZON_DAYS = env_float("SKY_INGRESS_HORIZON_DAYS", 30.0)
+
+# Scan step per body when looking for the next sign change; small enough that a
+# body cannot cross a whole sign (or turn around across a cusp) between steps.
+_FAST_BODY_STEP_DAYS = {"Moon": 0.25}
+_DEFAULT_STEP_DAYS = 1.0
+_INGRESS_PRECISION_DAYS = 1 / 1440  # one minute
+
+_PHASES = (
+    "New Moon",
+    "Waxing Crescent",
+    "First Quarter",
+    "Waxing Gibbous",
+    "Full Moon",
+    "Waning Gibbous",
+    "Last Quarter",
+    "Waning Crescent",
+)
+
+
+@dataclass(frozen=True)
+class SkySnapshot:
+    """Positions at ``computed_at``; mappings are read-only views."""
+
+    computed_at: datetime
+    planets: Mapping[str, Mapping[str, Any]]
+    retrogrades: Tuple[str, ...]
+    moon: Mapping[str, Any]
+    ingresses: Tuple[Mapping[str, Any], ...]
+    body: bytes
+    etag: str
+
+
+def _julian_day(moment: datetime) -> float:
+    hours = moment.hour + moment.minute / 60 + (moment.second + moment.microsecond / 1e6) / 3600
+    return swe.julday(moment.year, moment.month, moment.day, hours, swe.GREG_CAL)
+
+
+def _longitude(jd_ut: float, body: int) -> Tuple[float, float]:
+    values = swe.calc_ut(jd_ut, body)[0]
+    return float(values[0]) % 360, float(values[3])
+
+
+def moon_phase(sun_longitude: float, moon_longitude: float) -> Dict[str, Any]:
+    """Phase name, illuminated fraction and Sun–Moon elongation in degrees."""
+    elongation = (moon_longitude - sun_longitude) % 360
+    index = int(((elongation + 22.5) % 360) // 45)
+    return {
+        "phase": _PHASES[index],
+        "illumination": round((1 - math.cos(math.radians(elongation))) / 2, 3),
+        "elongation": round(elongation, 2),
+        "waxing": elongation < 180,
+    }
+
+
+def _next_ingress(body: int, step: float, jd_start: float, horizon: float) -> Optional[Tuple[float, int, int]]:
+    """``(jd, from_sign, to_sign)`` of the body's next sign change within ``horizon`` days."""
+    start_sign = int(_longitude(jd_start, body)[0] // 30)
+    previous = jd_start
+    current = jd_start + step
+    end = jd_start + horizon
+    while current <= end:
+        sign = int(_longitude(current, body)[0] // 30)
+        if sign != start_sign:
+            low, high = previous, current
+            while high - low > _INGRESS_PRECISION_DAYS:
+                middle = (low + high) / 2
+                if int(_longitude(middle, body)[0] // 30) == start_sign:
+                    low = middle
+                else:
+                    high = middle
+            return high, start_sign, int(_longitude(high, body)[0] // 30)
+        previous, current = current, current + step
+    return None
+
+
+def _from_julian_day(jd_ut: float) -> datetime:
+    year, month, day, hours = swe.revjul(jd_ut, swe.GREG_CAL)
+    return datetime(year, month, day, tzinfo=timezone.utc) + timedelta(hours=hours)
+
+
+class SkyService:
+    """Keep the latest :class:`SkySnapshot` for ``bodies`` (name -> Swiss Ephemeris id)."""
+
+    def __init__(
+        self,
+        bodies: Mapping[str, int],
+        sign_of: Callable[[float], str],
+        *,
+        interval: float = SKY_REFRESH_SECONDS,
+        horizon_days: float = SKY_INGRESS_HORIZON_DAYS,
+    ) -> None:
+        self.bodies = dict(bodies)
+        self.sign_of = sign_of
+        self.interval = interval
+        self.horizon_days = horizon_days
+        self._snapshot: Optional[SkySnapshot] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> SkySnapshot:
+        """The latest snapshot; computed on the calling thread only before the first refresh."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self.compute()
+                snapshot = self._snapshot
+        return snapshot
+
+    def max_age(self) -> int:
+        """Seconds until the current snapshot is replaced, for ``Cache-Control``."""
+        snapshot = self.current()
+        elapsed = (datetime.now(timezone.utc) - snapshot.computed_at).total_seconds()
+        return max(0, int(self.interval - elapsed))
+
+    def boundary(self, now: Optional[float] = None) -> datetime:
+        """The start of the refresh interval containing ``now`` (epoch seconds, default: now)."""
+        now = time.time() if now is None else now
+        return datetime.fromtimestamp(now - now % self.interval, timezone.utc)
+
+    def compute(self, moment: Optional[datetime] = None) -> SkySnapshot:
+        """Build a snapshot for ``moment`` (default: the current interval boundary, UTC)."""
+        moment = moment or self.boundary()
+        jd_ut = _julian_day(moment)
+        planets: Dict[str, Dict[str, Any]] = {}
+        for name, body in self.bodies.items():
+            try:
+                longitude, speed = _longitude(jd_ut, body)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("Sky position failed for %s: %s", name, exc)
+                continue
+            degree_in_sign = longitude % 30
+            planets[name] = {
+                "longitude": round(longitude, 2),
+                "speed": round(speed, 4),
+                "sign": self.sign_of(longitude),
+                "degree": int(degree_in_sign),
+                "minute": int((degree_in_sign - int(degree_in_sign)) * 60),
+                "retrograde": speed < 0,
+            }
+
+        ingresses: List[Dict[str, Any]] = []
+        for name, body in self.bodies.items():
+            if name not in planets:
+                continue
+            step = _FAST_BODY_STEP_DAYS.get(name, _DEFAULT_STEP_DAYS)
+            found = _next_ingress(body, step, jd_ut, self.horizon_days)
+            if found is None:
+                continue
+            at, from_sign, to_sign = found
+            ingresses.append(
+                {
+                    "body": name,
+                    "from_sign": self.sign_of(from_sign * 30.0),
+                    "sign": self.sign_of(to_sign * 30.0),
+                    "at": _from_julian_day(at).isoformat(timespec="minutes"),
+                }
+            )
+        ingresses.sort(key=lambda item: item["at"])
+
+        moon: Dict[str, Any] = {}
+        if "Sun" in planets and "Moon" in planets:
+            moon = moon_phase(planets["Sun"]["longitude"], planets["Moon"]["longitude"])
+        retrogrades = tuple(name for name, data in planets.items() if data["retrograde"])
+
+        payload = {
+            "computed_at": moment.isoformat(timespec="seconds"),
+            "planets": planets,
+            "retrogrades": list(retrogrades),
+            "moon": moon,
+            "ingresses": ingresses,
+        }
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        return SkySnapshot(
+            computed_at=moment,
+            planets=MappingProxyType({name: MappingProxyType(data) for name, data in planets.items()}),
+            retrogrades=retrogrades,
+            moon=MappingProxyType(moon),
+            ingresses=tuple(MappingProxyType(item) for item in ingresses),
+            body=body,
+            etag=hashlib.sha1(body).hexdigest()[:20],
+        )
+
+    def ensure_running(self) -> None:
+        """Start the refresh thread in this process if it is not running yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="sky-refresh", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            moment = self.boundary()
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.computed_at != moment:
+                try:
+                    self._snapshot = self.compute(moment)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Sky snapshot refresh failed; keeping the previous one.")
+            time.sleep(self.interval - time.time() % self.interval)
+
+
+def init_app(app: Any, service: SkyService) -> None:
+    """Register ``GET /api/sky/now`` and start ``service`` on the first request."""
+    from flask import Response, request
+
+    @app.before_request
+    def _start_sky_refresh() -> None:
+        service.ensure_running()
+
+    @app.route("/api/sky/now", methods=["GET"])
+    def sky_now():
+        snapshot = service.current()
+        response = Response(snapshot.body, mimetype="application/json")
+        response.set_etag(snapshot.etag)
+        response.last_modified = snapshot.computed_at
+        response.cache_control.public = True
+        response.cache_control.max_age = service.max_age()
+        return response.make_conditional(request)
@@ -0,0 +1,94 @@
+"""score_archetypes_batch must agree exactly with the per-chart archetype path."""
+from __future__ import annotations
+
+import math
+import random
+
+from backend import archetype_engine
+from backend.archetype_engine import (
+    ChartAnalysis,
+    analyze_aspects_weighted,
+    extract_archetype_data,
+    infer_axis_by_themes_and_pairs,
+    score_archetypes_batch,
+)
+
+PLANETS = ("Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto", "Chiron")
+ASPECTS = {"Conjunction": 0.0, "Sextile": 60.0, "Square": 90.0, "Trine": 120.0, "Opposition": 180.0}
+
+
+def _fixed_charts(count: int = 150, seed: int = 20241019) -> list:
+    rng = random.Random(seed)
+    charts = []
+    for _ in range(count):
+        aspects = []
+        for _ in range(rng.randint(0, 30)):
+            planet1, planet2 = rng.sample(PLANETS, 2)
+            name = rng.choice(list(ASPECTS))
+            aspect = {"planet1": planet1, "planet2": planet2, "aspect": rng.choice([name, name.lower(), name.upper()])}
+            shape = rng.randrange(4)
+            if shape == 0:
+                aspect["exact_angle"] = ASPECTS[name] + rng.uniform(-9.0, 9.0)
+            elif shape == 1:
+                aspect["orb"] = rng.uniform(-14.0, 14.0)
+            elif shape == 2:
+                aspect["exact_angle"] = rng.randint(0, 180)
+                aspect["orb"] = rng.uniform(0.0, 5.0)
+            aspects.append(aspect)
+        charts.append({"aspects": aspects, "planets": {name: {"longitude": rng.uniform(0, 360)} for name in PLANETS}})
+    return charts
+
+
+EDGE_CASES = [
+    {},
+    {"aspects": []},
+    {"aspects": "not a list"},
+    {"aspects": [None, "Sun trine Moon", {"planet1": "Sun"}, {"planet1": "", "planet2": "Moon", "aspect": "Trine"}]},
+    {"aspects": [{"planet1": "Moon", "planet2": "Sun", "aspect": "Quincunx", "exact_angle": 150.0}]},
+    {"aspects": [{"planet1": "pluto", "planet2": "VENUS", "aspect": "square", "orb": True}]},
+    {"aspects": [{"planet1": "Jupiter", "planet2": "Mars", "aspect": "Trine", "exact_angle": math.nan}]},
+    {"aspects": [{"planet1": "Jupiter", "planet2": "Mars", "aspect": "Trine", "exact_angle": "121", "orb": 2}]},
+    {"aspects": [{"planet1": " Sun ", "planet2": "Saturn", "aspect": "Opposition", "exact_angle": 200.0}] * 3},
+]
+
+
+def _per_chart(chart: dict) -> tuple:
+    theme_scores, derived_from = analyze_aspects_weighted(chart)
+    return theme_scores, infer_axis_by_themes_and_pairs(theme_scores, derived_from)[1]
+
+
+def test_batch_matches_extract_archetype_data_on_fixed_charts():
+    charts = _fixed_charts()
+    batch = score_archetypes_batch(charts)
+    assert len(batch) == len(charts)
+    for chart, (theme_scores, ranking) in zip(charts, batch):
+        analysis = ChartAnalysis(chart)
+        archetype = extract_archetype_data(chart, analysis=analysis)
+        expected_scores, _ = analysis.weighted_themes
+        assert theme_scores == expected_scores
+        assert list(theme_scores) == list(expected_scores)
+        if expected_scores:
+            assert ranking == analysis.axis_ranking
+            assert archetype["dominant_axis"] == ranking[0][0]
+
+
+def test_batch_matches_per_chart_functions_on_edge_cases():
+    charts = _fixed_charts(40, seed=7) + EDGE_CASES
+    assert score_archetypes_batch(charts) == [_per_chart(chart) for chart in charts]
+
+
+def test_batch_results_do_not_depend_on_batch_composition():
+    charts = _fixed_charts(60, seed=3)
+    together = score_archetypes_batch(charts)
+    assert together == [score_archetypes_batch([chart])[0] for chart in charts]
+    assert score_archetypes_batch([]) == []
+
+
+def test_key_table_remembers_a_bounded_number_of_misses(monkeypatch):
+    table = archetype_engine._BatchKeyTable(max_misses=3)  # pylint: disable=protected-access
+    monkeypatch.setattr(archetype_engine, "_BATCH_KEYS", table)
+    junk = [{"planet1": f"Body{index}", "planet2": "Sun", "aspect": "Trine"} for index in range(50)]
+    charts = _fixed_charts(20, seed=11) + [{"aspects": junk}, {"aspects": junk[:5]}]
+
+    assert score_archetypes_batch(charts) == [_per_chart(chart) for chart in charts]
+    assert list(table.ids.values()).count(-1) == 3
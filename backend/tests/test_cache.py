@@ -0,0 +1,207 @@
+"""Cache tiers against the in-process Redis-protocol stub, plus SQLite and early expiry."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from backend import cache as cache_module
+from backend.breaker import CircuitBreaker, CircuitOpen
+from backend.cache import CacheError, CacheNamespace, MemoryCache, RedisCache, SQLiteCache, TieredCache
+from backend.loadtest.resp_stub import serve
+
+
+@pytest.fixture
+def resp_server():
+    server = serve(port=0, password="s3cret")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def redis_cache(resp_server):
+    port = resp_server.server_address[1]
+    backend = RedisCache.from_url(f"redis://:s3cret@127.0.0.1:{port}/2", timeout=1.0)
+    # The "cache" breaker is process-wide; give each test its own.
+    backend.breaker = CircuitBreaker("cache-test", min_calls=2, failure_rate=0.5, open_seconds=60)
+    yield backend
+    backend.close()
+
+
+def test_redis_round_trip(redis_cache, resp_server):
+    assert redis_cache.ping()
+    assert redis_cache.get("missing") is None
+
+    redis_cache.set("key", b"\x00value\r\n", ttl=30)
+    assert redis_cache.get("key") == b"\x00value\r\n"
+    # AUTH and SELECT from the URL: the entry lands in database 2.
+    assert b"key" in resp_server.store.databases[2]
+
+    redis_cache.delete("key")
+    assert redis_cache.get("key") is None
+
+    redis_cache.set("short", b"v", ttl=0.05)
+    assert redis_cache.get("short") == b"v"
+    time.sleep(0.1)
+    assert redis_cache.get("short") is None
+
+    redis_cache.set("never", b"v", ttl=0)
+    assert redis_cache.get("never") is None
+
+
+def test_redis_wrong_password_is_a_cache_error(resp_server):
+    backend = RedisCache("127.0.0.1", resp_server.server_address[1], password="nope", timeout=1.0)
+    backend.breaker = CircuitBreaker("cache-test", min_calls=10)
+    with pytest.raises(CacheError):
+        backend.get("key")
+
+
+def test_tiered_cache_promotes_shared_hits(redis_cache, resp_server):
+    local = MemoryCache()
+    tiered = TieredCache(local, redis_cache, local_ttl=30)
+
+    redis_cache.set("key", b"shared", ttl=30)
+    assert local.get("key") is None
+    assert tiered.get("key") == b"shared"
+    assert local.get("key") == b"shared"
+
+    # Served from the local copy once the shared entry is gone (e.g. deleted on another node).
+    resp_server.store.databases[2].clear()
+    assert tiered.get("key") == b"shared"
+
+    tiered.set("both", b"v", ttl=30)
+    assert local.get("both") == b"v" and redis_cache.get("both") == b"v"
+    tiered.delete("both")
+    assert local.get("both") is None and redis_cache.get("both") is None
+
+
+def test_breaker_opens_when_the_server_goes_away(redis_cache, resp_server):
+    namespace = CacheNamespace(redis_cache, "test", ttl=30)
+    namespace.set("key", {"a": 1})
+    assert namespace.get("key") == {"a": 1}
+
+    # Drop pooled sockets too: their handler threads outlive the listening socket.
+    redis_cache.close()
+    resp_server.shutdown()
+    resp_server.server_close()
+
+    for _ in range(2):
+        with pytest.raises(CacheError):
+            redis_cache.get("key")
+    assert redis_cache.breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        redis_cache.get("key")
+
+    # Callers see misses, never errors.
+    assert namespace.get("key") is None
+    assert namespace.get_or_set("key", lambda: {"b": 2}) == {"b": 2}
+
+
+def test_sqlite_cache(tmp_path):
+    path = str(tmp_path / "nested" / "cache.db")
+    backend = SQLiteCache(path, max_entries=3)
+    assert backend.ping()
+    assert backend.get("key") is None
+
+    backend.set("key", b"value", ttl=30)
+    assert backend.get("key") == b"value"
+    backend.set("key", b"replaced", ttl=30)
+    assert backend.get("key") == b"replaced"
+
+    # Survives a restart.
+    backend.close()
+    reopened = SQLiteCache(path, max_entries=3)
+    assert reopened.get("key") == b"replaced"
+
+    reopened.delete("key")
+    assert reopened.get("key") is None
+
+    reopened.set("short", b"v", ttl=0.05)
+    time.sleep(0.1)
+    assert reopened.get("short") is None
+
+    # Sweep on the fifth of the next five writes.
+    reopened._SWEEP_EVERY, reopened._writes = 5, 0  # pylint: disable=protected-access
+    for index in range(5):
+        reopened.set(f"k{index}", b"v", ttl=10 + index)
+    # The sweep keeps the entries that expire last.
+    assert [reopened.get(f"k{index}") for index in range(5)] == [None, None, b"v", b"v", b"v"]
+    reopened.close()
+
+
+def test_get_or_set_computes_once_until_expiry():
+    namespace = CacheNamespace(MemoryCache(), "test", ttl=30, beta=0)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert namespace.get_or_set("key", compute) == {"n": 1}
+    assert namespace.get_or_set("key", compute) == {"n": 1}
+    assert len(calls) == 1
+
+    namespace.set("key", {"n": 0}, ttl=0.05)
+    time.sleep(0.1)
+    assert namespace.get_or_set("key", compute) == {"n": 2}
+
+    def fail():
+        raise ValueError("boom")
+
+    # With nothing cached, a failing compute propagates.
+    with pytest.raises(ValueError):
+        namespace.get_or_set("other", fail)
+
+
+def test_get_or_set_refreshes_early(monkeypatch):
+    monkeypatch.setattr(cache_module.random, "random", lambda: 0.5)
+    namespace = CacheNamespace(MemoryCache(), "test", ttl=30, beta=1.0)
+
+    # A cheap value far from expiry is served from the cache.
+    namespace.set("cheap", "old", delta=0.001)
+    assert namespace.get_or_set("cheap", lambda: "new") == "old"
+
+    # An expensive one is recomputed before it expires, and the new value is stored.
+    namespace.set("costly", "old", delta=1000.0)
+    assert namespace.get_or_set("costly", lambda: "new") == "new"
+    assert namespace.get("costly") == "new"
+
+    # A failed early refresh keeps serving the cached value.
+    namespace.set("costly", "old", delta=1000.0)
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    assert namespace.get_or_set("costly", fail) == "old"
+    assert namespace._refreshing == set()  # pylint: disable=protected-access
+
+
+def test_get_or_set_refreshes_each_key_once_at_a_time(monkeypatch):
+    monkeypatch.setattr(cache_module.random, "random", lambda: 0.5)
+    namespace = CacheNamespace(MemoryCache(), "test", ttl=30, beta=1.0)
+    namespace.set("key", "old", delta=1000.0)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "new"
+
+    results = []
+    refresher = threading.Thread(target=lambda: results.append(namespace.get_or_set("key", slow_compute)))
+    refresher.start()
+    assert started.wait(5)
+
+    # While the refresh runs, other readers get the cached value without computing.
+    assert namespace.get_or_set("key", slow_compute) == "old"
+    assert len(calls) == 1
+
+    release.set()
+    refresher.join(5)
+    assert results == ["new"]
+    assert namespace.get("key") == "new"
+    assert namespace._refreshing == set()  # pylint: disable=protected-access
@@ -0,0 +1,58 @@
+"""Daily insight texts written while Groq was down must not outlive the run that wrote them."""
+from __future__ import annotations
+
+from datetime import date
+
+import swisseph as swe
+
+from backend.daily_insight import DailyInsightPipeline, _profile_id
+from backend.loadtest.memory_mongo import MemoryCollection
+from backend.sky import SkyService
+
+TARGET = date(2026, 10, 20)
+
+
+def _profiles(pipeline: DailyInsightPipeline, count: int = 6) -> MemoryCollection:
+    transit_sun = pipeline.sky_for(TARGET).planets["Sun"]["longitude"]
+    profiles = MemoryCollection("profiles")
+    for index in range(count):
+        # Natal Suns conjunct or square the transiting Sun: two signatures, three profiles each.
+        sun = (transit_sun + 90.0 * (index % 2)) % 360
+        profiles.insert_one({"_id": f"p{index:02d}", "chart": {"planets": {"Sun": {"longitude": sun}}}})
+    return profiles
+
+
+def _pipeline(state: dict) -> DailyInsightPipeline:
+    def generate(context):
+        state["calls"] += 1
+        source = "refined" if state["groq_up"] else "deterministic"
+        return {"headline": source, "summary": source, "advice": source}, source
+
+    store = MemoryCollection("daily_insights")
+    sky = SkyService({"Sun": swe.SUN, "Moon": swe.MOON, "Mars": swe.MARS}, lambda longitude: str(int(longitude // 30)))
+    return DailyInsightPipeline(lambda: store, sky, lambda profile: profile.get("chart"), generate, requests_per_minute=0)
+
+
+def test_degraded_texts_are_replaced_by_the_next_run_and_on_demand():
+    state = {"groq_up": False, "calls": 0}
+    pipeline = _pipeline(state)
+    profiles = _profiles(pipeline)
+    store = pipeline.get_collection()
+
+    report = pipeline.run(profiles, TARGET, batch_size=1)
+    assert report.profiles == 6
+    # Within one run a fallback is still shared, so the outage costs one call per signature.
+    assert state["calls"] == report.generated == 2
+    assert {doc["source"] for doc in store.find({"kind": "profile"})} == {"deterministic"}
+
+    # On demand, a stored fallback counts as a miss and is regenerated.
+    state["groq_up"] = True
+    document, pregenerated = pipeline.insight_for(profiles.find_one({"_id": "p00"}), TARGET)
+    assert not pregenerated and document["source"] == "refined"
+    assert store.find_one({"_id": _profile_id(TARGET, "p00")})["source"] == "refined"
+
+    # ``--restart`` reuses the refined text and regenerates the remaining fallback.
+    state["calls"] = 0
+    report = pipeline.run(profiles, TARGET, batch_size=1, restart=True)
+    assert state["calls"] == report.generated == 1
+    assert {doc["source"] for doc in store.find({"kind": {"$in": ["profile", "text"]}})} == {"refined"}
@@ -0,0 +1,63 @@
+"""Async logging: forked workers keep logging, and redaction happens on the listener."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _run(script: str) -> str:
+    # configure_logging rewires the root logger for the whole process; keep that out of pytest's.
+    env = dict(os.environ, PYTHONPATH=ROOT, LOG_ASYNC="1", PYTHONUNBUFFERED="1")
+    result = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)], env=env, capture_output=True, text=True, timeout=30, check=True
+    )
+    return result.stdout
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_its_own_listener():
+    output = _run(
+        """
+        import logging, os, sys, time
+        logging.basicConfig(level=logging.INFO, stream=sys.stdout, format="%(message)s")
+        from backend.eventlog import configure_logging
+        configure_logging()
+        log = logging.getLogger("test")
+        log.info("parent before fork")
+        pid = os.fork()
+        if pid == 0:
+            log.info("child %s", "logged")
+            sys.exit(0)
+        os.waitpid(pid, 0)
+        log.info("parent after fork")
+        """
+    )
+    # Parent and child listeners write concurrently, so only the set of lines is fixed.
+    assert sorted(output.splitlines()) == ["child logged", "parent after fork", "parent before fork"]
+
+
+def test_arguments_are_redacted_on_the_listener_thread():
+    output = _run(
+        """
+        import logging, sys, threading, time
+        logging.basicConfig(level=logging.INFO, stream=sys.stdout, format="%(message)s")
+        from backend.eventlog import configure_logging, lazy
+        configure_logging()
+        resolved_on = []
+
+        def describe():
+            resolved_on.append(threading.current_thread() is threading.main_thread())
+            return {"email": "a@b.c", "note": "Bearer abc123"}
+
+        logging.getLogger("test").info("payload %s", lazy(describe))
+        time.sleep(0.2)
+        print("main thread" if resolved_on == [True] else "listener" if resolved_on == [False] else resolved_on)
+        """
+    )
+    assert output.splitlines() == ["payload {'email': '[redacted]', 'note': 'Bearer ***'}", "listener"]
@@ -0,0 +1,54 @@
+"""Hedged Groq calls under a circuit breaker."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+import requests
+
+from backend import app as app_module
+from backend import deadline as deadline_module
+from backend.breaker import CircuitBreaker
+from backend.deadline import Deadline, LatencyTracker, hedged_call
+
+
+def _ok_response() -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{"choices": []}'  # pylint: disable=protected-access
+    return response
+
+
+def test_backup_refused_by_half_open_breaker_waits_for_primary(monkeypatch):
+    breaker = CircuitBreaker("groq-test", min_calls=1, open_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)  # half-open; the primary takes the single trial slot
+    calls = []
+
+    def slow_post(*_args, **_kwargs):
+        calls.append(threading.current_thread().name)
+        time.sleep(0.3)
+        return _ok_response()
+
+    monkeypatch.setattr(app_module, "GROQ_BREAKER", breaker)
+    monkeypatch.setattr(app_module, "GROQ_LATENCY", LatencyTracker())
+    monkeypatch.setattr(app_module.requests, "post", slow_post)
+    monkeypatch.setattr(deadline_module, "_HEDGE_DEFAULT_DELAY", 0.05)
+    monkeypatch.setattr(deadline_module, "_HEDGE_MIN_DELAY", 0.01)
+
+    started = time.monotonic()
+    response = app_module._post_groq_hedged({}, {}, deadline=Deadline(5.0))  # pylint: disable=protected-access
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 0.25
+    assert len(calls) == 1  # the backup never reached Groq
+    assert breaker.state == "closed"
+
+
+def test_lone_non_retryable_error_is_raised_at_once():
+    def attempt(_timeout: float) -> None:
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        hedged_call(attempt, deadline=Deadline(5.0), hedge_after=0.01)
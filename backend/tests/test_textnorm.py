@@ -0,0 +1,305 @@
+"""The shared text normaliser must reproduce the regex helpers it replaced, byte for byte."""
+from __future__ import annotations
+
+import random
+import re
+from typing import Any, Dict, Iterable
+
+import pytest
+
+from backend import textnorm
+from backend.app import (
+    DEFAULT_ACTION_FALLBACKS,
+    DEFAULT_REASON_FALLBACKS,
+    LABEL_PREFIX_PATTERN,
+    build_card_payload,
+    first_sentences,
+    strip_label_prefix,
+)
+from backend.archetype_engine import clean_text, limit_sentences, map_confidence_label
+
+# --- Frozen copies of the implementations before backend/textnorm.py -----------------------------
+
+
+def old_clean_text(value: str | None) -> str:
+    if not isinstance(value, str):
+        return ""
+    text = value
+    text = re.sub(r"```+json|```+|^json\\b", "", text, flags=re.IGNORECASE).strip()
+
+    def _strip_brackets(match: re.Match[str]) -> str:
+        items = [
+            piece.strip(" '\"")
+            for piece in match.group(0).strip("[]").split(",")
+            if piece.strip(" '\"")
+        ]
+        return ", ".join(items)
+
+    text = re.sub(r"\[[^\[\]]*\]", _strip_brackets, text)
+    text = re.sub(r"\s+", " ", text).strip()
+    text = text.replace(" - ", " – ")
+    text = re.sub(r"\s*•\s*", " • ", text)
+    return text.strip()
+
+
+def old_limit_sentences(value: str | None, min_sentences: int = 3, max_sentences: int = 6) -> str:
+    cleaned = old_clean_text(value)
+    if not cleaned:
+        return ""
+    sentences = [
+        sentence.strip()
+        for sentence in re.split(r"(?<=[.!?])\s+", cleaned)
+        if sentence.strip()
+    ]
+    if not sentences:
+        return cleaned
+    clipped = sentences[:max_sentences]
+    if len(clipped) < min_sentences:
+        clipped = sentences[: max(len(sentences), min_sentences)]
+    joined = " ".join(clipped).rstrip(".!?")
+    return f"{joined}."
+
+
+def old_strip_label_prefix(text: Any) -> str:
+    if not isinstance(text, str):
+        return ""
+    cleaned = LABEL_PREFIX_PATTERN.sub("", text or "").strip()
+    cleaned = re.sub(r"^[•·\-\u2022]+\s*", "", cleaned)
+    return cleaned.strip()
+
+
+def old_first_sentences(text: str, limit: int = 2) -> str:
+    if not text:
+        return ""
+    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    if len(sentences) <= limit:
+        return text.strip()
+    return " ".join(sentences[:limit]).strip()
+
+
+def _old_format_title(title: str | None) -> str:
+    cleaned = old_clean_text(title)
+    return cleaned or "Kozmik Yorum"
+
+
+def _old_prepare_reasons(reasons: Iterable[str] | None, fallback_tags: Iterable[str] | None = None) -> list[str]:
+    prepared: list[str] = []
+    seen: set[str] = set()
+
+    def _append(sentence: str) -> None:
+        text = old_clean_text(old_strip_label_prefix(sentence))
+        if not text:
+            return
+        if not text.endswith("."):
+            text += "."
+        if text not in seen:
+            seen.add(text)
+            prepared.append(text)
+
+    for item in reasons or []:
+        _append(item)
+        if len(prepared) >= 4:
+            break
+
+    for tag in fallback_tags or []:
+        if len(prepared) >= 4:
+            break
+        tag_text = old_clean_text(tag)
+        if not tag_text:
+            continue
+        _append(f"Tema: {tag_text.lower()} enerjisini bilinçli yönettiğinde dengede kalırsın.")
+
+    idx = 0
+    while len(prepared) < 2 and idx < len(DEFAULT_REASON_FALLBACKS):
+        _append(DEFAULT_REASON_FALLBACKS[idx])
+        idx += 1
+
+    if len(prepared) < 2:
+        while len(prepared) < 2:
+            _append("İçsel ritmini duyduğunda adımların hafifler.")
+
+    return prepared[:4]
+
+
+def _old_prepare_actions(actions: Iterable[str] | None) -> list[str]:
+    prepared: list[str] = []
+    seen: set[str] = set()
+
+    def _append(sentence: str) -> None:
+        text = old_clean_text(old_strip_label_prefix(sentence))
+        if not text:
+            return
+        text = text[0].upper() + text[1:] if text else text
+        if not text.endswith("."):
+            text += "."
+        if text not in seen:
+            seen.add(text)
+            prepared.append(text)
+
+    for item in actions or []:
+        _append(item)
+        if len(prepared) >= 2:
+            break
+
+    idx = 0
+    while len(prepared) < 1 and idx < len(DEFAULT_ACTION_FALLBACKS):
+        _append(DEFAULT_ACTION_FALLBACKS[idx])
+        idx += 1
+
+    idx = 0
+    while len(prepared) < 2 and idx < len(DEFAULT_ACTION_FALLBACKS):
+        _append(DEFAULT_ACTION_FALLBACKS[idx])
+        idx += 1
+
+    return prepared[:2]
+
+
+def _old_prepare_tags(tags: Iterable[str] | None) -> list[str]:
+    cleaned_tags: list[str] = []
+    seen: set[str] = set()
+    for tag in tags or []:
+        text = old_clean_text(tag)
+        if not text:
+            continue
+        if text not in seen:
+            seen.add(text)
+            cleaned_tags.append(text)
+        if len(cleaned_tags) >= 6:
+            break
+    return cleaned_tags
+
+
+def old_build_card_payload(
+    *,
+    title: str,
+    main: str,
+    reasons: Iterable[str] | None = None,
+    actions: Iterable[str] | None = None,
+    tags: Iterable[str] | None = None,
+    confidence: Any = None,
+) -> Dict[str, Any]:
+    narrative_text = old_limit_sentences(main, min_sentences=3, max_sentences=6) if main else ""
+    fragments = [
+        fragment.strip()
+        for fragment in re.split(r"(?<=[.!?])\s+", narrative_text)
+        if fragment.strip()
+    ]
+    filler_idx = 0
+    while len(fragments) < 3 and filler_idx < len(DEFAULT_REASON_FALLBACKS):
+        filler_sentence = old_clean_text(DEFAULT_REASON_FALLBACKS[filler_idx])
+        if filler_sentence:
+            fragments.append(filler_sentence)
+        filler_idx += 1
+    if fragments:
+        narrative_text = " ".join(fragments[:6]).rstrip(".!?")
+        if narrative_text:
+            narrative_text += "."
+
+    prepared_tags = _old_prepare_tags(tags)
+    card = {
+        "title": _old_format_title(title),
+        "narrative": {"main": narrative_text},
+        "reasons": {"psychology": _old_prepare_reasons(reasons, prepared_tags)},
+        "actions": _old_prepare_actions(actions),
+        "tags": prepared_tags,
+    }
+    confidence_label = map_confidence_label(confidence)
+    if confidence_label:
+        card["confidence_label"] = confidence_label
+    return card
+
+
+# --- Corpus ---------------------------------------------------------------------------------------
+
+REAL_TEXTS = [
+    *DEFAULT_REASON_FALLBACKS,
+    *DEFAULT_ACTION_FALLBACKS,
+    '```json\n{"headline": "Güneş Aslan\'da", "summary": "Sahnede parlamak istiyorsun."}\n```',
+    "Summary: Ay Yengeç'te duygusal derinlik getiriyor. Evine ve köklerine bağlısın! Peki sınırların? "
+    "Satürn kare Venüs ilişkilerde sabır istiyor. Jüpiter üçgen Mars cesaret veriyor. "
+    "Neptün belirsizlik katıyor. Plüton dönüşüm getiriyor.",
+    "Headline - Kuzey Düğümü yön gösteriyor",
+    "• Nefes çalışması yap\n• Günlük tut\n• Yürüyüşe çık",
+    "Temalar: ['liderlik', \"yaratıcılık\", ' ', 'şefkat']",
+    "json\nAdvice: Bugün kendine alan aç.",
+    "Merkür retrosu - iletişimde yavaşla.  Yanlış anlaşılmalara dikkat et.",
+    "Tek cümle",
+    "Soru mu? Evet! Kesinlikle.",
+    "Gift — sezgilerin güçlü. Shadow: kontrol ihtiyacı.",
+    "   ",
+    "",
+    "[]",
+    "[[iç içe], liste]",
+    "...",
+    "- - -",
+    "· Theme: denge",
+]
+
+TOKENS = [
+    "```json", "```", "```JSON", "json", "json\\b", "[", "]", "'", '"', ",", " - ", "-", "–", "•", "·",
+    "\n", "\t", "  ", ". ", "! ", "? ", ".", "!", "?", "Summary:", "headline -", "Advice —", "THEME",
+    "story:", "Güneş", "Ay", "ışık", "İçsel", "ve", "sen", "a", "1", "—",
+]
+
+
+def _fuzz_texts(count: int = 600, seed: int = 20241019) -> list:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        pieces = [rng.choice(TOKENS) for _ in range(rng.randint(0, 18))]
+        joiner = rng.choice(["", " ", "\n"])
+        texts.append(joiner.join(pieces))
+    return texts
+
+
+CORPUS = REAL_TEXTS + _fuzz_texts()
+NON_STRINGS = [None, 0, 1.5, ["a. b."], {"a": 1}, b"bytes"]
+
+
+@pytest.fixture(autouse=True)
+def _cold_cache():
+    textnorm.cache_clear()
+    yield
+    textnorm.cache_clear()
+
+
+def test_clean_text_matches_old_regexes():
+    for text in CORPUS + NON_STRINGS:
+        assert clean_text(text) == old_clean_text(text), repr(text)
+        # A second call is served from the memo; it must return the same string.
+        assert clean_text(text) == old_clean_text(text), repr(text)
+
+
+@pytest.mark.parametrize("bounds", [(3, 6), (1, 2), (2, 2), (0, 1), (5, 3)])
+def test_limit_sentences_matches_old_regexes(bounds):
+    min_sentences, max_sentences = bounds
+    for text in CORPUS + NON_STRINGS:
+        expected = old_limit_sentences(text, min_sentences, max_sentences)
+        assert limit_sentences(text, min_sentences, max_sentences) == expected, repr(text)
+
+
+def test_strip_label_prefix_matches_old_regexes():
+    for text in CORPUS + NON_STRINGS:
+        assert strip_label_prefix(text) == old_strip_label_prefix(text), repr(text)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_first_sentences_matches_old_regexes(limit):
+    for text in CORPUS:
+        assert first_sentences(text, limit) == old_first_sentences(text, limit), repr(text)
+
+
+def test_build_card_payload_matches_old_regexes():
+    rng = random.Random(7)
+    for index, main in enumerate(CORPUS):
+        kwargs = {
+            "title": rng.choice(CORPUS),
+            "main": main,
+            "reasons": rng.sample(CORPUS, rng.randint(0, 5)),
+            "actions": rng.sample(CORPUS, rng.randint(0, 3)),
+            "tags": rng.sample(CORPUS, rng.randint(0, 8)),
+            "confidence": rng.choice([None, 0.2, 0.55, 0.9]),
+        }
+        if index % 7 == 0:
+            kwargs.update(reasons=None, actions=None, tags=None)
+        assert build_card_payload(**kwargs) == old_build_card_payload(**kwargs), repr(kwargs)
@@ -0,0 +1,117 @@
+"""Cleanup and sentence splitting for model-generated text.
+
+:func:`normalize` runs the markdown/JSON cleanup once per distinct string and
+returns the cleaned text together with its sentences, so the card builders
+no longer re-split (and re-clean) the same output at every stage.  Results
+are memoised in a small LRU; model output is immutable, so repeated
+headlines, fallbacks and cached interpretations are cleaned only once.
+"""
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple, Tuple
+
+from backend.config import env_int
+from backend.metrics import record_cache
+
+__all__ = [
+    "SENTENCE_BOUNDARY",
+    "Normalized",
+    "cache_clear",
+    "clean",
+    "normalize",
+    "split_sentences",
+]
+
+DASH = "–"
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+_FENCE = re.compile(r"```+json|```+|^json\\b", re.IGNORECASE)
+_BRACKETS = re.compile(r"\[[^\[\]]*\]")
+_WHITESPACE = re.compile(r"\s+")
+_BULLET = re.compile(r"\s*•\s*")
+
+_CACHE_SIZE = env_int("TEXT_NORMALIZE_CACHE_SIZE", 2048)
+_cache: "OrderedDict[str, Normalized]" = OrderedDict()
+_split_cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+_cache_lock = Lock()
+
+
+class Normalized(NamedTuple):
+    text: str
+    sentences: Tuple[str, ...]
+
+
+_EMPTY = Normalized("", ())
+
+
+def _join_bracket_items(match: re.Match[str]) -> str:
+    items = [piece.strip(" '\"") for piece in match.group(0).strip("[]").split(",")]
+    return ", ".join(item for item in items if item)
+
+
+def _clean(text: str) -> str:
+    # Each pass is skipped when its trigger character is absent, which is the common case.
+    if "`" in text or text[:4].lower() == "json":
+        text = _FENCE.sub("", text)
+    text = text.strip()
+    if "[" in text:
+        text = _BRACKETS.sub(_join_bracket_items, text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = text.replace(" - ", f" {DASH} ")
+    if "•" in text:
+        text = _BULLET.sub(" • ", text)
+    return text.strip()
+
+
+def _split(text: str) -> Tuple[str, ...]:
+    return tuple(piece for piece in (raw.strip() for raw in SENTENCE_BOUNDARY.split(text)) if piece)
+
+
+def _remember(cache: OrderedDict, key: str, value):
+    with _cache_lock:
+        cache[key] = value
+        if len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+    return value
+
+
+def normalize(value: object) -> Normalized:
+    """Cleaned text and its non-empty sentences; non-strings normalise to empty."""
+    if not isinstance(value, str) or not value:
+        return _EMPTY
+    with _cache_lock:
+        cached = _cache.get(value)
+        if cached is not None:
+            _cache.move_to_end(value)
+    record_cache("text_normalize", cached is not None)
+    if cached is not None:
+        return cached
+    text = _clean(value)
+    return _remember(_cache, value, Normalized(text, _split(text)))
+
+
+def clean(value: object) -> str:
+    """Strip code fences and JSON list artefacts and normalise whitespace."""
+    return normalize(value).text
+
+
+def split_sentences(text: str) -> Tuple[str, ...]:
+    """Split already-clean ``text`` at ``.``/``!``/``?`` boundaries, dropping blanks."""
+    if not text:
+        return ()
+    with _cache_lock:
+        cached = _split_cache.get(text)
+        if cached is not None:
+            _split_cache.move_to_end(text)
+            return cached
+    return _remember(_split_cache, text, _split(text))
+
+
+def cache_clear() -> None:
+    """Drop every memoised result, e.g. so a benchmark times the uncached path."""
+    with _cache_lock:
+        _cache.clear()
+        _split_cache.clear()
@@ -0,0 +1,157 @@
+"""Local prompt token accounting and history trimming for chat requests."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from backend.config import env_int
+from backend.metrics import record_cache
+from backend.textnorm import SENTENCE_BOUNDARY
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # pragma: no cover - optional dependency
+    Tokenizer = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "count_tokens",
+    "count_message_tokens",
+    "count_prompt_tokens",
+    "fit_history",
+]
+
+_DEFAULT_TOKENIZER_PATH = Path(__file__).resolve().parent.parent / "tmp_tokenizer" / "tokenizer.json"
+_TOKENIZER_PATH = Path(os.getenv("TOKENIZER_PATH") or _DEFAULT_TOKENIZER_PATH)
+_CACHE_SIZE = env_int("TOKEN_COUNT_CACHE_SIZE", 4096)
+# Role markers and separators added by chat-completion templates.
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_PREFIX = "Önceki konuşmanın özeti:"
+
+_tokenizer: Optional["Tokenizer"] = None
+_tokenizer_failed = False
+_tokenizer_lock = Lock()
+_cache: "OrderedDict[bytes, int]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def _get_tokenizer() -> Optional["Tokenizer"]:
+    global _tokenizer, _tokenizer_failed  # noqa: PLW0603 - module level cache
+    if _tokenizer is not None or _tokenizer_failed:
+        return _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None and not _tokenizer_failed:
+            if Tokenizer is None:
+                logger.warning("tokenizers is not installed; using approximate token counts.")
+                _tokenizer_failed = True
+            else:
+                try:
+                    _tokenizer = Tokenizer.from_file(str(_TOKENIZER_PATH))
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.warning("Tokenizer could not be loaded from %s: %s", _TOKENIZER_PATH, exc)
+                    _tokenizer_failed = True
+    return _tokenizer
+
+
+def _encode_length(text: str) -> int:
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        # Roughly four characters per token for BPE vocabularies.
+        return max(1, (len(text) + 3) // 4) if text else 0
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def count_tokens(text: str | None) -> int:
+    """Return the token count for ``text``, memoised by content hash."""
+    if not text:
+        return 0
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            record_cache("token_count", True)
+            return cached
+    record_cache("token_count", False)
+    value = _encode_length(text)
+    with _cache_lock:
+        _cache[key] = value
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def count_message_tokens(message: Mapping[str, Any]) -> int:
+    """Token cost of a single chat message including template overhead."""
+    content = message.get("content")
+    return MESSAGE_OVERHEAD_TOKENS + count_tokens(content if isinstance(content, str) else "")
+
+
+def count_prompt_tokens(messages: Sequence[Mapping[str, Any]]) -> int:
+    """Total prompt tokens for a chat-completion message list."""
+    return sum(count_message_tokens(message) for message in messages)
+
+
+def _summarise_turns(turns: Sequence[Mapping[str, str]], budget: int) -> Dict[str, str] | None:
+    """Extractive summary of dropped turns: the first sentence of each, newest last."""
+    if budget <= MESSAGE_OVERHEAD_TOKENS or not turns:
+        return None
+    lines: List[str] = []
+    used = count_tokens(SUMMARY_PREFIX) + MESSAGE_OVERHEAD_TOKENS
+    for turn in reversed(turns):
+        content = (turn.get("content") or "").strip()
+        if not content:
+            continue
+        first = SENTENCE_BOUNDARY.split(content, maxsplit=1)[0][:200]
+        speaker = "Kullanıcı" if turn.get("role") == "user" else "Asistan"
+        line = f"- {speaker}: {first}"
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    if not lines:
+        return None
+    lines.reverse()
+    return {"role": "system", "content": "\n".join([SUMMARY_PREFIX, *lines])}
+
+
+def fit_history(
+    history: Sequence[Mapping[str, str]],
+    *,
+    budget: int,
+    summary_budget: int = 0,
+) -> Tuple[List[Dict[str, str]], int]:
+    """Keep the most recent turns that fit ``budget`` tokens.
+
+    Older turns that do not fit are condensed into a single system summary of
+    at most ``summary_budget`` additional tokens (or dropped when that is
+    zero).  Returns the messages to send and the number of turns left out.
+    """
+
+    kept: List[Dict[str, str]] = []
+    used = 0
+    cutoff = len(history)
+    for index in range(len(history) - 1, -1, -1):
+        cost = count_message_tokens(history[index])
+        if used + cost > budget:
+            break
+        kept.append(dict(history[index]))
+        used += cost
+        cutoff = index
+    kept.reverse()
+
+    dropped = history[:cutoff]
+    if not dropped:
+        return kept, 0
+
+    summary = _summarise_turns(dropped, summary_budget)
+    if summary is not None:
+        kept.insert(0, summary)
+    return kept, len(dropped)
@@ -0,0 +1,164 @@
+"""Lightweight per-request stage timing exposed via ``Server-Timing``.
+
+Enable with ``TRACING_ENABLED=1``.  Stages are recorded with :func:`span`
+(context manager) or :func:`traced` (decorator); at the end of the request
+the totals are emitted in a ``Server-Timing`` header and one ``request_timing``
+event.  When tracing is disabled :func:`traced` returns the function
+unchanged and :func:`span` returns a shared no-op object.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from backend.config import env_bool
+from backend.eventlog import log_event
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "TRACING_ENABLED",
+    "init_app",
+    "span",
+    "traced",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACING_ENABLED = env_bool("TRACING_ENABLED", False)
+
+
+class _Recorder:
+    __slots__ = ("started", "stages")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        # name -> [total seconds, count]
+        self.stages: Dict[str, list] = {}
+
+    def add(self, name: str, elapsed: float) -> None:
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+
+
+_recorder: ContextVar[Optional[_Recorder]] = ContextVar("astrologi_trace", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "recorder", "started")
+
+    def __init__(self, name: str, recorder: _Recorder) -> None:
+        self.name = name
+        self.recorder = recorder
+        self.started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.recorder.add(self.name, time.perf_counter() - self.started)
+
+
+def span(name: str) -> Any:
+    """Time the enclosed block as stage ``name`` for the current request."""
+    if not TRACING_ENABLED:
+        return _NOOP
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NOOP
+    return _Span(name, recorder)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of :func:`span`; a no-op when tracing is disabled."""
+
+    def decorator(func: F) -> F:
+        if not TRACING_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            recorder = _recorder.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.add(name, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _server_timing(recorder: _Recorder, total: float) -> str:
+    parts = [
+        f'{name};dur={elapsed * 1000:.1f};desc="x{count}"' if count > 1 else f"{name};dur={elapsed * 1000:.1f}"
+        for name, (elapsed, count) in recorder.stages.items()
+    ]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def init_app(app: Any) -> None:
+    """Register request hooks on a Flask app when tracing is enabled."""
+    if not TRACING_ENABLED:
+        return
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_trace() -> None:
+        recorder = _Recorder()
+        g._trace_token = _recorder.set(recorder)
+        g._trace_recorder = recorder
+
+    @app.after_request
+    def _emit_trace(response: Any) -> Any:
+        recorder = g.get("_trace_recorder")
+        if recorder is None:
+            return response
+        total = time.perf_counter() - recorder.started
+        response.headers["Server-Timing"] = _server_timing(recorder, total)
+        log_event(
+            logger,
+            "request_timing",
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            total_ms=round(total * 1000, 1),
+            stages={
+                name: {"ms": round(elapsed * 1000, 1), "count": count}
+                for name, (elapsed, count) in recorder.stages.items()
+            },
+        )
+        return response
+
+    @app.teardown_request
+    def _reset_trace(_exc: Optional[BaseException]) -> None:
+        token = g.pop("_trace_token", None)
+        g.pop("_trace_recorder", None)
+        if token is not None:
+            _recorder.reset(token)
@@ -64,6 +64,48 @@ async function get(path) {
   }
 }
 
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_MAX_WAIT_MS = 120000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Slow endpoints run as background jobs: the POST returns 202 with a job id
+// right away and the result is polled, so no single request hits the 15s timeout.
+async function postJob(path, payload) {
+  const separator = path.includes("?") ? "&" : "?";
+  let job;
+  try {
+    const response = await axios.post(makeUrl(`${path}${separator}async=1`), payload, {
+      headers: { "Content-Type": "application/json" },
+      timeout: 15000,
+    });
+    if (response.status !== 202) {
+      return response.data;
+    }
+    job = response.data;
+  } catch (error) {
+    console.error(`❌ API Error on ${path}:`, error.response?.data || error.message);
+    throw new Error(extractMessage(error));
+  }
+
+  const deadline = Date.now() + JOB_MAX_WAIT_MS;
+  while (job.status !== "succeeded" && job.status !== "failed") {
+    if (Date.now() > deadline) {
+      throw new Error("İşlem beklenenden uzun sürdü. Lütfen tekrar dene.");
+    }
+    await sleep(JOB_POLL_INTERVAL_MS);
+    job = await get(job.status_url || `/api/jobs/${job.job_id}`);
+    if (!job) {
+      throw new Error("İşlem bulunamadı. Lütfen tekrar dene.");
+    }
+  }
+  if (job.status === "failed") {
+    console.error(`❌ Job failed on ${path}:`, job.result || job.error);
+    throw new Error(job.result?.error || job.error || extractMessage(null));
+  }
+  return job.result;
+}
+
 export const calculateNatalChart = (payload) => post("/natal-chart", payload);
 
 export const getInterpretation = async (chartData) => {
@@ -81,7 +123,7 @@ export const getInterpretation = async (chartData) => {
     console.warn("Invalid chart data supplied to getInterpretation", chartData);
   }
 
-  const data = await post("/interpretation", {
+  const data = await postJob("/interpretation", {
     chart: preparedChart,
     chart_data: preparedChart,
   });
@@ -127,7 +169,7 @@ export const getAlternateNarrative = async (chartData, strategy = "secondary") =
         })()
       : chartData;
 
-  const data = await post("/interpretation", {
+  const data = await postJob("/interpretation", {
     chart: preparedChart,
     chart_data: preparedChart,
     alt_strategy: strategy,
@@ -146,7 +188,36 @@ export const getAlternateNarrative = async (chartData, strategy = "secondary") =
 };
 
 export const calculateSynastry = (payload) =>
-  post("/calculate_synastry_chart", payload);
+  postJob("/calculate_synastry_chart", payload);
+
+const DAILY_INSIGHT_MAX_ATTEMPTS = 12;
+
+// The daily insight is pregenerated overnight; a missing one is generated in the
+// background and the endpoint answers 202 with Retry-After until it is stored.
+export const getDailyInsight = async (email) => {
+  if (!email) {
+    throw new Error("Günlük içgörü için e-posta sağlanmalı.");
+  }
+  const url = makeUrl(`/api/daily-insight?email=${encodeURIComponent(email)}`);
+  for (let attempt = 0; attempt < DAILY_INSIGHT_MAX_ATTEMPTS; attempt += 1) {
+    let response;
+    try {
+      response = await axios.get(url, { timeout: 15000 });
+    } catch (error) {
+      console.error("❌ API Error on /api/daily-insight:", error.response?.data || error.message);
+      if (error.response?.status === 404) {
+        return null;
+      }
+      throw new Error(extractMessage(error));
+    }
+    if (response.status !== 202) {
+      return response.data;
+    }
+    const retryAfter = Number(response.headers["retry-after"]) || 5;
+    await sleep(retryAfter * 1000);
+  }
+  throw new Error("Günlük içgörü henüz hazır değil. Lütfen biraz sonra tekrar dene.");
+};
 
 export const saveUserProfile = (profile) => post("/api/profile", profile);
 
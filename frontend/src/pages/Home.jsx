@@ -20,7 +20,7 @@ import {
 import { motion } from "framer-motion";
 import { RefreshCw, Sparkles, Star, Wand2 } from "lucide-react";
 
-import { getInterpretation } from "../lib/api.js";
+import { getDailyInsight, getInterpretation } from "../lib/api.js";
 
 const MotionBox = motion(Box);
 
@@ -57,10 +57,29 @@ const Home = () => {
     }
   }, []);
 
+  const profile = useMemo(() => {
+    try {
+      const stored = localStorage.getItem("userProfile");
+      return stored ? JSON.parse(stored) : null;
+    } catch {
+      return null;
+    }
+  }, []);
+
   const loadInsight = async () => {
     if (!chart) return;
     setLoading(true);
     try {
+      // Saved profiles read the stored daily insight; only visitors without a
+      // profile fall back to a full interpretation call.
+      if (profile?.email) {
+        const data = await getDailyInsight(profile.email);
+        if (data) {
+          setInsight(data.insight);
+          localStorage.setItem("dailyInsight", JSON.stringify(data));
+          return;
+        }
+      }
       const data = await getInterpretation(chart);
       setInsight(data.ai_interpretation);
       localStorage.setItem("userInsight", JSON.stringify(data));
@@ -80,6 +99,16 @@ const Home = () => {
 
   useEffect(() => {
     if (!chart) return;
+    if (profile?.email) {
+      // The daily insight changes once a day (UTC); reuse today's copy on revisits.
+      const cachedDaily = JSON.parse(localStorage.getItem("dailyInsight") || "null");
+      if (cachedDaily?.date === new Date().toISOString().slice(0, 10)) {
+        setInsight(cachedDaily.insight);
+        return;
+      }
+      loadInsight();
+      return;
+    }
     const cached = localStorage.getItem("userInsight");
     if (cached) {
       const cachedData = JSON.parse(cached);
@@ -91,14 +120,6 @@ const Home = () => {
   }, [chart]);
 
   const dailyThemes = useMemo(() => chart?.core_themes || [], [chart]);
-  const profile = useMemo(() => {
-    try {
-      const stored = localStorage.getItem("userProfile");
-      return stored ? JSON.parse(stored) : null;
-    } catch {
-      return null;
-    }
-  }, []);
 
   const greetingName = profile?.firstName ? profile.firstName : "Stargazer";
   const today = new Intl.DateTimeFormat("en-US", {